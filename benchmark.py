@@ -0,0 +1,271 @@
+import argparse
+import gc
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from datetime import datetime
+
+from models import storage, registry
+from models import client, airline, flight  # noqa: F401
+from models.dates import to_epoch, to_datetime
+
+CITIES = [
+    "London", "New York", "Dubai", "Singapore", "Tokyo", "Paris", "Sydney",
+    "Hong Kong", "Doha", "Istanbul", "Amsterdam", "Los Angeles", "Mumbai",
+]
+
+
+def generate_records(count, seed=42):
+    """Generate a realistic mix of client, airline and flight records.
+
+    Args:
+        count (int): Total number of records to generate.
+        seed (int): Random seed so runs are comparable.
+
+    Returns:
+        list: List of record dictionaries, roughly 20% clients, 1% airlines
+            and the rest flights.
+    """
+    rng = random.Random(seed)
+    records = []
+    airline_count = max(1, count // 100)
+    client_count = max(1, count // 5)
+    for i in range(1, airline_count + 1):
+        records.append({'id': i, 'type': 'airline', 'company_name': f"Airline {i}"})
+    client_ids = range(airline_count + 1, airline_count + client_count + 1)
+    for i in client_ids:
+        city = rng.choice(CITIES)
+        records.append({
+            'id': i,
+            'type': 'client',
+            'name': f"Client {i}",
+            'address_line1': f"{rng.randint(1, 999)} Main Street",
+            'address_line2': "",
+            'address_line3': "",
+            'city': city,
+            'state': city,
+            'zip_code': f"{rng.randint(10000, 99999)}",
+            'country': "United Kingdom",
+            'phone_number': f"+44 20 {rng.randint(1000, 9999)} {rng.randint(1000, 9999)}"
+        })
+    for i in range(airline_count + client_count + 1, count + 1):
+        start_city, end_city = rng.sample(CITIES, 2)
+        records.append({
+            'id': i,
+            'type': 'flight',
+            'client_id': rng.choice(client_ids),
+            'airline_id': rng.randint(1, airline_count),
+            'date': 1700000000 + rng.randint(0, 3 * 365 * 86400),
+            'start_city': start_city,
+            'end_city': end_city
+        })
+    return records
+
+
+def timed(func, *args):
+    """Run a function once and measure it.
+
+    Returns:
+        tuple: The function result and the elapsed seconds.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def bench_codecs(records, directory, level=None):
+    """Compare disk size, save time and load time of each storage codec.
+
+    Args:
+        records (list): Records to store.
+        directory (str): Scratch directory for the files.
+        level (int, optional): Compression level passed to each codec.
+    """
+    print(f"Storage codecs ({len(records)} records, level={level or 'default'})")
+    print(f"{'codec':<8}{'disk bytes':>14}{'ratio':>8}{'save s':>10}{'load s':>10}")
+    plain_size = None
+    for codec in storage.CODECS:
+        filename = storage.codec_filename(os.path.join(directory, 'records.json'), codec)
+        _, save_time = timed(storage.save, records, filename, codec, level)
+        loaded, load_time = timed(storage.load, filename)
+        assert len(loaded) == len(records)
+        size = os.path.getsize(filename)
+        plain_size = plain_size or size
+        print(f"{codec:<8}{size:>14}{plain_size / size:>8.1f}{save_time:>10.3f}{load_time:>10.3f}")
+
+
+class _LegacyModel:
+    """Hand-written model code as it was before the generated serializers.
+
+    Kept here only as the baseline of bench_serialization(): attributes set
+    one by one in __init__, records created with a setattr loop and
+    converted by explicit to_dict() and from_dict() methods.
+    """
+
+    def __init__(self):
+        self.id = None
+        self.type = self.__class__.__name__.lower().removeprefix('legacy')
+
+
+class LegacyClient(_LegacyModel):
+    def __init__(self):
+        super().__init__()
+        self.name = ""
+        self.address_line1 = ""
+        self.address_line2 = ""
+        self.address_line3 = ""
+        self.city = ""
+        self.state = ""
+        self.zip_code = ""
+        self.country = ""
+        self.phone_number = ""
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type': self.type,
+            'name': self.name,
+            'address_line1': self.address_line1,
+            'address_line2': self.address_line2,
+            'address_line3': self.address_line3,
+            'city': self.city,
+            'state': self.state,
+            'zip_code': self.zip_code,
+            'country': self.country,
+            'phone_number': self.phone_number
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        client = cls()
+        client.id = data['id']
+        client.name = data['name']
+        client.address_line1 = data['address_line1']
+        client.address_line2 = data['address_line2']
+        client.address_line3 = data['address_line3']
+        client.city = data['city']
+        client.state = data['state']
+        client.zip_code = data['zip_code']
+        client.country = data['country']
+        client.phone_number = data['phone_number']
+        return client
+
+
+class LegacyAirline(_LegacyModel):
+    def __init__(self):
+        super().__init__()
+        self.company_name = ""
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type': self.type,
+            'company_name': self.company_name
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        airline = cls()
+        airline.id = data['id']
+        airline.company_name = data['company_name']
+        return airline
+
+
+class LegacyFlight(_LegacyModel):
+    def __init__(self):
+        super().__init__()
+        self.client_id = None
+        self.airline_id = None
+        self.date = datetime.now()
+        self.start_city = ""
+        self.end_city = ""
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type': self.type,
+            'client_id': self.client_id,
+            'airline_id': self.airline_id,
+            'date': to_epoch(self.date),
+            'start_city': self.start_city,
+            'end_city': self.end_city
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        flight = cls()
+        flight.id = data['id']
+        flight.client_id = data['client_id']
+        flight.airline_id = data['airline_id']
+        flight.date = to_datetime(data['date'])
+        flight.start_city = data['start_city']
+        flight.end_city = data['end_city']
+        return flight
+
+
+LEGACY_MODELS = {'client': LegacyClient, 'airline': LegacyAirline, 'flight': LegacyFlight}
+
+
+def bench_serialization(records):
+    """Measure per-record encode and decode time of the model classes.
+
+    Compares the generated normalize() used by the controller against the
+    hand-written model code it replaced: creating a record with a setattr
+    loop and to_dict(), and loading one with from_dict() and to_dict().
+
+    Args:
+        records (list): Records to encode and decode.
+    """
+    legacy = [(LEGACY_MODELS[record['type']], record) for record in records]
+    pairs = [(registry.get_model(record['type']), record) for record in records]
+
+    def legacy_setattr():
+        for model, record in legacy:
+            instance = model()
+            for key, value in record.items():
+                setattr(instance, key, value)
+            instance.to_dict()
+
+    def legacy_round_trip():
+        for model, record in legacy:
+            model.from_dict(record).to_dict()
+
+    def normalize():
+        for model, record in pairs:
+            model.normalize(record, record['id'])
+
+    print(f"Model serialization ({len(records)} records)")
+    print(f"{'path':<20}{'total s':>10}{'us/record':>12}")
+    for name, func in (('legacy setattr', legacy_setattr),
+                       ('legacy round trip', legacy_round_trip),
+                       ('normalize', normalize)):
+        _, elapsed = timed(func)
+        print(f"{name:<20}{elapsed:>10.3f}{elapsed / len(records) * 1e6:>12.2f}")
+
+
+def main(argv=None):
+    """Run the benchmarks from the command line.
+
+    Args:
+        argv (list, optional): Command line arguments, defaults to sys.argv.
+    """
+    parser = argparse.ArgumentParser(description="Storage and model benchmarks")
+    parser.add_argument('--records', type=int, default=100000, help="number of records")
+    parser.add_argument('--level', type=int, default=None, help="compression level")
+    args = parser.parse_args(argv)
+
+    records = generate_records(args.records)
+    directory = tempfile.mkdtemp(prefix='airline-bench-')
+    try:
+        bench_codecs(records, directory, args.level)
+        bench_serialization(records)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
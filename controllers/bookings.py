@@ -0,0 +1,126 @@
+import bisect
+import heapq
+
+from controllers.indexes import RecordIndex
+from controllers.routes import flight_duration
+
+
+class BookingIndex(RecordIndex):
+    """Time intervals of the flights booked by each client.
+
+    Each client keeps the (start, end, flight_id) intervals of their flights
+    sorted by start. No flight lasts longer than the longest interval seen,
+    so the flights overlapping a new interval are found with a binary search
+    over the starts in (start - longest, end) rather than by scanning every
+    flight. Flight durations are estimated like the route graph's, since
+    flights only record their departure.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._bookings = {}
+        self._longest = 0
+
+    @staticmethod
+    def interval(record):
+        """Get the time a flight occupies its client.
+
+        Args:
+            record (dict): A record.
+
+        Returns:
+            tuple: (client_id, start, end) in epoch seconds, end exclusive, or
+                None if the record is not a flight with a client and a date.
+        """
+        if record.get('type') != 'flight':
+            return None
+        client_id = record.get('client_id')
+        start = record.get('date')
+        if client_id is None or start is None:
+            return None
+        end = start + flight_duration(record.get('start_city'), record.get('end_city'))
+        return client_id, start, end
+
+    def clear(self):
+        self._bookings = {}
+        self._longest = 0
+
+    def add(self, record):
+        interval = self.interval(record)
+        if interval is None:
+            return
+        client_id, start, end = interval
+        bisect.insort(self._bookings.setdefault(client_id, []), (start, end, record['id']))
+        self._longest = max(self._longest, end - start)
+
+    def remove(self, record):
+        interval = self.interval(record)
+        if interval is None:
+            return
+        client_id, start, end = interval
+        bookings = self._bookings.get(client_id, [])
+        entry = (start, end, record['id'])
+        position = bisect.bisect_left(bookings, entry)
+        if position < len(bookings) and bookings[position] == entry:
+            del bookings[position]
+            if not bookings:
+                del self._bookings[client_id]
+
+    def update(self, old, new):
+        if self.interval(old) != self.interval(new):
+            self.remove(old)
+            self.add(new)
+
+    def rebuild(self, records):
+        self.clear()
+        for record in records:
+            interval = self.interval(record)
+            if interval is not None:
+                client_id, start, end = interval
+                self._bookings.setdefault(client_id, []).append((start, end, record['id']))
+                self._longest = max(self._longest, end - start)
+        for bookings in self._bookings.values():
+            bookings.sort()
+
+    def conflicts(self, record):
+        """Get the booked flights of the same client overlapping a flight.
+
+        Args:
+            record (dict): A flight, booked or not. Its own ID never conflicts.
+
+        Returns:
+            list: IDs of the overlapping flights, by departure.
+        """
+        interval = self.interval(record)
+        if interval is None:
+            return []
+        client_id, start, end = interval
+        bookings = self._bookings.get(client_id, ())
+        first = bisect.bisect_right(bookings, (start - self._longest, float('inf')))
+        last = bisect.bisect_left(bookings, (end,))
+        return [
+            flight_id for _, booked_end, flight_id in bookings[first:last]
+            if booked_end > start and flight_id != record['id']
+        ]
+
+    def audit(self):
+        """Find every pair of overlapping flights in one sweep.
+
+        Each client's flights are swept in departure order while a heap holds
+        the flights still in the air, so the cost is proportional to the
+        flights plus the conflicts found.
+
+        Returns:
+            list: (client_id, first_id, second_id) tuples, the first flight
+                departing no later than the second.
+        """
+        conflicts = []
+        for client_id, bookings in self._bookings.items():
+            active = []
+            for start, end, flight_id in bookings:
+                while active and active[0][0] <= start:
+                    heapq.heappop(active)
+                for _, _, other_id in sorted(active, key=lambda item: item[1]):
+                    conflicts.append((client_id, other_id, flight_id))
+                heapq.heappush(active, (end, start, flight_id))
+        return conflicts
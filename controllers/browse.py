@@ -0,0 +1,97 @@
+from collections import OrderedDict, namedtuple
+
+from models.dates import format_epoch
+
+Window = namedtuple('Window', ['records', 'offset', 'total'])
+Window.__doc__ = """A window of sorted and filtered records, returned by
+RecordController.browse().
+
+Attributes:
+    records (list): Copies of the records in the window, in sort order.
+    offset (int): Position of the first record in the window.
+    total (int): Number of records matching the filters.
+"""
+
+
+def display_value(record, column, kind='str'):
+    """Get a column of a record as shown in the record browser.
+
+    Args:
+        record (dict): The record.
+        column (str): Field name.
+        kind (str): Field kind from the model registry.
+
+    Returns:
+        str: The displayed value, an empty string if it is missing.
+    """
+    value = record.get(column)
+    if value is None:
+        return ''
+    if kind == 'date':
+        return format_epoch(value)
+    return str(value)
+
+
+def sort_key(column):
+    """Get a sort key for a column that tolerates missing values.
+
+    Missing values sort last and text sorts case-insensitively.
+
+    Args:
+        column (str): Field name.
+
+    Returns:
+        callable: Key function taking a record.
+    """
+    def key(record):
+        value = record.get(column)
+        if value is None:
+            return (True, '')
+        if isinstance(value, str):
+            return (False, value.lower())
+        return (False, value)
+    return key
+
+
+class ResultSets:
+    """Recently used sorted and filtered ID lists, for browsing in windows.
+
+    Scrolling asks for many windows of the same ordering, so the sorted IDs
+    are computed once and reused until a mutation changes the generation.
+    Only IDs are kept; records are copied for the requested window only.
+    """
+
+    def __init__(self, capacity=4):
+        """Initialize an empty cache.
+
+        Args:
+            capacity (int): Number of orderings kept.
+        """
+        self.capacity = capacity
+        self._sets = OrderedDict()
+
+    def get(self, key, generation, build):
+        """Get the IDs of an ordering, building them if missing or stale.
+
+        Args:
+            key: Hashable description of the type, sort and filters.
+            generation (int): Current generation of the records.
+            build (callable): Called without arguments to compute the IDs.
+
+        Returns:
+            list: The IDs in sort order. Must not be modified.
+        """
+        entry = self._sets.get(key)
+        if entry is not None and entry[0] == generation:
+            self._sets.move_to_end(key)
+            return entry[1]
+        ids = build()
+        self._sets[key] = (generation, ids)
+        self._sets.move_to_end(key)
+        while len(self._sets) > self.capacity:
+            self._sets.popitem(last=False)
+        return ids
+
+    def clear(self):
+        """Drop every cached ordering."""
+        self._sets = OrderedDict()
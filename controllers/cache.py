@@ -0,0 +1,95 @@
+from collections import OrderedDict
+
+from controllers.indexes import RecordIndex
+
+
+class ModelCache(RecordIndex):
+    """Bounded LRU cache of model instances built from records.
+
+    Building a model from a record parses its fields again, for flights the
+    date into a datetime. The cache keeps the most recently used instances
+    keyed by record ID. It is registered as an index of the controller, so an
+    entry is dropped as soon as its record is updated or deleted and a stale
+    instance is never returned.
+
+    Attributes:
+        capacity (int): Maximum number of cached instances.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that had to build the instance.
+        evictions (int): Instances dropped to stay within capacity.
+    """
+
+    def __init__(self, capacity=1024, hit_counter=None, miss_counter=None):
+        """Initialize an empty cache.
+
+        Args:
+            capacity (int): Maximum number of cached instances, 0 disables caching.
+            hit_counter (Counter, optional): Metric incremented on every hit.
+            miss_counter (Counter, optional): Metric incremented on every miss.
+        """
+        self.capacity = capacity
+        self._hit_counter = hit_counter
+        self._miss_counter = miss_counter
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def clear(self):
+        self._entries = OrderedDict()
+
+    def add(self, record):
+        # New records are cached on first use, not on insert
+        pass
+
+    def remove(self, record):
+        self._entries.pop(record['id'], None)
+
+    def update(self, old, new):
+        self._entries.pop(old['id'], None)
+
+    def get(self, record, build):
+        """Get the instance of a record, building it on a miss.
+
+        Args:
+            record (dict): The current version of the record.
+            build (callable): Function building the instance from the record.
+
+        Returns:
+            BaseModel: The cached or newly built instance.
+        """
+        record_id = record['id']
+        instance = self._entries.get(record_id)
+        if instance is not None:
+            self._entries.move_to_end(record_id)
+            self.hits += 1
+            if self._hit_counter is not None:
+                self._hit_counter.inc()
+            return instance
+        self.misses += 1
+        if self._miss_counter is not None:
+            self._miss_counter.inc()
+        instance = build(record)
+        if self.capacity > 0:
+            self._entries[record_id] = instance
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return instance
+
+    def stats(self):
+        """Get the cache statistics.
+
+        Returns:
+            dict: 'size', 'capacity', 'hits', 'misses', 'evictions' and
+                'hit_ratio' (hits per lookup, 0.0 before any lookup).
+        """
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
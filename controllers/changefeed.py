@@ -0,0 +1,211 @@
+import bisect
+import json
+import os
+import re
+import threading
+
+from models import storage
+
+_SEGMENT = re.compile(r'^changes-(\d+)\.jsonl$')
+
+
+class ChangeFeed:
+    """Durable, ordered feed of record changes for downstream consumers.
+
+    Every change is one JSON line with an increasing sequence number, the
+    operation ('create', 'update', 'delete' or 'archive'), the record type and
+    ID, and the record before and after the change. Lines are appended to
+    segment files named after their first sequence number, so a reader
+    resuming from a sequence number opens the one segment holding it and
+    reads on from there: pulling changes costs time proportional to the
+    changes, not to the records or the whole feed.
+
+    Consumers keep their position as a named checkpoint in the feed
+    directory. Segments every consumer has read past can be pruned.
+
+    Attributes:
+        directory (str): Directory holding the segments and checkpoints.
+        segment_bytes (int): Size after which a new segment is started.
+        last_seq (int): Sequence number of the last durable change.
+    """
+
+    CHECKPOINTS = 'checkpoints'
+
+    def __init__(self, directory, segment_bytes=4 << 20):
+        """Initialize a ChangeFeed, creating the directory if needed.
+
+        Args:
+            directory (str): Directory for the feed.
+            segment_bytes (int): Size after which a new segment is started.
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, self.CHECKPOINTS), exist_ok=True)
+        self.last_seq = 0
+        self._size = 0
+        segments = self._segments()
+        if segments:
+            self.last_seq = segments[-1] - 1
+            for change in self._read_segment(segments[-1], repair=True):
+                self.last_seq = change['seq']
+
+    def _segments(self):
+        """First sequence numbers of the segments, in ascending order."""
+        firsts = []
+        for name in os.listdir(self.directory):
+            match = _SEGMENT.match(name)
+            if match:
+                firsts.append(int(match.group(1)))
+        return sorted(firsts)
+
+    def _segment_file(self, first_seq):
+        return os.path.join(self.directory, f"changes-{first_seq:012d}.jsonl")
+
+    def _read_segment(self, first_seq, repair=False):
+        """Yield the complete changes of a segment.
+
+        A last line that is not complete yet, or was cut off by a crash, ends
+        the segment. With repair set it is removed from the file.
+        """
+        filename = self._segment_file(first_seq)
+        valid = 0
+        with open(filename, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    change = json.loads(line)
+                except ValueError:
+                    break
+                valid += len(line)
+                yield change
+        if repair:
+            if valid < os.path.getsize(filename):
+                print(f"Discarding damaged end of change feed: {filename}")
+                os.truncate(filename, valid)
+            self._size = valid
+
+    def append(self, changes):
+        """Append changes and wait until they are durable.
+
+        Args:
+            changes (list): Changes numbered from last_seq + 1, in order.
+        """
+        if not changes:
+            return
+        data = ''.join(json.dumps(change) + '\n' for change in changes).encode('utf-8')
+        with self._lock:
+            segments = self._segments()
+            if not segments or self._size >= self.segment_bytes:
+                first_seq = changes[0]['seq']
+                self._size = 0
+            else:
+                first_seq = segments[-1]
+            with open(self._segment_file(first_seq), 'ab') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self._size += len(data)
+            self.last_seq = changes[-1]['seq']
+
+    def read(self, after_seq=0, limit=None):
+        """Stream the changes following a sequence number.
+
+        Args:
+            after_seq (int): Only yield changes with a higher sequence number.
+            limit (int, optional): Maximum number of changes to yield.
+
+        Yields:
+            dict: Each change, in sequence order.
+
+        Raises:
+            ValueError: If changes after after_seq were already pruned.
+        """
+        segments = self._segments()
+        if not segments or limit == 0:
+            return
+        if after_seq + 1 < segments[0]:
+            raise ValueError(f"Changes after {after_seq} were pruned, the feed starts at {segments[0]}")
+        position = max(bisect.bisect_right(segments, after_seq + 1) - 1, 0)
+        count = 0
+        for first_seq in segments[position:]:
+            for change in self._read_segment(first_seq):
+                if change['seq'] <= after_seq:
+                    continue
+                yield change
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+    def _checkpoint_file(self, consumer):
+        if not re.match(r'^[\w.-]+$', consumer):
+            raise ValueError(f"Invalid consumer name: {consumer!r}")
+        return os.path.join(self.directory, self.CHECKPOINTS, f"{consumer}.json")
+
+    def checkpoint(self, consumer):
+        """Get the sequence number a consumer has processed up to.
+
+        Args:
+            consumer (str): Name of the consumer, e.g. 'billing'.
+
+        Returns:
+            int: The last committed sequence number, 0 for a new consumer.
+        """
+        filename = self._checkpoint_file(consumer)
+        if not os.path.exists(filename):
+            return 0
+        with open(filename, encoding='utf-8') as f:
+            return json.load(f)['seq']
+
+    def commit(self, consumer, seq):
+        """Durably record that a consumer has processed changes up to seq.
+
+        Args:
+            consumer (str): Name of the consumer.
+            seq (int): Sequence number of the last processed change.
+        """
+        storage.write_atomic(
+            self._checkpoint_file(consumer), json.dumps({'seq': seq}).encode('utf-8')
+        )
+
+    def consume(self, consumer, limit=None):
+        """Stream the changes a consumer has not processed yet.
+
+        The checkpoint is not moved; call commit() with the sequence number of
+        the last change once it has been processed.
+
+        Args:
+            consumer (str): Name of the consumer.
+            limit (int, optional): Maximum number of changes to yield.
+
+        Yields:
+            dict: Each change after the consumer's checkpoint.
+        """
+        return self.read(self.checkpoint(consumer), limit)
+
+    def prune(self):
+        """Delete the segments every consumer with a checkpoint has read past.
+
+        Nothing is deleted while no consumer has a checkpoint, and the newest
+        segment is always kept.
+
+        Returns:
+            int: Number of segments deleted.
+        """
+        directory = os.path.join(self.directory, self.CHECKPOINTS)
+        consumers = [name[:-len('.json')] for name in os.listdir(directory)
+                     if name.endswith('.json')]
+        if not consumers:
+            return 0
+        upto = min(self.checkpoint(consumer) for consumer in consumers)
+        with self._lock:
+            segments = self._segments()
+            deleted = 0
+            # A segment ends just before the next one starts
+            for first_seq, next_first in zip(segments, segments[1:]):
+                if next_first - 1 > upto:
+                    break
+                os.remove(self._segment_file(first_seq))
+                deleted += 1
+        return deleted
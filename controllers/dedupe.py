@@ -0,0 +1,220 @@
+import heapq
+import os
+import re
+from collections import namedtuple
+from difflib import SequenceMatcher
+
+
+MergeCandidate = namedtuple('MergeCandidate', ['keep_id', 'duplicate_id', 'score'])
+MergeCandidate.__doc__ = """A pair of client records that probably describe the same person.
+
+Attributes:
+    keep_id (int): ID of the record to keep (the older one).
+    duplicate_id (int): ID of the record to merge into keep_id.
+    score (float): Similarity between 0 and 1.
+"""
+
+# Blocks larger than this are too generic to be useful (for example a shared
+# office phone number) and are skipped instead of compared all-pairs
+MAX_BLOCK_SIZE = 200
+
+# Below this many comparisons a process pool costs more than it saves
+PARALLEL_THRESHOLD = 50000
+
+_NON_ALNUM = re.compile(r'[^a-z0-9 ]+')
+_NON_DIGIT = re.compile(r'\D+')
+
+
+def normalize_text(value):
+    """Normalize free text for comparison.
+
+    Args:
+        value (str): Text such as a name or address.
+
+    Returns:
+        str: Lower case text without punctuation and with single spaces.
+    """
+    return ' '.join(_NON_ALNUM.sub(' ', (value or '').lower()).split())
+
+
+def normalize_phone(value):
+    """Normalize a phone number for comparison.
+
+    Only the last nine digits are kept, so the same number written with or
+    without a country code or trunk prefix gives the same key.
+
+    Args:
+        value (str): Phone number as entered.
+
+    Returns:
+        str: The normalized digits, or '' if there are too few to be useful.
+    """
+    digits = _NON_DIGIT.sub('', value or '')
+    return digits[-9:] if len(digits) >= 6 else ''
+
+
+def blocking_keys(client):
+    """Get the blocking keys of a client.
+
+    Only clients sharing at least one key are compared with each other.
+    build_blocks() applies the same rules to prepared clients.
+
+    Args:
+        client (dict): Client record.
+
+    Returns:
+        list: Blocking keys, a normalized phone number and the zip code
+            combined with the first letters of the name.
+    """
+    keys = []
+    phone = normalize_phone(client.get('phone_number'))
+    if phone:
+        keys.append('phone:' + phone)
+    zip_code = normalize_text(client.get('zip_code')).replace(' ', '')
+    name = normalize_text(client.get('name')).replace(' ', '')
+    if zip_code and name:
+        keys.append(f"zip:{zip_code}:{name[:3]}")
+    return keys
+
+
+def prepare(client):
+    """Normalize the fields of a client used for scoring, once per client.
+
+    Args:
+        client (dict): Client record.
+
+    Returns:
+        tuple: ID, name, address, phone number and zip code, normalized.
+    """
+    return (
+        client.get('id'),
+        normalize_text(client.get('name')),
+        normalize_text(client.get('address_line1')),
+        normalize_phone(client.get('phone_number')),
+        normalize_text(client.get('zip_code')).replace(' ', ''),
+    )
+
+
+def similarity(a, b):
+    """Score how likely two clients describe the same person.
+
+    Args:
+        a (dict): Client record.
+        b (dict): Client record.
+
+    Returns:
+        float: Weighted similarity between 0 and 1 of name, address, phone
+            number and zip code.
+    """
+    return _score(prepare(a), prepare(b), 0)
+
+
+def _score(a, b, threshold):
+    """Score two prepared clients, stopping early below the threshold."""
+    exact = 0.0
+    if a[3] and a[3] == b[3]:
+        exact += 0.2
+    if a[4] and a[4] == b[4]:
+        exact += 0.1
+    name = SequenceMatcher(None, a[1], b[1])
+    # quick_ratio() is a cheap upper bound of ratio()
+    if exact + 0.5 * name.quick_ratio() + 0.2 < threshold:
+        return 0.0
+    score = exact + 0.5 * name.ratio()
+    if score + 0.2 < threshold:
+        return 0.0
+    return score + 0.2 * SequenceMatcher(None, a[2], b[2]).ratio()
+
+
+def build_blocks(clients, max_block_size=MAX_BLOCK_SIZE):
+    """Group clients by blocking key.
+
+    Args:
+        clients (iterable): Client records.
+        max_block_size (int): Blocks larger than this are skipped.
+
+    Returns:
+        list: Blocks with at least two clients, each a list of prepared
+            clients as returned by prepare().
+    """
+    blocks = {}
+    for client in clients:
+        prepared = prepare(client)
+        _, name, _, phone, zip_code = prepared
+        if phone:
+            blocks.setdefault('phone:' + phone, []).append(prepared)
+        name = name.replace(' ', '')
+        if zip_code and name:
+            blocks.setdefault(f"zip:{zip_code}:{name[:3]}", []).append(prepared)
+    return [block for block in blocks.values() if 2 <= len(block) <= max_block_size]
+
+
+def score_blocks(blocks, threshold):
+    """Compare all pairs within each block.
+
+    Args:
+        blocks (list): Blocks from build_blocks().
+        threshold (float): Minimum score of a candidate.
+
+    Returns:
+        list: MergeCandidate for every pair scoring at least threshold.
+    """
+    candidates = []
+    for block in blocks:
+        for i, a in enumerate(block):
+            for b in block[i + 1:]:
+                score = _score(a, b, threshold)
+                if score >= threshold:
+                    keep, duplicate = sorted((a[0], b[0]))
+                    candidates.append(MergeCandidate(keep, duplicate, round(score, 4)))
+    return candidates
+
+
+def find_duplicate_clients(clients, threshold=0.8, workers=None, max_block_size=MAX_BLOCK_SIZE):
+    """Find probable duplicate clients.
+
+    Clients are grouped into blocks by blocking_keys() and scored pairwise only
+    within a block, which avoids comparing every client with every other one.
+    Large jobs are spread over a process pool, one batch of blocks per task.
+
+    Args:
+        clients (iterable): Client records.
+        threshold (float): Minimum similarity of a candidate.
+        workers (int, optional): Number of worker processes. Defaults to the
+            CPU count; 1 scores everything in the calling process.
+        max_block_size (int): Blocks larger than this are skipped.
+
+    Returns:
+        list: Unique MergeCandidate pairs, best score first.
+    """
+    blocks = build_blocks(clients, max_block_size)
+    comparisons = sum(len(block) * (len(block) - 1) // 2 for block in blocks)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or comparisons < PARALLEL_THRESHOLD:
+        results = [score_blocks(blocks, threshold)]
+    else:
+        # Balance the batches by comparisons rather than by number of blocks
+        batches = [[] for _ in range(workers * 4)]
+        loads = [(0, slot) for slot in range(len(batches))]
+        for block in sorted(blocks, key=len, reverse=True):
+            load, slot = heapq.heappop(loads)
+            batches[slot].append(block)
+            heapq.heappush(loads, (load + len(block) * (len(block) - 1) // 2, slot))
+        # Spawned rather than forked workers, see loading.load_parallel()
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            results = list(executor.map(
+                score_blocks, batches, [threshold] * len(batches)
+            ))
+
+    # A pair sharing several blocking keys is scored once per block
+    best = {}
+    for candidates in results:
+        for candidate in candidates:
+            pair = (candidate.keep_id, candidate.duplicate_id)
+            if pair not in best:
+                best[pair] = candidate
+    return sorted(best.values(), key=lambda c: (-c.score, c.keep_id, c.duplicate_id))
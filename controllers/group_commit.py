@@ -0,0 +1,155 @@
+import collections
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Failed batches remembered for their waiters, who wake right after the commit
+FAILED_BATCHES_KEPT = 64
+
+
+class GroupCommitter:
+    """Batches save requests so that mutations close together share one commit.
+
+    Callers request a commit after each mutation. A background thread waits
+    for the commit window to pass, collecting every request that arrives in
+    the meantime, and then runs a single commit (one write and one fsync) for
+    all of them. Callers that need durability can wait for their request.
+
+    With a window of 0 every request is committed synchronously in the
+    calling thread and no background thread is started.
+
+    A failed commit is reported to the callers waiting for a request of that
+    batch. The commit function must leave the state it could not write
+    pending, so the next commit, or flush(), writes it again.
+
+    Attributes:
+        window (float): Seconds to wait for more requests before committing.
+    """
+
+    def __init__(self, commit, window=0.05, batch_sizes=None):
+        """Initialize a new GroupCommitter.
+
+        Args:
+            commit (callable): Function writing the current state durably.
+            window (float): Seconds to collect requests before committing.
+            batch_sizes (Histogram, optional): Receives the number of requests
+                covered by each commit.
+        """
+        self._commit = commit
+        self.window = window
+        self._batch_sizes = batch_sizes
+        self._cond = threading.Condition()
+        self._requested = 0
+        self._committed = 0
+        self._urgent = False
+        self._closed = False
+        self._dirty = False
+        self._failed = collections.deque(maxlen=FAILED_BATCHES_KEPT)
+        self._thread = None
+        if window > 0:
+            self._thread = threading.Thread(
+                target=self._run, name='group-commit', daemon=True
+            )
+            self._thread.start()
+
+    @property
+    def pending(self):
+        """int: Number of requests not yet committed."""
+        return self._requested - self._committed
+
+    def request(self, wait=False):
+        """Request a commit of the current state.
+
+        Args:
+            wait (bool): Block until the commit covering this request is
+                durable, skipping the rest of the commit window.
+
+        Raises:
+            Exception: When waiting, any error raised by the commit.
+        """
+        if self._thread is None:
+            self._commit_now()
+            return
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("GroupCommitter is closed")
+            self._requested += 1
+            target = self._requested
+            if wait:
+                self._urgent = True
+            self._cond.notify_all()
+            if wait:
+                self._wait_for(target)
+
+    def flush(self):
+        """Commit any pending requests now and wait until they are durable.
+
+        Raises:
+            Exception: Any error raised by the commit.
+        """
+        if self._thread is None:
+            return
+        with self._cond:
+            if self._dirty and self._requested == self._committed:
+                # Retry what the last failed commit left pending
+                self._requested += 1
+            if self._requested > self._committed:
+                self._urgent = True
+                self._cond.notify_all()
+                self._wait_for(self._requested)
+
+    def close(self):
+        """Flush pending requests and stop the background thread."""
+        if self._thread is None:
+            return
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _wait_for(self, target):
+        while self._committed < target:
+            self._cond.wait()
+        for first, last, error in self._failed:
+            if first <= target <= last:
+                raise error
+
+    def _commit_now(self):
+        self._commit()
+        if self._batch_sizes is not None:
+            self._batch_sizes.observe(1)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._requested == self._committed and not self._closed:
+                    self._cond.wait()
+                if self._closed and self._requested == self._committed:
+                    return
+                # Let more requests join the batch unless someone is waiting
+                deadline = time.monotonic() + self.window
+                while not self._urgent and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                self._urgent = False
+                target = self._requested
+                batch = target - self._committed
+            error = None
+            try:
+                self._commit()
+            except Exception as e:
+                logger.exception("Error committing records")
+                error = e
+            if self._batch_sizes is not None:
+                self._batch_sizes.observe(batch)
+            with self._cond:
+                if error is not None:
+                    self._failed.append((target - batch + 1, target, error))
+                self._dirty = error is not None
+                self._committed = target
+                self._cond.notify_all()
@@ -0,0 +1,279 @@
+from abc import ABC, abstractmethod
+import bisect
+
+
+class RecordIndex(ABC):
+    """Base class for structures kept in step with the controller's records.
+
+    The controller calls add() for every record it inserts, remove() for every
+    record it deletes and update() when a record is replaced by a new version,
+    so an index never has to scan the records to stay current. rebuild() is
+    used after loading and by consistency checks.
+    """
+
+    @abstractmethod
+    def clear(self):
+        """Remove all entries from the index."""
+        pass
+
+    @abstractmethod
+    def add(self, record):
+        """Add a record to the index.
+
+        Args:
+            record (dict): The inserted record.
+        """
+        pass
+
+    @abstractmethod
+    def remove(self, record):
+        """Remove a record from the index.
+
+        Args:
+            record (dict): The deleted record.
+        """
+        pass
+
+    def update(self, old, new):
+        """Replace a record in the index with its new version.
+
+        Args:
+            old (dict): The record before the update.
+            new (dict): The record after the update.
+        """
+        self.remove(old)
+        self.add(new)
+
+    def rebuild(self, records):
+        """Rebuild the index from scratch.
+
+        Args:
+            records (iterable): All current records.
+        """
+        self.clear()
+        for record in records:
+            self.add(record)
+
+
+class ForeignKeyIndex(RecordIndex):
+    """Index from a referenced record ID to the records referencing it.
+
+    For example the 'airline_id' index maps each airline ID to the set of
+    flight IDs operated by that airline, so finding the flights of one airline
+    costs time proportional to its flights rather than to all records.
+
+    Attributes:
+        field (str): Name of the referencing field, e.g. 'airline_id'.
+        record_type (str): Type of the referencing records, e.g. 'flight'.
+    """
+
+    def __init__(self, field, record_type='flight'):
+        """Initialize a new ForeignKeyIndex.
+
+        Args:
+            field (str): Name of the referencing field.
+            record_type (str): Type of the referencing records.
+        """
+        self.field = field
+        self.record_type = record_type
+        self._references = {}
+
+    def clear(self):
+        self._references = {}
+
+    def add(self, record):
+        if record.get('type') != self.record_type:
+            return
+        parent_id = record.get(self.field)
+        if parent_id is not None:
+            self._references.setdefault(parent_id, set()).add(record['id'])
+
+    def remove(self, record):
+        if record.get('type') != self.record_type:
+            return
+        parent_id = record.get(self.field)
+        children = self._references.get(parent_id)
+        if children is not None:
+            children.discard(record['id'])
+            if not children:
+                del self._references[parent_id]
+
+    def update(self, old, new):
+        if old.get(self.field) != new.get(self.field):
+            self.remove(old)
+            self.add(new)
+
+    def referencing(self, parent_id):
+        """Get the IDs of the records referencing a record.
+
+        Args:
+            parent_id (int): ID of the referenced record.
+
+        Returns:
+            set: IDs of the referencing records. The set is a copy.
+        """
+        return set(self._references.get(parent_id, ()))
+
+    def count(self, parent_id):
+        """Count the records referencing a record.
+
+        Args:
+            parent_id (int): ID of the referenced record.
+
+        Returns:
+            int: Number of referencing records.
+        """
+        return len(self._references.get(parent_id, ()))
+
+
+class IdOrderIndex(RecordIndex):
+    """Sorted record IDs, overall and per record type.
+
+    Supports resuming a walk over the records in ID order from any ID with a
+    binary search, which is what cursor-based paging needs. New records almost
+    always have the highest ID so inserts are appends. Deleted IDs are only
+    marked and the lists are compacted once half of their entries are dead.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self.clear()
+
+    def clear(self):
+        self._ids = {None: []}
+        self._live = {None: set()}
+        self._dead = {None: 0}
+
+    def _lists(self, record):
+        record_type = record.get('type')
+        if record_type not in self._ids:
+            self._ids[record_type] = []
+            self._live[record_type] = set()
+            self._dead[record_type] = 0
+        return (None, record_type)
+
+    def add(self, record):
+        record_id = record['id']
+        for key in self._lists(record):
+            ids = self._ids[key]
+            live = self._live[key]
+            if record_id in live:
+                continue
+            live.add(record_id)
+            if not ids or ids[-1] < record_id:
+                ids.append(record_id)
+            else:
+                position = bisect.bisect_left(ids, record_id)
+                if position < len(ids) and ids[position] == record_id:
+                    # Re-added after a delete, the entry was never compacted
+                    self._dead[key] -= 1
+                else:
+                    ids.insert(position, record_id)
+
+    def remove(self, record):
+        record_id = record['id']
+        for key in self._lists(record):
+            live = self._live[key]
+            if record_id not in live:
+                continue
+            live.discard(record_id)
+            self._dead[key] += 1
+            if self._dead[key] * 2 > len(self._ids[key]):
+                self._ids[key] = [i for i in self._ids[key] if i in live]
+                self._dead[key] = 0
+
+    def update(self, old, new):
+        if old.get('type') != new.get('type'):
+            self.remove(old)
+            self.add(new)
+
+    def ids_after(self, after_id, record_type=None, limit=None):
+        """Get the IDs following a given ID, in ascending order.
+
+        Args:
+            after_id (int): Return IDs greater than this, None to start at the beginning.
+            record_type (str, optional): Only IDs of this record type.
+            limit (int, optional): Maximum number of IDs to return.
+
+        Returns:
+            list: The live IDs after after_id.
+        """
+        ids = self._ids.get(record_type, ())
+        live = self._live.get(record_type, ())
+        position = 0 if after_id is None else bisect.bisect_right(ids, after_id)
+        result = []
+        while position < len(ids) and (limit is None or len(result) < limit):
+            record_id = ids[position]
+            if record_id in live:
+                result.append(record_id)
+            position += 1
+        return result
+
+    def ids(self, record_type=None):
+        """Get the set of live record IDs.
+
+        Args:
+            record_type (str, optional): Only IDs of this record type.
+
+        Returns:
+            frozenset: The live IDs, a snapshot that later changes do not affect.
+        """
+        return frozenset(self._live.get(record_type, ()))
+
+    def count(self, record_type=None):
+        """Count the live records.
+
+        Args:
+            record_type (str, optional): Only count records of this type.
+
+        Returns:
+            int: Number of records.
+        """
+        return len(self._live.get(record_type, ()))
+
+
+class ChangeCounter(RecordIndex):
+    """Number of changes to the records of each type.
+
+    Lets callers that keep data derived from one record type, like the GUI
+    dropdowns of clients and airlines, tell whether it is stale without
+    reading the records again.
+    """
+
+    def __init__(self):
+        """Initialize the counters."""
+        self._changes = {}
+        self._rebuilds = 0
+
+    def _bump(self, record_type):
+        self._changes[record_type] = self._changes.get(record_type, 0) + 1
+
+    def clear(self):
+        self._changes = {}
+        # Counters must never repeat a value, even after a reload
+        self._rebuilds += 1
+
+    def add(self, record):
+        self._bump(record.get('type'))
+
+    def remove(self, record):
+        self._bump(record.get('type'))
+
+    def update(self, old, new):
+        self._bump(old.get('type'))
+        if new.get('type') != old.get('type'):
+            self._bump(new.get('type'))
+
+    def rebuild(self, records):
+        self.clear()
+
+    def version(self, record_type):
+        """Get a token that changes whenever a record of a type changes.
+
+        Args:
+            record_type (str): Record type.
+
+        Returns:
+            tuple: Comparable version token.
+        """
+        return (self._rebuilds, self._changes.get(record_type, 0))
@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+
+from models import storage
+
+
+def apply_entry(records, entry):
+    """Apply one log entry to a dict of records keyed by ID.
+
+    Applying an entry is idempotent: a put stores the full record, and a
+    delete of a missing record does nothing, so replaying entries that are
+    already reflected in a snapshot leaves the records unchanged. An archive
+    entry, for a flight moved to the cold archive, removes it like a delete.
+
+    Args:
+        records (dict): Records keyed by ID, changed in place.
+        entry (dict): A log entry with 'seq', 'op' and 'record' or 'id'.
+    """
+    if entry['op'] == 'put':
+        record = entry['record']
+        records[record['id']] = record
+    elif entry['op'] in ('delete', 'archive'):
+        records.pop(entry['id'], None)
+
+
+class MutationLog:
+    """Append-only log of record mutations, one JSON object per line.
+
+    Every entry carries an increasing sequence number. A put entry holds the
+    full new version of a record and a delete entry its ID, so replaying the
+    entries after a snapshot's sequence number brings it up to date.
+
+    Attributes:
+        filename (str): Path of the log file.
+        size (int): Current size of the log file in bytes.
+    """
+
+    def __init__(self, filename):
+        """Initialize a new MutationLog.
+
+        Args:
+            filename (str): Path of the log file. It is created on first append.
+        """
+        self.filename = filename
+        self._lock = threading.Lock()
+        self.size = os.path.getsize(filename) if os.path.exists(filename) else 0
+
+    def append(self, entries):
+        """Append entries and wait until they are durable.
+
+        Args:
+            entries (list): Log entries in sequence order.
+
+        Returns:
+            int: Number of bytes written.
+        """
+        data = ''.join(json.dumps(entry) + '\n' for entry in entries).encode('utf-8')
+        with self._lock:
+            with open(self.filename, 'ab') as f:
+                try:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                except BaseException:
+                    # Drop a partial write, so the entries can be appended again
+                    f.truncate(self.size)
+                    raise
+            self.size += len(data)
+        return len(data)
+
+    def replay(self, after_seq=0, repair=True):
+        """Read the entries following a sequence number.
+
+        A last line cut off by a crash is removed from the file, so later
+        appends start on a clean line.
+
+        Args:
+            after_seq (int): Only return entries with a higher sequence number.
+            repair (bool): Remove a damaged last line. Readers that do not
+                own the log pass False, since the line may still be written.
+
+        Returns:
+            list: The entries, in sequence order.
+        """
+        entries = []
+        with self._lock:
+            if not os.path.exists(self.filename):
+                return entries
+            valid = 0
+            with open(self.filename, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    valid += len(line)
+                    if entry['seq'] > after_seq:
+                        entries.append(entry)
+            if repair and valid < os.path.getsize(self.filename):
+                print(f"Discarding damaged end of mutation log: {self.filename}")
+                os.truncate(self.filename, valid)
+            self.size = valid
+        return entries
+
+    def truncate(self, upto_seq):
+        """Drop the entries up to and including a sequence number.
+
+        The remaining entries are copied to a temporary file that atomically
+        replaces the log. Appends wait meanwhile, which only takes as long as
+        copying the retained tail.
+
+        Args:
+            upto_seq (int): Sequence number covered by a durable snapshot.
+        """
+        with self._lock:
+            if not os.path.exists(self.filename):
+                return
+            kept = []
+            with open(self.filename, 'rb') as f:
+                for line in f:
+                    if line.endswith(b'\n') and json.loads(line)['seq'] > upto_seq:
+                        kept.append(line)
+            data = b''.join(kept)
+            storage.write_atomic(self.filename, data)
+            self.size = len(data)
+
+
+class Compactor:
+    """Runs snapshot compactions in a background thread.
+
+    Requests made while a compaction is running are coalesced into one
+    follow-up compaction. With background set to False compactions run
+    synchronously in the requesting thread.
+    """
+
+    def __init__(self, compact, background=True):
+        """Initialize a new Compactor.
+
+        Args:
+            compact (callable): Function taking a snapshot and truncating the log.
+            background (bool): Run compactions in a background thread.
+        """
+        self._compact = compact
+        self._event = threading.Event()
+        self._closed = False
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(target=self._run, name='compactor', daemon=True)
+            self._thread.start()
+
+    def request(self):
+        """Request a compaction."""
+        if self._thread is None:
+            self._compact()
+        else:
+            self._event.set()
+
+    def close(self):
+        """Stop the background thread after any running compaction."""
+        self._closed = True
+        if self._thread is not None:
+            self._event.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            self._event.wait()
+            self._event.clear()
+            if self._closed:
+                return
+            try:
+                self._compact()
+            except Exception as e:
+                print(f"Error compacting records: {e}")
@@ -0,0 +1,167 @@
+import json
+import os
+
+from models import registry, storage
+# Imported for their registration with the model registry in worker processes
+from models import client, airline, flight  # noqa: F401
+
+# Below this file size a process pool costs more than it saves
+PARALLEL_LOAD_BYTES = 4 << 20
+
+# Chunks handed out per worker, so one slow chunk does not leave the other
+# workers idle at the end
+CHUNKS_PER_WORKER = 4
+
+_BOM = b'\xef\xbb\xbf'
+
+
+def normalize_records(raw_records):
+    """Turn decoded records into stored records with their model's serializer.
+
+    Records of unknown types are skipped. Records that fail to normalize are
+    logged and skipped.
+
+    Args:
+        raw_records (iterable): Record dictionaries as read from a file.
+
+    Returns:
+        list: The normalized records, in input order.
+    """
+    records = []
+    for record in raw_records:
+        model = registry.MODELS.get(record.get('type', '').lower())
+        if model is None:
+            continue
+        try:
+            records.append(model.normalize(record, record['id']))
+        except Exception as e:
+            print(f"Error loading record: {e}")
+    return records
+
+
+def decode_chunk(data):
+    """Decode and normalize a chunk of whole lines of a records file.
+
+    Args:
+        data (bytes): Lines written by storage.write_records().
+
+    Returns:
+        list: The normalized records of the chunk.
+
+    Raises:
+        json.JSONDecodeError: If a line is not a complete record.
+    """
+    decode = json.loads
+    raw_records = []
+    for line in data.splitlines():
+        line = line.strip()
+        if not line or line == b']':
+            continue
+        if line[-1:] == b',':
+            line = line[:-1]
+        record = decode(line)
+        if 'id' in record:
+            record['id'] = int(record['id'])
+        raw_records.append(record)
+    return normalize_records(raw_records)
+
+
+def decode_range(filename, start, end):
+    """Read a byte range of an uncompressed records file and decode it.
+
+    Args:
+        filename (str): Path to the file.
+        start (int): Offset of the first line of the range.
+        end (int): Offset just past the last line of the range.
+
+    Returns:
+        list: The normalized records of the range.
+    """
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        return decode_chunk(f.read(end - start))
+
+
+def line_ranges(f, start, size, count):
+    """Split a binary file into about count byte ranges of whole lines.
+
+    Args:
+        f: Seekable binary file object.
+        start (int): Offset where the first range starts.
+        size (int): Size of the file.
+        count (int): Wanted number of ranges.
+
+    Returns:
+        list: (start, end) offset pairs covering start to size, in order.
+    """
+    bounds = [start]
+    for i in range(1, count):
+        target = start + (size - start) * i // count
+        if target <= bounds[-1]:
+            continue
+        f.seek(target)
+        f.readline()
+        if f.tell() >= size:
+            break
+        bounds.append(f.tell())
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _layout_start(f, size):
+    """Get the offset of the first record line, or None for another layout.
+
+    Only files written by storage.write_records(), a '[' line, one record
+    per line and a closing ']' line, can be split at line boundaries. A file
+    without the closing line is truncated and left to the serial loader.
+    """
+    f.seek(0)
+    first = f.readline()
+    if first.removeprefix(_BOM).strip() != b'[':
+        return None
+    f.seek(max(size - 64, len(first)))
+    lines = f.read().split()
+    if not lines or lines[-1] != b']':
+        return None
+    return len(first)
+
+
+def load_parallel(filename, workers):
+    """Read, decode and normalize an uncompressed records file with a process pool.
+
+    The file is cut into byte ranges of whole record lines, found by seeking
+    to evenly spaced offsets, and each worker reads and decodes its own
+    ranges, so the file is never held whole in one process. The chunks are
+    concatenated in file order. Compressed streams cannot be entered in the
+    middle, so compressed files are left to the streaming serial loader.
+
+    Workers are started with the 'spawn' method: forking would copy the
+    caller's threads and locks in whatever state they happen to be in.
+
+    Args:
+        filename (str): Path to the records file.
+        workers (int): Number of worker processes.
+
+    Returns:
+        list: The normalized records in file order, or None if the file is
+            compressed, does not have the one record per line layout or is
+            truncated.
+
+    Raises:
+        json.JSONDecodeError: If a record line is damaged.
+    """
+    if storage.detect_codec(filename) != 'none':
+        return None
+    with open(filename, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        start = _layout_start(f, size)
+        if start is None:
+            return None
+        ranges = line_ranges(f, start, size, workers * CHUNKS_PER_WORKER)
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context('spawn')) as executor:
+        results = executor.map(decode_range, [filename] * len(ranges), *zip(*ranges))
+        return [record for chunk in results for record in chunk]
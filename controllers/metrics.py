@@ -0,0 +1,469 @@
+import bisect
+import functools
+import json
+import threading
+import time
+
+
+# Latency buckets in seconds: 10us doubling up to roughly 2.6 minutes.
+LATENCY_BUCKETS = tuple(0.00001 * (2 ** i) for i in range(25))
+
+# Size buckets for byte and record counts: 1 up to roughly 1e9 in powers of 4.
+SIZE_BUCKETS = tuple(4 ** i for i in range(16))
+
+
+class Counter:
+    """A monotonically increasing counter.
+
+    Updates take a lock of their own, since the commit and compaction threads
+    update metrics while other threads export them.
+
+    Attributes:
+        name (str): Metric name.
+        description (str): Human readable description of the metric.
+        labels (dict): Label names and values identifying this series.
+        value (float): Current value of the counter.
+    """
+
+    def __init__(self, name, description='', labels=None):
+        """Initialize a new Counter.
+
+        Args:
+            name (str): Metric name.
+            description (str): Human readable description of the metric.
+            labels (dict, optional): Label names and values for this series.
+        """
+        self.name = name
+        self.description = description
+        self.labels = labels or {}
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """Increase the counter.
+
+        Args:
+            amount (float): Amount to add, defaults to 1.
+        """
+        with self._lock:
+            self.value += amount
+
+    def to_dict(self):
+        """Convert the counter to a dictionary.
+
+        Returns:
+            dict: Dictionary containing the counter name, labels and value.
+        """
+        return {'name': self.name, 'labels': self.labels, 'value': self.value}
+
+
+class Gauge(Counter):
+    """A value that can go up and down, like a queue length or a lag."""
+
+    def set(self, value):
+        """Set the gauge.
+
+        Args:
+            value (float): The new value.
+        """
+        with self._lock:
+            self.value = value
+
+
+class Histogram:
+    """A fixed-bucket histogram with percentile estimation.
+
+    Observations are counted into cumulative-style buckets so recording a value
+    is a single binary search and two additions, whatever the number of samples.
+    Observations and exports take the histogram's lock, so an export never
+    sees an observation half recorded.
+
+    Attributes:
+        name (str): Metric name.
+        description (str): Human readable description of the metric.
+        labels (dict): Label names and values identifying this series.
+        buckets (tuple): Sorted upper bounds of the buckets.
+        counts (list): Number of observations per bucket, plus one overflow slot.
+        count (int): Total number of observations.
+        sum (float): Sum of all observed values.
+        max (float): Largest observed value.
+    """
+
+    def __init__(self, name, description='', labels=None, buckets=LATENCY_BUCKETS):
+        """Initialize a new Histogram.
+
+        Args:
+            name (str): Metric name.
+            description (str): Human readable description of the metric.
+            labels (dict, optional): Label names and values for this series.
+            buckets (tuple): Sorted upper bounds of the buckets.
+        """
+        self.name = name
+        self.description = description
+        self.labels = labels or {}
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0
+        self.max = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """Record a single observation.
+
+        Args:
+            value (float): The observed value.
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def snapshot(self):
+        """Read the bucket counts, count and sum together.
+
+        Returns:
+            tuple: (counts, count, sum), consistent with each other.
+        """
+        with self._lock:
+            return list(self.counts), self.count, self.sum
+
+    def time(self):
+        """Time a block of code into this histogram.
+
+        Returns:
+            A context manager recording the elapsed seconds on exit.
+        """
+        return _Timer(self)
+
+    def percentile(self, q):
+        """Estimate a percentile from the bucket counts.
+
+        Args:
+            q (float): Percentile to estimate, between 0 and 100.
+
+        Returns:
+            float: Estimated value, interpolated linearly within the bucket
+                holding the requested rank. Returns 0 if nothing was observed.
+        """
+        if not self.count:
+            return 0
+        rank = self.count * q / 100.0
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                fraction = (rank - seen) / bucket_count
+                return min(lower + (upper - lower) * fraction, self.max)
+            seen += bucket_count
+        return self.max
+
+    def to_dict(self):
+        """Convert the histogram to a dictionary.
+
+        Returns:
+            dict: Dictionary containing counts, sum and p50/p90/p99 estimates.
+                The per bucket counts end with '+Inf', the observations above
+                the top bucket, so they add up to the count.
+        """
+        with self._lock:
+            return {
+                'name': self.name,
+                'labels': self.labels,
+                'count': self.count,
+                'sum': self.sum,
+                'max': self.max,
+                'p50': self.percentile(50),
+                'p90': self.percentile(90),
+                'p99': self.percentile(99),
+                'buckets': dict(
+                    [(str(bound), count) for bound, count in zip(self.buckets, self.counts)]
+                    + [('+Inf', self.counts[-1])]
+                ),
+            }
+
+
+class _Timer:
+    """Context manager that records its elapsed time into a histogram."""
+
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class MetricsRegistry:
+    """In-process registry of counters and histograms.
+
+    Metrics are identified by name and label values and created on first use.
+    The registry can be dumped at any time as JSON or in the Prometheus text
+    exposition format.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, kind, name, description, labels, **kwargs):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = kind(name, description, labels, **kwargs)
+                    self._metrics[key] = metric
+        return metric
+
+    def counter(self, name, description='', **labels):
+        """Get or create a counter.
+
+        Args:
+            name (str): Metric name.
+            description (str): Human readable description of the metric.
+            **labels: Label names and values identifying the series.
+
+        Returns:
+            Counter: The counter for this name and labels.
+        """
+        return self._get_or_create(Counter, name, description, labels)
+
+    def gauge(self, name, description='', **labels):
+        """Get or create a gauge.
+
+        Args:
+            name (str): Metric name.
+            description (str): Human readable description of the metric.
+            **labels: Label names and values identifying the series.
+
+        Returns:
+            Gauge: The gauge for this name and labels.
+        """
+        return self._get_or_create(Gauge, name, description, labels)
+
+    def histogram(self, name, description='', buckets=LATENCY_BUCKETS, **labels):
+        """Get or create a histogram.
+
+        Args:
+            name (str): Metric name.
+            description (str): Human readable description of the metric.
+            buckets (tuple): Sorted bucket upper bounds, used on creation only.
+            **labels: Label names and values identifying the series.
+
+        Returns:
+            Histogram: The histogram for this name and labels.
+        """
+        return self._get_or_create(Histogram, name, description, labels, buckets=buckets)
+
+    def time(self, name, description='', **labels):
+        """Time a block of code into a latency histogram.
+
+        Args:
+            name (str): Histogram name.
+            description (str): Human readable description of the metric.
+            **labels: Label names and values identifying the series.
+
+        Returns:
+            A context manager recording the elapsed seconds on exit.
+        """
+        return self.histogram(name, description, **labels).time()
+
+    def instrument(self, obj, method_names, name, description=''):
+        """Wrap methods of an object so every call is counted and timed.
+
+        The wrappers are installed as instance attributes, so only the given
+        object is affected. Each method gets its own histogram labelled with
+        ``operation=<method name>`` and a matching error counter.
+
+        Args:
+            obj: Object whose methods should be instrumented.
+            method_names (iterable): Names of the methods to wrap.
+            name (str): Histogram name shared by all wrapped methods.
+            description (str): Human readable description of the metric.
+        """
+        for method_name in method_names:
+            method = getattr(obj, method_name)
+            histogram = self.histogram(name, description, operation=method_name)
+            errors = self.counter(
+                name.replace('_seconds', '') + '_errors_total',
+                'Calls that raised an exception',
+                operation=method_name
+            )
+            setattr(obj, method_name, _timed(method, histogram, errors))
+
+    def to_dict(self):
+        """Convert all metrics to a dictionary.
+
+        Returns:
+            dict: Dictionary with 'counters', 'gauges' and 'histograms' lists.
+        """
+        counters = []
+        gauges = []
+        histograms = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            if isinstance(metric, Histogram):
+                histograms.append(metric.to_dict())
+            elif isinstance(metric, Gauge):
+                gauges.append(metric.to_dict())
+            else:
+                counters.append(metric.to_dict())
+        return {'counters': counters, 'gauges': gauges, 'histograms': histograms}
+
+    def to_json(self, indent=2):
+        """Dump all metrics as JSON.
+
+        Args:
+            indent (int): Indentation passed to json.dumps.
+
+        Returns:
+            str: JSON document describing all metrics.
+        """
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self):
+        """Dump all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: Metrics in Prometheus text format.
+        """
+        lines = []
+        described = set()
+        with self._lock:
+            items = sorted(self._metrics.items(), key=lambda item: item[0])
+        for (name, _), metric in items:
+            if name not in described:
+                described.add(name)
+                if isinstance(metric, Histogram):
+                    kind = 'histogram'
+                elif isinstance(metric, Gauge):
+                    kind = 'gauge'
+                else:
+                    kind = 'counter'
+                if metric.description:
+                    lines.append(f"# HELP {name} {metric.description}")
+                lines.append(f"# TYPE {name} {kind}")
+            if isinstance(metric, Histogram):
+                counts, total_count, total = metric.snapshot()
+                cumulative = 0
+                for bound, count in zip(metric.buckets, counts):
+                    cumulative += count
+                    labels = _format_labels(metric.labels, le=repr(float(bound)))
+                    lines.append(f"{name}_bucket{labels} {cumulative}")
+                labels = _format_labels(metric.labels, le='+Inf')
+                lines.append(f"{name}_bucket{labels} {total_count}")
+                lines.append(f"{name}_sum{_format_labels(metric.labels)} {total}")
+                lines.append(f"{name}_count{_format_labels(metric.labels)} {total_count}")
+            else:
+                lines.append(f"{name}{_format_labels(metric.labels)} {metric.value}")
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, filename, fmt='json'):
+        """Write all metrics to a file.
+
+        Args:
+            filename (str): Path of the file to write.
+            fmt (str): Either 'json' or 'prometheus'.
+
+        Raises:
+            ValueError: If the format is not recognized.
+        """
+        if fmt == 'json':
+            content = self.to_json()
+        elif fmt == 'prometheus':
+            content = self.to_prometheus()
+        else:
+            raise ValueError(f"Unknown metrics format: {fmt}")
+        with open(filename, 'w') as f:
+            f.write(content)
+
+
+def _timed(method, histogram, errors):
+    """Wrap a callable so each call is timed and failures are counted."""
+    perf_counter = time.perf_counter
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            histogram.observe(perf_counter() - start)
+
+    return wrapper
+
+
+def _format_labels(labels, **extra):
+    """Format label values as a Prometheus label set."""
+    items = list(labels.items()) + list(extra.items())
+    if not items:
+        return ''
+    body = ','.join(
+        '{}="{}"'.format(
+            key,
+            str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        )
+        for key, value in items
+    )
+    return '{' + body + '}'
+
+
+def start_http_server(registry, host='127.0.0.1', port=9464):
+    """Serve metrics over HTTP from a background thread.
+
+    ``/metrics`` returns the Prometheus text format and ``/metrics.json``
+    returns the JSON dump.
+
+    Args:
+        registry (MetricsRegistry): Registry to expose.
+        host (str): Interface to bind to.
+        port (int): Port to listen on, 0 picks a free port.
+
+    Returns:
+        ThreadingHTTPServer: The running server. Call shutdown() to stop it.
+    """
+    # Imported here so applications that never serve metrics don't pay for it
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/metrics':
+                body = registry.to_prometheus().encode('utf-8')
+                content_type = 'text/plain; version=0.0.4'
+            elif self.path == '/metrics.json':
+                body = registry.to_json().encode('utf-8')
+                content_type = 'application/json'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
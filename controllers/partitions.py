@@ -0,0 +1,230 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from controllers.indexes import RecordIndex
+from models import storage
+from models.dates import month_key
+
+
+class MonthPartitionIndex(RecordIndex):
+    """IDs of the in-memory flights, partitioned by the month of their date.
+
+    Lets date range queries and archiving visit only the flights of the
+    months involved instead of every record.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._months = {}
+
+    def clear(self):
+        self._months = {}
+
+    def add(self, record):
+        if record.get('type') != 'flight':
+            return
+        month = month_key(record.get('date'))
+        if month is not None:
+            self._months.setdefault(month, set()).add(record['id'])
+
+    def remove(self, record):
+        if record.get('type') != 'flight':
+            return
+        month = month_key(record.get('date'))
+        ids = self._months.get(month)
+        if ids is not None:
+            ids.discard(record['id'])
+            if not ids:
+                del self._months[month]
+
+    def update(self, old, new):
+        if old.get('date') != new.get('date') or old.get('type') != new.get('type'):
+            self.remove(old)
+            self.add(new)
+
+    def months(self):
+        """Get the months holding in-memory flights.
+
+        Returns:
+            list: The months as 'YYYY-MM', in ascending order.
+        """
+        return sorted(self._months)
+
+    def ids(self, month):
+        """Get the IDs of the in-memory flights of a month.
+
+        Args:
+            month (str): The month as 'YYYY-MM'.
+
+        Returns:
+            set: The flight IDs. The set is a copy.
+        """
+        return set(self._months.get(month, ()))
+
+
+class FlightArchive:
+    """Read-only monthly partitions of historical flights on disk.
+
+    Each archived month is one compressed file, listed in a manifest with its
+    flight count, so the archive can be queried without opening partitions
+    outside the requested range. Partitions that were read are kept in a
+    small LRU cache.
+
+    Attributes:
+        directory (str): Directory holding the partitions and the manifest.
+        codec (str): Compression codec of the partition files.
+    """
+
+    MANIFEST = 'manifest.json'
+
+    # Reference fields whose values are counted per partition in the manifest
+    REFERENCES = ('client_id', 'airline_id')
+
+    def __init__(self, directory, codec='gzip', level=None, cache_size=12):
+        """Initialize a new FlightArchive.
+
+        Args:
+            directory (str): Directory for the archive, created on first write.
+            codec (str): Compression codec for the partition files.
+            level (int, optional): Compression level.
+            cache_size (int): Number of partitions kept in memory after reading.
+        """
+        self.directory = directory
+        self.codec = storage.check_codec(codec)
+        self.level = level
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._manifest = None
+
+    @property
+    def manifest(self):
+        """dict: File name, flight count, highest ID and reference counts of
+        each archived month."""
+        if self._manifest is None:
+            filename = os.path.join(self.directory, self.MANIFEST)
+            if os.path.exists(filename):
+                with open(filename, encoding='utf-8') as f:
+                    self._manifest = json.load(f)
+            else:
+                self._manifest = {}
+        return self._manifest
+
+    def months(self):
+        """Get the archived months.
+
+        Returns:
+            list: The months as 'YYYY-MM', in ascending order.
+        """
+        return sorted(self.manifest)
+
+    def count(self):
+        """Get the number of archived flights.
+
+        Returns:
+            int: Flights in all partitions.
+        """
+        return sum(entry['count'] for entry in self.manifest.values())
+
+    def max_id(self):
+        """Get the highest archived flight ID, so IDs are never reused.
+
+        Returns:
+            int: The highest ID, 0 if the archive is empty.
+        """
+        return max((entry['max_id'] for entry in self.manifest.values()), default=0)
+
+    def count_references(self, field, record_id):
+        """Count the archived flights referring to a record.
+
+        Args:
+            field (str): Reference field, e.g. 'client_id'.
+            record_id (int): ID of the referenced record.
+
+        Returns:
+            int: Number of archived flights whose field holds record_id.
+        """
+        total = 0
+        for month, entry in self.manifest.items():
+            refs = entry.get('refs')
+            if refs is None:
+                # Listed before reference counts were kept, count from the file
+                total += sum(1 for record in self.load(month) if record.get(field) == record_id)
+            else:
+                total += refs.get(field, {}).get(str(record_id), 0)
+        return total
+
+    def refresh(self):
+        """Forget the cached manifest and partitions after the files changed."""
+        with self._lock:
+            self._manifest = None
+            self._cache.clear()
+
+    def write(self, month, records):
+        """Add flights to the partition of a month.
+
+        Flights already in the partition are replaced by ID. The partition
+        file is written atomically before the manifest lists it.
+
+        Args:
+            month (str): The month as 'YYYY-MM'.
+            records (list): Flight records of that month.
+        """
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            merged = {record['id']: record for record in self._read(month)}
+            for record in records:
+                merged[record['id']] = record
+            partition = sorted(merged.values(), key=lambda record: record['id'])
+            name = storage.codec_filename(f"flights-{month}.json", self.codec)
+            storage.save(
+                partition, os.path.join(self.directory, name), self.codec, self.level,
+                keep_previous=False
+            )
+            manifest = dict(self.manifest)
+            refs = {field: {} for field in self.REFERENCES}
+            for record in partition:
+                for field, counts in refs.items():
+                    value = record.get(field)
+                    if value is not None:
+                        counts[str(value)] = counts.get(str(value), 0) + 1
+            manifest[month] = {
+                'file': name, 'count': len(partition), 'max_id': partition[-1]['id'],
+                'refs': refs,
+            }
+            storage.write_atomic(
+                os.path.join(self.directory, self.MANIFEST),
+                json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8')
+            )
+            self._manifest = manifest
+            self._cache.pop(month, None)
+
+    def load(self, month):
+        """Get the flights of an archived month.
+
+        Args:
+            month (str): The month as 'YYYY-MM'.
+
+        Returns:
+            list: The flight records, an empty list if the month is not archived.
+                The records are shared with the cache and must not be modified.
+        """
+        with self._lock:
+            records = self._cache.get(month)
+            if records is not None:
+                self._cache.move_to_end(month)
+                return records
+            records = self._read(month)
+            if self.cache_size > 0:
+                self._cache[month] = records
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            return records
+
+    def _read(self, month):
+        entry = self.manifest.get(month)
+        if entry is None:
+            return []
+        return storage.load(os.path.join(self.directory, entry['file']))
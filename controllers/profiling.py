@@ -0,0 +1,237 @@
+import cProfile
+import functools
+import io
+import itertools
+import os
+import threading
+import time
+import tracemalloc
+
+
+# Short names accepted for scoped profiling, mapped to the methods they cover
+OPERATION_ALIASES = {
+    'save': '_save_records',
+    'load': '_load_records',
+}
+
+_sequence = itertools.count(1)
+
+
+class Profiler:
+    """Optional cProfile and tracemalloc profiling for an application session.
+
+    A session profile covers everything between start_session() and
+    stop_session(). Individual operations can also be profiled on their own:
+    operations listed in ``operations`` are profiled on every call, and
+    operations passed to arm() are profiled on their next call only.
+
+    Each profile is written to ``output_dir`` as a ``.prof`` file readable by
+    pstats/snakeviz, a ``-stats.txt`` summary sorted by cumulative time and an
+    ``-alloc.txt`` report of the top-N allocation sites.
+
+    cProfile only follows the thread that enables it, so the session profile
+    covers the thread that called start_session() and nothing else. Saves
+    running on the group-commit thread are missing from it; profile them as
+    an operation ('save'), which is profiled in whichever thread runs it.
+
+    Attributes:
+        output_dir (str): Directory receiving the profile files.
+        top_n (int): Number of entries in the text reports.
+        operations (set): Operation names profiled on every call.
+        session (bool): Whether the whole session should be profiled.
+    """
+
+    def __init__(self, output_dir, top_n=25, operations=(), session=True):
+        """Initialize a new Profiler.
+
+        Args:
+            output_dir (str): Directory receiving the profile files.
+            top_n (int): Number of entries in the text reports.
+            operations (iterable): Operation names profiled on every call.
+                Accepts method names or the aliases 'save' and 'load'.
+            session (bool): Whether the whole session should be profiled.
+        """
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.operations = {OPERATION_ALIASES.get(name, name) for name in operations}
+        self.session = session
+        self._armed = set()
+        self._session = None
+        self._session_name = None
+        self._session_thread = None
+        # Per thread flag set while a scoped profile runs in that thread
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls, environ=None):
+        """Create a profiler from environment variables.
+
+        ``AIRLINE_PROFILE`` names the output directory and enables session
+        profiling. ``AIRLINE_PROFILE_OPS`` is a comma separated list of
+        operations to profile individually, ``AIRLINE_PROFILE_TOP`` sets the
+        report length.
+
+        Args:
+            environ (dict, optional): Environment to read, defaults to os.environ.
+
+        Returns:
+            Profiler: A configured profiler, or None if neither variable is set.
+        """
+        environ = os.environ if environ is None else environ
+        output_dir = environ.get('AIRLINE_PROFILE', '')
+        operations = [op.strip() for op in environ.get('AIRLINE_PROFILE_OPS', '').split(',') if op.strip()]
+        if not output_dir and not operations:
+            return None
+        return cls(
+            output_dir or 'profiles',
+            top_n=int(environ.get('AIRLINE_PROFILE_TOP', 25)),
+            operations=operations,
+            session=bool(output_dir)
+        )
+
+    def _path(self, name, suffix):
+        os.makedirs(self.output_dir, exist_ok=True)
+        return os.path.join(self.output_dir, f"{name}{suffix}")
+
+    def start_session(self):
+        """Start profiling the whole session."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._session_name = time.strftime("session-%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+        self._session = cProfile.Profile()
+        self._session_thread = threading.get_ident()
+        self._session.enable()
+
+    def stop_session(self):
+        """Stop session profiling and write its reports.
+
+        Returns:
+            str: Path of the written .prof file, or None if no session was active.
+        """
+        if self._session is None:
+            return None
+        self._session.disable()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        path = self._write_reports(self._session_name, self._session, snapshot)
+        self._session = None
+        return path
+
+    def arm(self, operation):
+        """Profile the next call of an operation.
+
+        Args:
+            operation (str): Method name or one of the aliases 'save' and 'load'.
+        """
+        with self._lock:
+            self._armed.add(OPERATION_ALIASES.get(operation, operation))
+
+    def profile(self, name):
+        """Profile a block of code on its own.
+
+        While a session profile is running in the same thread it is paused
+        for the duration of the block, since only one cProfile profiler can
+        be active per thread.
+
+        Args:
+            name (str): Name used for the output files.
+
+        Returns:
+            A context manager that writes the reports on exit.
+        """
+        return _ScopedProfile(self, name)
+
+    def wrap(self, obj, method_names):
+        """Wrap methods of an object so they can be profiled on demand.
+
+        The wrapper only checks a set membership unless the operation is
+        listed in ``operations`` or has been armed.
+
+        Args:
+            obj: Object whose methods should be wrapped.
+            method_names (iterable): Names of the methods to wrap.
+        """
+        for method_name in method_names:
+            method = getattr(obj, method_name)
+            setattr(obj, method_name, self._wrap_method(method_name, method))
+
+    def _wrap_method(self, method_name, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if getattr(self._local, 'scoped', False) or (method_name not in self.operations and method_name not in self._armed):
+                # Nested calls are covered by the enclosing scoped profile
+                return method(*args, **kwargs)
+            with self._lock:
+                self._armed.discard(method_name)
+            with self.profile(method_name.lstrip('_')):
+                return method(*args, **kwargs)
+
+        return wrapper
+
+    def _write_reports(self, name, profile, snapshot, baseline=None):
+        prof_path = self._path(name, '.prof')
+        profile.dump_stats(prof_path)
+
+        import pstats
+        stream = io.StringIO()
+        stats = pstats.Stats(profile, stream=stream)
+        stats.sort_stats('cumulative').print_stats(self.top_n)
+        with open(self._path(name, '-stats.txt'), 'w') as f:
+            f.write(stream.getvalue())
+
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        if baseline is not None:
+            statistics = snapshot.compare_to(baseline, 'lineno')
+        else:
+            statistics = snapshot.statistics('lineno')
+        with open(self._path(name, '-alloc.txt'), 'w') as f:
+            f.write(f"Top {self.top_n} allocation sites for {name}\n")
+            for stat in statistics[:self.top_n]:
+                f.write(f"{stat}\n")
+        print(f"Profile written to {prof_path}")
+        return prof_path
+
+
+class _ScopedProfile:
+    """Context manager profiling a single block for a Profiler."""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = f"op-{name}-{time.strftime('%Y%m%d-%H%M%S')}-{next(_sequence)}"
+        self.profile = cProfile.Profile()
+        self.started_tracing = False
+        self.baseline = None
+
+    def _session(self):
+        """The session profile if it runs in the current thread, else None."""
+        if self.profiler._session_thread != threading.get_ident():
+            return None
+        return self.profiler._session
+
+    def __enter__(self):
+        session = self._session()
+        if session is not None:
+            session.disable()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        self.baseline = tracemalloc.take_snapshot()
+        self.profiler._local.scoped = True
+        self.profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profile.disable()
+        self.profiler._local.scoped = False
+        snapshot = tracemalloc.take_snapshot()
+        if self.started_tracing:
+            tracemalloc.stop()
+        self.profiler._write_reports(self.name, self.profile, snapshot, self.baseline)
+        session = self._session()
+        if session is not None:
+            session.enable()
+        return False
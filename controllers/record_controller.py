@@ -1,7 +1,62 @@
+import atexit
+import base64
+import json
 import os
-from models.client import Client
-from models.airline import Airline
-from models.flight import Flight
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from models import BaseModel, registry
+# Imported for their registration with the model registry
+from models import client, airline, flight  # noqa: F401
+from models.dates import to_epoch, month_key, shift_month
+from models import storage, geo
+from models.validation import validate_batch
+from controllers.metrics import MetricsRegistry, SIZE_BUCKETS
+from controllers.group_commit import GroupCommitter
+from controllers.journal import MutationLog, Compactor, apply_entry
+from controllers.cache import ModelCache
+from controllers.snapshots import VersionHistory, ReadView
+from controllers.partitions import MonthPartitionIndex, FlightArchive
+from controllers.routes import RouteGraph
+from controllers.bookings import BookingIndex
+from controllers.search import TextIndex
+from controllers.browse import Window, ResultSets, display_value, sort_key
+from controllers.changefeed import ChangeFeed
+from controllers.replication import LogShipper, REPLICA_STATE
+from controllers.indexes import ForeignKeyIndex, IdOrderIndex, ChangeCounter
+from controllers import dedupe, loading
+from controllers.reporting import ReportingViews
+
+
+class IntegrityError(ValueError):
+    """Raised when a change would break a reference between records."""
+
+
+class ReadOnlyError(RuntimeError):
+    """Raised when records are changed through a controller of a follower."""
+
+
+class BookingConflictError(IntegrityError):
+    """Raised when a flight would overlap another flight of the same client.
+
+    Attributes:
+        conflicts (list): IDs of the overlapping flights.
+    """
+
+    def __init__(self, message, conflicts):
+        super().__init__(message)
+        self.conflicts = conflicts
+
+
+Page = namedtuple('Page', ['records', 'next_cursor'])
+Page.__doc__ = """One page of records returned by RecordController.get_page().
+
+Attributes:
+    records (list): Copies of the records on the page, in ID order.
+    next_cursor (str): Token resuming after the last record of the page, or
+        None when there are no more records.
+"""
 
 
 class RecordController:
@@ -14,20 +69,278 @@ class RecordController:
     Attributes:
         data_dir (str): Directory path for storing data files.
         records_file (str): Path to the JSON file storing all records.
+        codec (str): Compression codec used when saving the records file.
+        compression_level (int): Compression level, None for the codec default.
         records (list): List of all records in memory.
+        on_delete (dict): Delete policy of each reference field.
+        on_overlap (str): What happens when a client is booked on overlapping
+            flights, 'reject' or 'flag'.
+        bookings (BookingIndex): Flight times of each client.
+        text (TextIndex): Words of the searchable fields of every record.
+        change_feed (ChangeFeed): Feed of every change for downstream
+            consumers, None when disabled.
+        shipper (LogShipper): Ships the mutation log to a follower, None
+            when replication is disabled.
+        read_only (bool): Whether the data directory belongs to a follower,
+            whose records only change by replication until it is promoted.
+        foreign_keys (dict): ForeignKeyIndex of each reference field.
+        reports (ReportingViews): Live flight counts per airline, client,
+            route and month.
+        metrics (MetricsRegistry): Registry collecting operation and storage metrics.
     """
+
+    # Public operations that are counted and timed by the metrics registry
+    INSTRUMENTED_OPERATIONS = (
+        'create_record',
+        'delete_record',
+        'update_record',
+        'search_record',
+        'search_text',
+        'get_records',
+        'get_all_records',
+        'get_page',
+        'browse',
+        'get_model',
+        'query_flights',
+        'mileage',
+        'find_itineraries',
+        'find_booking_conflicts',
+        'archive',
+        'import_records',
+        'reload',
+        'find_duplicate_clients',
+        'merge_clients',
+        'verify_reports',
+        'compact',
+    )
+
+    # Reference fields of flight records and the record type they point to
+    REFERENCES = {
+        'client_id': 'client',
+        'airline_id': 'airline',
+    }
+
+    # What happens to referencing flights when a client or airline is deleted:
+    # 'restrict' refuses the delete, 'cascade' deletes the flights and
+    # 'nullify' clears the reference field
+    DEFAULT_ON_DELETE = {
+        'client_id': 'cascade',
+        'airline_id': 'restrict',
+    }
+
+    # What happens when a flight overlaps another flight of its client:
+    # 'flag' accepts it with a warning and 'reject' refuses the change. The
+    # GUI books flights at the current time, so rejecting is opt-in.
+    DEFAULT_ON_OVERLAP = 'flag'
+
+    # Methods that can be profiled individually, including the storage calls
+    PROFILED_OPERATIONS = INSTRUMENTED_OPERATIONS + ('_save_records', '_load_records')
     
-    def __init__(self):
+    def __init__(self, data_dir=None, metrics=None, codec=None, compression_level=None,
+                 commit_window=None, on_delete=None, journal=None,
+                 compact_min_bytes=None, compact_ratio=None, model_cache_size=None,
+                 hot_months=None, on_overlap=None, change_feed=None, ship_to=None,
+                 load_workers=None):
         """Initialize the record controller.
         
-        Sets up the data directory and records file, then loads existing records
-        from the JSON file.
+        Sets up the data directory and records file. Existing records are
+        loaded from the JSON file on first access rather than here, so
+        creating a controller is cheap for commands that never touch them.
+
+        Args:
+            data_dir (str, optional): Directory for the data files. Defaults to
+                the 'data' directory next to the application.
+            metrics (MetricsRegistry, optional): Registry to report metrics to.
+                A private registry is created if none is given.
+            codec (str, optional): Compression codec for the records file, one of
+                'none', 'gzip', 'bz2' or 'lzma'. Defaults to the
+                AIRLINE_STORAGE_CODEC environment variable, or no compression.
+            compression_level (int, optional): Compression level, higher values
+                spend more CPU for less I/O. Defaults to AIRLINE_STORAGE_LEVEL.
+            commit_window (float, optional): Seconds during which saves are
+                grouped into a single write and fsync. 0 saves synchronously
+                on every mutation. Defaults to AIRLINE_COMMIT_WINDOW or 0.05.
+            on_delete (dict, optional): Delete policy per reference field,
+                overriding DEFAULT_ON_DELETE, e.g. {'airline_id': 'cascade'}.
+            journal (bool, optional): Append mutations to a log instead of
+                rewriting the records file on every save; the records file is
+                then rewritten by background compactions. Defaults to the
+                AIRLINE_JOURNAL environment variable, or enabled.
+            compact_min_bytes (int, optional): Log size below which no
+                compaction is started. Defaults to AIRLINE_COMPACT_BYTES or 1 MiB.
+            compact_ratio (float, optional): Compact once the log is at least
+                this fraction of the records file size. Defaults to
+                AIRLINE_COMPACT_RATIO or 0.5.
+            model_cache_size (int, optional): Number of model instances kept
+                by get_model(). Defaults to AIRLINE_MODEL_CACHE or 1024.
+            hot_months (int, optional): Keep flights of the current and this
+                many previous months in memory; compactions move older months
+                to the cold archive. Defaults to AIRLINE_HOT_MONTHS, or no
+                automatic archiving.
+            on_overlap (str, optional): Overlapping flights policy, 'reject'
+                or 'flag'. Defaults to AIRLINE_ON_OVERLAP or DEFAULT_ON_OVERLAP.
+            change_feed (bool, optional): Write every change, with the record
+                before and after it, to a durable feed in the 'changes'
+                directory. Defaults to the AIRLINE_CHANGE_FEED environment
+                variable, or disabled.
+            ship_to (str, optional): Shipping directory of a follower to ship
+                the mutation log to. Defaults to the AIRLINE_SHIP_TO
+                environment variable, or no replication.
+            load_workers (int, optional): Number of processes decoding a large
+                records file at load. Defaults to AIRLINE_LOAD_WORKERS or the
+                number of CPUs; 1 always loads in this process.
+
+        Raises:
+            ValueError: If a delete or overlap policy is not recognized, or
+                replication is requested without the journal.
         """
-        self.data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
-        self.records_file = os.path.join(self.data_dir, 'records.json')
-        self.records = []
+        if data_dir is None:
+            data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+        if compression_level is None and os.environ.get('AIRLINE_STORAGE_LEVEL'):
+            compression_level = int(os.environ['AIRLINE_STORAGE_LEVEL'])
+        self.data_dir = data_dir
+        self.codec = storage.check_codec(codec or os.environ.get('AIRLINE_STORAGE_CODEC'))
+        self.compression_level = compression_level
+        self.records_file = storage.codec_filename(
+            os.path.join(self.data_dir, 'records.json'), self.codec
+        )
+        if commit_window is None:
+            commit_window = float(os.environ.get('AIRLINE_COMMIT_WINDOW', 0.05))
+        if journal is None:
+            journal = os.environ.get('AIRLINE_JOURNAL', '1') != '0'
+        if compact_min_bytes is None:
+            compact_min_bytes = int(os.environ.get('AIRLINE_COMPACT_BYTES', 1 << 20))
+        if compact_ratio is None:
+            compact_ratio = float(os.environ.get('AIRLINE_COMPACT_RATIO', 0.5))
+        self.compact_min_bytes = compact_min_bytes
+        self.compact_ratio = compact_ratio
+        self.meta_file = os.path.join(self.data_dir, 'records.meta')
+        self._log = MutationLog(os.path.join(self.data_dir, 'records.log')) if journal else None
+        if change_feed is None:
+            change_feed = os.environ.get('AIRLINE_CHANGE_FEED', '0') != '0'
+        self.changes_dir = os.path.join(self.data_dir, 'changes')
+        self.change_feed = ChangeFeed(self.changes_dir) if change_feed else None
+        self._change_seq = self.change_feed.last_seq if change_feed else 0
+        self._pending_changes = []
+        ship_to = ship_to or os.environ.get('AIRLINE_SHIP_TO')
+        if ship_to and self._log is None:
+            raise ValueError("Log shipping requires the journal")
+        self.shipper = LogShipper(ship_to) if ship_to else None
+        self.read_only = os.path.exists(os.path.join(self.data_dir, REPLICA_STATE))
+        # Only the owner of the log may cut off a damaged end
+        self._repair_log = not self.read_only
+        if load_workers is None:
+            load_workers = int(os.environ.get('AIRLINE_LOAD_WORKERS', os.cpu_count() or 1))
+        self.load_workers = load_workers
+        self.on_delete = dict(self.DEFAULT_ON_DELETE, **(on_delete or {}))
+        for field, policy in self.on_delete.items():
+            if field not in self.REFERENCES or policy not in ('restrict', 'cascade', 'nullify'):
+                raise ValueError(f"Invalid delete policy for {field}: {policy}")
+        self.on_overlap = on_overlap or os.environ.get('AIRLINE_ON_OVERLAP', self.DEFAULT_ON_OVERLAP)
+        if self.on_overlap not in ('reject', 'flag'):
+            raise ValueError(f"Invalid overlap policy: {self.on_overlap}")
+        if model_cache_size is None:
+            model_cache_size = int(os.environ.get('AIRLINE_MODEL_CACHE', 1024))
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.models = ModelCache(
+            model_cache_size,
+            self.metrics.counter('model_cache_hits_total', 'get_model() calls served from the cache'),
+            self.metrics.counter('model_cache_misses_total', 'get_model() calls building a model'),
+        )
+        if hot_months is None and os.environ.get('AIRLINE_HOT_MONTHS'):
+            hot_months = int(os.environ['AIRLINE_HOT_MONTHS'])
+        self.hot_months = hot_months
+        self.archive_store = FlightArchive(
+            os.path.join(self.data_dir, 'archive'), level=self.compression_level
+        )
+        self.partitions = MonthPartitionIndex()
+        self.routes = RouteGraph()
+        self.bookings = BookingIndex()
+        self.text = TextIndex()
+        self.foreign_keys = {field: ForeignKeyIndex(field) for field in self.REFERENCES}
+        self.reports = ReportingViews()
+        self._order = IdOrderIndex()
+        self._changes = ChangeCounter()
+        self._indexes = (
+            [self._order, self._changes]
+            + list(self.foreign_keys.values())
+            + list(self.reports.views.values())
+            + [self.partitions, self.routes, self.bookings, self.text, self.models]
+        )
+        self._records = {}
+        self._max_id = 0
+        self._loaded = False
+        self._seq = 0
+        self._snapshot_seq = 0
+        self._pending = []
+        self._log_bytes = 0
+        self._generation = 0
+        self._history = VersionHistory()
+        self._open_views = {}
+        self._result_sets = ResultSets()
+        self._lock = threading.RLock()
+        self._commit_lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._setup_metrics()
         self._ensure_data_directory()
-        self._load_records()
+        self._committer = GroupCommitter(
+            lambda: self._save_records(),
+            commit_window,
+            self.metrics.histogram(
+                'storage_commit_batch_size',
+                'Mutations covered by each save',
+                SIZE_BUCKETS
+            )
+        )
+        self._compactor = Compactor(self.compact, background=commit_window > 0)
+        atexit.register(self.close)
+
+    def _setup_metrics(self):
+        """Instrument the public operations and create the storage metrics.
+
+        Metric objects are looked up once here so the hot paths only pay for
+        an attribute access and an observe call.
+        """
+        self.metrics.instrument(
+            self,
+            self.INSTRUMENTED_OPERATIONS,
+            'controller_operation_seconds',
+            'Latency of RecordController operations'
+        )
+        self._save_timer = self.metrics.histogram(
+            'storage_operation_seconds', 'Latency of record persistence', operation='save'
+        )
+        self._load_timer = self.metrics.histogram(
+            'storage_operation_seconds', 'Latency of record persistence', operation='load'
+        )
+        self._compact_timer = self.metrics.histogram(
+            'storage_operation_seconds', 'Latency of record persistence', operation='compact'
+        )
+        self._replayed = self.metrics.counter(
+            'journal_entries_replayed_total', 'Mutation log entries replayed at load'
+        )
+        self._load_processes = self.metrics.gauge(
+            'storage_load_processes', 'Processes that decoded the records file at the last load'
+        )
+        self._load_problems = self.metrics.counter(
+            'storage_load_integrity_problems_total',
+            'Broken references and overlapping flights found in loaded records'
+        )
+        self._flagged = self.metrics.counter(
+            'booking_conflicts_total', 'Overlapping flights accepted under the flag policy'
+        )
+        self._bytes_written = self.metrics.counter(
+            'storage_bytes_written_total', 'Bytes written to the records file'
+        )
+        self._bytes_read = self.metrics.counter(
+            'storage_bytes_read_total', 'Bytes read from the records file'
+        )
+        self._scanned = {
+            query: self.metrics.histogram(
+                'records_scanned', 'Records examined per query', SIZE_BUCKETS, query=query
+            )
+            for query in ('search_record', 'get_all_records')
+        }
     
     def _ensure_data_directory(self):
         """Ensure the data directory and records file exist.
@@ -39,71 +352,484 @@ class RecordController:
             print(f"Creating data directory: {self.data_dir}")
             os.makedirs(self.data_dir)
         
-        if not os.path.exists(self.records_file):
+        if self._source_file() is None:
             print(f"Creating records file: {self.records_file}")
-            with open(self.records_file, 'w') as f:
-                f.write('[]')  # Initialize with empty JSON array
+            BaseModel.save_records([], self.records_file, self.codec, self.compression_level)
+
+    def _source_file(self):
+        """Get the records file to load from.
+
+        Falls back to a file written with another codec, so changing the codec
+        setting keeps existing data. The next save writes the new format.
+
+        Returns:
+            str: Path of the file to load, or None if no records file exists.
+        """
+        if os.path.exists(self.records_file):
+            return self.records_file
+        return storage.find_existing(os.path.join(self.data_dir, 'records.json'))
     
     def _load_records(self):
         """Load records from the JSON file and convert them to appropriate model types.
         
-        Reads the records file and converts each record to its appropriate model type
-        (Client, Airline, or Flight) based on the record type field.
+        Reads the records file and normalizes each record with the generated
+        serializer of its model type (Client, Airline, or Flight), looked up
+        in the model registry by the record type field, in worker processes
+        for large files. The mutation log entries made since the snapshot are
+        then replayed on top.
         
         Note:
             If there are any errors loading individual records, they are logged
             and skipped, allowing the loading process to continue.
+
+        Raises:
+            ValueError: If neither generation of the records file can be decoded.
+            PermissionError: If the records file is not readable.
         """
         try:
-            print(f"Loading records from {self.records_file}")
-            if not os.path.exists(self.records_file):
+            source_file = self._source_file()
+            print(f"Loading records from {source_file}")
+            if source_file is None:
                 print(f"Records file does not exist: {self.records_file}")
-                self.records = []
-                return
-            
-            if not os.access(self.records_file, os.R_OK):
-                print(f"Records file is not readable: {self.records_file}")
-                self.records = []
-                return
-
-            raw_records = Client.load_records(self.records_file)
-            print(f"Raw records loaded: {raw_records}")
-            self.records = []
-            
-            for record in raw_records:
-                record_type = record.get('type', '').lower()
-                print(f"Processing record: {record}")
-                try:
-                    if record_type == 'client':
-                        self.records.append(Client.from_dict(record).to_dict())
-                    elif record_type == 'airline':
-                        self.records.append(Airline.from_dict(record).to_dict())
-                    elif record_type == 'flight':
-                        self.records.append(Flight.from_dict(record).to_dict())
-                except Exception as e:
-                    print(f"Error loading record: {e}")
-                    continue
-            print(f"Final loaded records: {self.records}")
+                records = []
+            elif not os.access(source_file, os.R_OK):
+                raise PermissionError(f"Records file is not readable: {source_file}")
+            else:
+                with self._load_timer.time():
+                    records = self._read_snapshot(source_file)
+                self._bytes_read.inc(os.path.getsize(source_file))
+            self._set_records(self._replay_log(records))
+            self._check_loaded()
+            if self.shipper is not None and self.shipper.last_seq != self._seq:
+                # The shipped log does not continue from here, start from a base
+                self.shipper.rebase(
+                    list(self._records.values()), self._seq, self.archive_store.directory
+                )
         except Exception as e:
+            # Loading as empty would let the next save or compaction replace
+            # the records file and cut the log, losing the real data
             print(f"Error loading records file: {e}")
-            self.records = []
+            raise
+
+    def _read_snapshot(self, source_file):
+        """Read and normalize the records of a snapshot file.
+
+        Uncompressed files of at least loading.PARALLEL_LOAD_BYTES are cut
+        into chunks of whole record lines, which load_workers processes
+        decode and normalize side by side. Compressed files, files in another
+        layout, and truncated or damaged ones are streamed serially, which
+        also falls back to the previous generation.
+
+        Args:
+            source_file (str): Path of the records file.
+
+        Returns:
+            list: The normalized records, in file order.
+        """
+        if self.load_workers > 1 and os.path.getsize(source_file) >= loading.PARALLEL_LOAD_BYTES:
+            try:
+                records = loading.load_parallel(source_file, self.load_workers)
+            except Exception as e:
+                print(f"Parallel load failed, loading serially: {e}")
+                records = None
+            if records is not None:
+                print(f"Loaded {len(records)} records with {self.load_workers} processes")
+                self._load_processes.set(self.load_workers)
+                return records
+        self._load_processes.set(1)
+        return loading.normalize_records(BaseModel.load_records(source_file, strict=True))
+
+    def _check_loaded(self):
+        """Report integrity problems of the records just loaded.
+
+        Loaded records go through the checks every change goes through: each
+        flight must refer to existing records of the right types, and no
+        client may be booked on overlapping flights. Stored records are
+        reported rather than refused, so older data still loads.
+
+        Returns:
+            int: Number of problems found.
+        """
+        problems = 0
+        for flight_id in self._order.ids('flight'):
+            try:
+                self._check_references(self._records[flight_id])
+            except IntegrityError as e:
+                print(f"Loaded flight {flight_id}: {e}")
+                problems += 1
+        conflicts = self.bookings.audit()
+        if conflicts:
+            print(f"Loaded {len(conflicts)} pair(s) of overlapping flights")
+            problems += len(conflicts)
+        self._load_problems.inc(problems)
+        return problems
+
+    def _replay_log(self, records):
+        """Bring loaded snapshot records up to date from the mutation log.
+
+        Entries are replayed from the sequence number of the previous
+        snapshot generation, which the log always still covers, so the result
+        is correct whether the current snapshot or its previous generation
+        was loaded. Replay is idempotent, so entries already in the snapshot
+        are harmless.
+
+        Args:
+            records (list): Records read from the snapshot.
+
+        Returns:
+            list: The up to date records.
+        """
+        meta = {}
+        if os.path.exists(self.meta_file):
+            with open(self.meta_file, encoding='utf-8') as f:
+                meta = json.load(f)
+        self._snapshot_seq = meta.get('seq', 0)
+        self._seq = self._snapshot_seq
+        self._pending = []
+        if self._log is None or not os.path.exists(self._log.filename):
+            return records
+        entries = self._log.replay(meta.get('previous_seq', 0), self._repair_log)
+        if not entries:
+            return records
+        by_id = {record['id']: record for record in records}
+        for entry in entries:
+            apply_entry(by_id, entry)
+        self._seq = max(self._seq, entries[-1]['seq'])
+        self._replayed.inc(len(entries))
+        print(f"Replayed {len(entries)} logged mutations")
+        self._publish_logged_changes(entries)
+        return list(by_id.values())
+
+    def _publish_logged_changes(self, entries):
+        """Publish logged changes missing from the change feed.
+
+        Changes are published after the mutations they describe are logged,
+        so a crash in between leaves durable mutations whose changes were
+        never published. They are rebuilt from the log entries and appended
+        before any new change, keeping the feed complete and in order.
+
+        Args:
+            entries (list): Replayed log entries, in sequence order.
+        """
+        if self.change_feed is None:
+            return
+        missing = []
+        for entry in entries:
+            change = entry.get('change')
+            if change is not None and change['seq'] > self.change_feed.last_seq:
+                missing.append(dict(change, after=entry.get('record')))
+        if missing:
+            self.change_feed.append(missing)
+            print(f"Published {len(missing)} logged changes missing from the change feed")
+        self._change_seq = self.change_feed.last_seq
+
+    def _set_records(self, records):
+        """Replace all in-memory records and rebuild the indexes.
+
+        Records are kept in ID order, so iteration order is stable.
+
+        Args:
+            records (list): The new records.
+        """
+        with self._lock:
+            records = sorted(records, key=lambda record: record['id'])
+            self._records = {record['id']: record for record in records}
+            # Archived flights keep their IDs, which must not be reused
+            self._max_id = max(records[-1]['id'] if records else 0, self.archive_store.max_id())
+            self._generation += 1
+            self._history.prune(None)
+            for index in self._indexes:
+                index.rebuild(self._records.values())
+            self._loaded = True
+
+    def _ensure_loaded(self):
+        """Load the records from disk if this is the first access."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._load_records()
+
+    @property
+    def records(self):
+        """list: Copies of all records in memory, in ID order."""
+        return self.get_records()
+
+    def _log_mutation(self, op, change=None, **fields):
+        """Queue a mutation log entry, written by the next commit.
+
+        With the change feed enabled the entry also carries its change, less
+        the record after it, which a put entry holds already, so a change
+        lost between the log and the feed writes can be published on load.
+        """
+        if self._log is not None:
+            self._seq += 1
+            fields['seq'] = self._seq
+            fields['op'] = op
+            if change is not None:
+                fields['change'] = {key: value for key, value in change.items() if key != 'after'}
+            self._pending.append(fields)
+
+    def _capture_change(self, op, before, after):
+        """Queue a change feed entry, written by the next commit.
+
+        Returns:
+            dict: The change, or None without a change feed.
+        """
+        if self.change_feed is None:
+            return None
+        record = after if after is not None else before
+        self._change_seq += 1
+        change = {
+            'seq': self._change_seq,
+            'op': op,
+            'type': record['type'],
+            'id': record['id'],
+            'before': before,
+            'after': after,
+            'time': int(time.time()),
+        }
+        self._pending_changes.append(change)
+        return change
+
+    def _new_version(self, record_id, old):
+        """Advance the generation, keeping the replaced version for open views."""
+        self._generation += 1
+        if self._open_views:
+            self._history.record(self._generation, record_id, old)
+
+    def _insert(self, record):
+        """Add a record to memory and to every index."""
+        self._new_version(record['id'], None)
+        self._records[record['id']] = record
+        if record['id'] > self._max_id:
+            self._max_id = record['id']
+        for index in self._indexes:
+            index.add(record)
+        change = self._capture_change('create', None, record)
+        self._log_mutation('put', change, record=record)
+
+    def _remove(self, record_id, op='delete'):
+        """Remove a record from memory and from every index.
+
+        Args:
+            record_id (int): ID of the record.
+            op (str): Logged operation, 'delete' or 'archive' for flights
+                moved to the cold archive.
+
+        Returns:
+            dict: The removed record.
+        """
+        record = self._records.pop(record_id)
+        self._new_version(record_id, record)
+        for index in self._indexes:
+            index.remove(record)
+        change = self._capture_change(op, record, None)
+        self._log_mutation(op, change, id=record_id)
+        return record
+
+    def _replace(self, old, new):
+        """Replace a record with a new version in memory and in every index.
+
+        Records are never modified in place, so a record handed out earlier or
+        being written by a save keeps its previous contents.
+        """
+        self._new_version(new['id'], old)
+        self._records[new['id']] = new
+        for index in self._indexes:
+            index.update(old, new)
+        change = self._capture_change('update', old, new)
+        self._log_mutation('put', change, record=new)
+
+    def _check_writable(self):
+        """Refuse changes to the records of a follower.
+
+        Raises:
+            ReadOnlyError: If the controller is read-only.
+        """
+        if self.read_only:
+            raise ReadOnlyError(f"{self.data_dir} is a read-only follower, promote it first")
+
+    def _check_references(self, record):
+        """Check that every reference of a record points to an existing record.
+
+        Raises:
+            IntegrityError: If a referenced record is missing or of the wrong type.
+        """
+        if record.get('type') != 'flight':
+            return
+        for field, parent_type in self.REFERENCES.items():
+            parent_id = record.get(field)
+            if parent_id is None:
+                continue
+            parent = self._records.get(parent_id)
+            if parent is None or parent['type'] != parent_type:
+                raise IntegrityError(f"{field} {parent_id} does not refer to an existing {parent_type}")
+
+    def _check_archived_references(self, field, record):
+        """Check that no archived flight refers to a record about to be deleted.
+
+        Archived flights are read-only history, so they can be neither
+        deleted nor changed by any delete policy.
+
+        Raises:
+            IntegrityError: If archived flights refer to the record.
+        """
+        count = self.archive_store.count_references(field, record['id'])
+        if count:
+            raise IntegrityError(
+                f"Cannot delete {record['type']} {record['id']}: "
+                f"referenced by {count} archived flight(s)"
+            )
+
+    def _check_overlap(self, record):
+        """Check that a flight does not overlap another flight of its client.
+
+        Under the 'flag' policy an overlap is reported and accepted.
+
+        Raises:
+            BookingConflictError: If the flight overlaps and the policy is 'reject'.
+        """
+        conflicts = self.bookings.conflicts(record)
+        if not conflicts:
+            return
+        message = (
+            f"Flight {record['id']} of client {record['client_id']} overlaps "
+            f"flight(s) {', '.join(str(flight_id) for flight_id in conflicts)}"
+        )
+        if self.on_overlap == 'reject':
+            raise BookingConflictError(message, conflicts)
+        self._flagged.inc()
+        print(f"Warning: {message}")
     
+    def reload(self):
+        """Discard the in-memory records and load them again from disk.
+
+        Pending changes are written first, so they are not lost.
+        """
+        self.flush()
+        self._load_records()
+
     def _save_records(self):
-        """Save all records to the JSON file.
-        
-        Writes the current state of all records to the records file.
+        """Make the pending changes durable.
+
+        With the journal enabled the queued mutation log entries are appended
+        to the log, and a compaction is requested once the log has grown past
+        the thresholds. Otherwise all records are written to the records file.
+        Queued change feed entries are published once the mutations they
+        describe are durable.
+
+        Raises:
+            Exception: Any error writing the log, snapshot or feed. Entries
+                and changes not written yet are queued again ahead of newer
+                ones, so the next save writes them.
         """
-        Client.save_records(self.records, self.records_file)
+        with self._commit_lock:
+            with self._lock:
+                entries, self._pending = self._pending, []
+                changes, self._pending_changes = self._pending_changes, []
+            logged = False
+            try:
+                if self._log is None:
+                    with self._save_timer.time():
+                        self._write_snapshot()
+                elif entries:
+                    with self._save_timer.time():
+                        written = self._log.append(entries)
+                    logged = True
+                    self._bytes_written.inc(written)
+                    # The compactor resets the count under the lock
+                    with self._lock:
+                        self._log_bytes += written
+                    if self.shipper is not None:
+                        self.shipper.ship(entries)
+                if changes:
+                    self.change_feed.append(changes)
+            except Exception:
+                with self._lock:
+                    if not logged:
+                        self._pending = entries + self._pending
+                    self._pending_changes = changes + self._pending_changes
+                raise
+        if entries and self._needs_compaction():
+            self._compactor.request()
+
+    def _needs_compaction(self):
+        """Check whether the log has grown enough to be worth compacting.
+
+        Returns:
+            bool: True when the records file is not in the configured codec
+                yet, or the log written since the last snapshot is at least
+                compact_min_bytes and compact_ratio of the records file size.
+        """
+        if self._source_file() != self.records_file:
+            return True
+        if self._log_bytes < self.compact_min_bytes:
+            return False
+        return self._log_bytes >= self.compact_ratio * os.path.getsize(self.records_file)
+
+    def compact(self):
+        """Write a snapshot of all records and truncate the mutation log.
+
+        The snapshot is a list of the current records taken under the lock.
+        Records are replaced rather than modified on update, so the list stays
+        consistent while it is written and synced, and mutations continue
+        meanwhile. The snapshot atomically replaces the records file, keeping
+        the replaced one as the previous generation. The log is then cut back
+        to the entries made since that previous generation, so startup replay
+        stays bounded and either generation can still be brought up to date.
+        """
+        self._ensure_loaded()
+        if self.hot_months is not None and not self.read_only:
+            current = month_key(to_epoch(datetime.now()))
+            self.archive(shift_month(current, -self.hot_months))
+        with self._compact_timer.time():
+            self._write_snapshot()
+        if self.change_feed is not None:
+            self.change_feed.prune()
+
+    def _write_snapshot(self):
+        with self._compact_lock:
+            with self._lock:
+                records = list(self._records.values())
+                seq = self._seq
+                self._log_bytes = 0
+            previous_seq = self._snapshot_seq
+            BaseModel.save_records(
+                records, self.records_file, self.codec, self.compression_level
+            )
+            self._bytes_written.inc(os.path.getsize(self.records_file))
+            meta = {'seq': seq, 'previous_seq': previous_seq}
+            storage.write_atomic(self.meta_file, json.dumps(meta).encode('utf-8'))
+            self._snapshot_seq = seq
+            if self._log is not None:
+                self._log.truncate(previous_seq)
+            if self.shipper is not None:
+                self.shipper.rebase(records, seq, self.archive_store.directory)
     
+    def _request_save(self):
+        """Request a save after a mutation.
+
+        The save is grouped with other mutations arriving within the commit
+        window, so a burst of changes costs one write and one fsync.
+        """
+        self._committer.request()
+
+    def flush(self):
+        """Write any pending changes to disk and wait until they are durable."""
+        self._committer.flush()
+
+    def close(self):
+        """Flush pending changes and stop the background threads."""
+        self._committer.close()
+        self._compactor.close()
+
     def _get_next_id(self):
         """Get the next available record ID.
         
         Returns:
-            int: The next available ID (highest existing ID + 1).
+            int: The next available ID (highest ID ever used + 1).
         """
-        if not self.records:
-            return 1
-        return max(record['id'] for record in self.records) + 1
+        return self._max_id + 1
     
     def create_record(self, record_type, data):
         """Create a new record of the specified type.
@@ -117,37 +843,117 @@ class RecordController:
             
         Raises:
             ValueError: If the record type is not recognized.
+            IntegrityError: If a flight refers to a missing client or airline.
+            BookingConflictError: If a flight overlaps another flight of its
+                client and the overlap policy is 'reject'.
+            ReadOnlyError: If the data directory belongs to a follower.
         """
-        if record_type == 'client':
-            record = Client()
-            record.id = self._get_next_id()
-            for key, value in data.items():
-                setattr(record, key, value)
-        elif record_type == 'airline':
-            record = Airline()
-            record.id = self._get_next_id()
-            for key, value in data.items():
-                setattr(record, key, value)
-        elif record_type == 'flight':
-            record = Flight()
-            record.id = self._get_next_id()
-            for key, value in data.items():
-                setattr(record, key, value)
-        else:
-            raise ValueError(f"Unknown record type: {record_type}")
-        
-        self.records.append(record.to_dict())
-        self._save_records()
+        self._check_writable()
+        self._ensure_loaded()
+        with self._lock:
+            record = self._create_record(record_type, data)
+        # Outside the lock: a synchronous commit takes the commit lock first
+        self._request_save()
         return record
+
+    def _create_record(self, record_type, data):
+        model = registry.get_model(record_type)
+        new_record = model.normalize(data, self._get_next_id())
+        self._check_references(new_record)
+        self._check_overlap(new_record)
+        self._insert(new_record)
+        return model.from_dict(new_record)
     
+    def import_records(self, rows):
+        """Validate and create many records in one batch.
+
+        The whole batch is validated column-wise first, with client and
+        airline references checked against the ID index. Rows that pass are
+        created with new IDs in their original order and written in a single
+        save; rows that fail are skipped and reported. Flights overlapping
+        another flight of their client, including one earlier in the batch,
+        are handled according to the overlap policy.
+
+        Args:
+            rows (list): Record data dictionaries, each with a 'type' key.
+
+        Returns:
+            tuple: The list of created record IDs, one per valid row, and a
+                dict mapping each rejected row position to its list of
+                (field, message) errors.
+
+        Raises:
+            ReadOnlyError: If the data directory belongs to a follower.
+        """
+        self._check_writable()
+        self._ensure_loaded()
+        with self._lock:
+            known_ids = {
+                field: self._order.ids(parent_type)
+                for field, parent_type in self.REFERENCES.items()
+            }
+            report = validate_batch(rows, known_ids)
+            created = []
+            for position in report.valid_rows:
+                row = rows[position]
+                model = registry.get_model(str(row['type']).lower())
+                record = model.normalize(row, self._get_next_id())
+                try:
+                    self._check_overlap(record)
+                except BookingConflictError as e:
+                    report.errors[position] = [('date', str(e))]
+                    continue
+                self._insert(record)
+                created.append(record['id'])
+        if created:
+            self._request_save()
+        return created, report.errors
+
     def delete_record(self, record_id):
         """Delete a record by ID.
         
+        Flights referencing a deleted client or airline are handled according
+        to the on_delete policy of the reference: the delete is refused
+        ('restrict'), the flights are deleted too ('cascade') or their
+        reference is cleared ('nullify'). Referencing flights are found through
+        the foreign key indexes, and everything is written in a single save.
+
         Args:
             record_id (int): The ID of the record to delete.
+
+        Raises:
+            IntegrityError: If a 'restrict' reference to the record exists, or
+                an archived flight refers to it.
+            ReadOnlyError: If the data directory belongs to a follower.
         """
-        self.records = [r for r in self.records if r['id'] != record_id]
-        self._save_records()
+        self._check_writable()
+        self._ensure_loaded()
+        with self._lock:
+            record = self._records.get(record_id)
+            if record is None:
+                return
+            references = [
+                (field, self.foreign_keys[field])
+                for field, parent_type in self.REFERENCES.items()
+                if parent_type == record['type']
+            ]
+            for field, index in references:
+                count = index.count(record_id)
+                if count and self.on_delete[field] == 'restrict':
+                    raise IntegrityError(
+                        f"Cannot delete {record['type']} {record_id}: "
+                        f"referenced by {count} flight(s)"
+                    )
+                self._check_archived_references(field, record)
+            for field, index in references:
+                for child_id in index.referencing(record_id):
+                    if self.on_delete[field] == 'cascade':
+                        self._remove(child_id)
+                    else:
+                        child = self._records[child_id]
+                        self._replace(child, dict(child, **{field: None}))
+            self._remove(record_id)
+        self._request_save()
     
     def update_record(self, record_id, data):
         """Update a record by ID.
@@ -158,16 +964,110 @@ class RecordController:
             
         Returns:
             bool: True if record was updated, False if not found.
+
+        Raises:
+            IntegrityError: If a flight would refer to a missing client or airline.
+            BookingConflictError: If a flight would overlap another flight of
+                its client and the overlap policy is 'reject'.
+            ReadOnlyError: If the data directory belongs to a follower.
         """
-        for record in self.records:
-            if record['id'] == record_id:
-                # Preserve the record type when updating
-                data['type'] = record['type']
-                record.update(data)
-                self._save_records()
-                return True
-        return False
+        self._check_writable()
+        self._ensure_loaded()
+        with self._lock:
+            record = self._records.get(record_id)
+            if record is None:
+                return False
+            # Preserve the record type when updating
+            data['type'] = record['type']
+            # Dates are stored as epoch seconds, parse them once here
+            if 'date' in data:
+                data['date'] = to_epoch(data['date'])
+            # References are stored as ints, as normalize() stores them
+            for field in registry.get_model(record['type']).FIELDS:
+                if field.kind == 'ref' and field.name in data:
+                    data[field.name] = registry.to_ref(data[field.name])
+            new_record = dict(record, **data)
+            new_record['id'] = record_id
+            self._check_references(new_record)
+            self._check_overlap(new_record)
+            self._replace(record, new_record)
+        self._request_save()
+        return True
     
+    def find_duplicate_clients(self, threshold=0.8, workers=None):
+        """Find client records that were probably entered more than once.
+
+        Args:
+            threshold (float): Minimum similarity of a candidate, 0 to 1.
+            workers (int, optional): Number of worker processes.
+
+        Returns:
+            list: MergeCandidate pairs, best score first. See controllers.dedupe.
+        """
+        return dedupe.find_duplicate_clients(
+            self.get_all_records('client'), threshold, workers
+        )
+
+    def merge_clients(self, keep_id, duplicate_ids):
+        """Merge duplicate clients into one.
+
+        Every flight of the duplicates is re-pointed to the kept client and
+        the duplicates are deleted. Flights are found through the client_id
+        index and all changes are written in a single save.
+
+        Args:
+            keep_id (int): ID of the client to keep.
+            duplicate_ids (iterable): IDs of the clients to merge into it.
+
+        Returns:
+            int: Number of flights moved to the kept client.
+
+        Raises:
+            ValueError: If any ID is not a client, or keep_id is among the duplicates.
+            IntegrityError: If archived flights refer to a duplicate.
+            ReadOnlyError: If the data directory belongs to a follower.
+        """
+        self._check_writable()
+        self._ensure_loaded()
+        duplicate_ids = set(duplicate_ids)
+        moved = 0
+        with self._lock:
+            for client_id in duplicate_ids | {keep_id}:
+                record = self._records.get(client_id)
+                if record is None or record['type'] != 'client':
+                    raise ValueError(f"Record {client_id} is not a client")
+            if keep_id in duplicate_ids:
+                raise ValueError("Cannot merge a client into itself")
+            for duplicate_id in duplicate_ids:
+                self._check_archived_references('client_id', self._records[duplicate_id])
+            index = self.foreign_keys['client_id']
+            for duplicate_id in duplicate_ids:
+                for flight_id in index.referencing(duplicate_id):
+                    flight = self._records[flight_id]
+                    self._replace(flight, dict(flight, client_id=keep_id))
+                    moved += 1
+                self._remove(duplicate_id)
+        self._request_save()
+        return moved
+
+    def verify_reports(self, repair=False):
+        """Check the reporting views against counts rebuilt from scratch.
+
+        Args:
+            repair (bool): Rebuild the views if they are inconsistent.
+
+        Returns:
+            dict: Inconsistencies per view, empty when the views are correct.
+                See ReportingViews.verify().
+        """
+        self._ensure_loaded()
+        with self._lock:
+            records = list(self._records.values())
+            problems = self.reports.verify(records)
+            if problems and repair:
+                self.reports.rebuild(records)
+        return problems
+
     def search_record(self, record_id):
         """Search for a record by ID.
         
@@ -175,24 +1075,23 @@ class RecordController:
             record_id (int): The ID of the record to search for.
             
         Returns:
-            dict: The found record or None if not found.
+            dict: A copy of the found record or None if not found.
             
         Note:
             Handles conversion of record_id to integer and provides error handling
             for invalid ID formats.
         """
+        self._ensure_loaded()
         try:
             record_id = int(record_id)  # Convert to int for comparison
             print(f"Searching for record with ID: {record_id}")
-            print(f"Current records: {self.records}")
             
-            for record in self.records:
-                print(f"Checking record: {record}")
-                current_id = int(record.get('id', -1))  # Convert record ID to int
-                print(f"Comparing IDs: {current_id} == {record_id}")
-                if current_id == record_id:
-                    print(f"Found record: {record}")
-                    return record
+            # Records are keyed by ID, so this is a single lookup
+            record = self._records.get(record_id)
+            self._scanned['search_record'].observe(1)
+            if record is not None:
+                print(f"Found record: {record}")
+                return dict(record)
             print(f"No record found with ID: {record_id}")
             return None
         except ValueError as e:
@@ -202,14 +1101,307 @@ class RecordController:
             print(f"Error during search: {e}")
             return None
     
+    def search_text(self, query, record_type=None, limit=50):
+        """Find records by the words of their names, cities, phone numbers
+        and routes, best match first.
+
+        The last word of the query may be partly typed. See TextIndex.search().
+
+        Args:
+            query (str): Words to search for.
+            record_type (str, optional): Only return records of this type.
+            limit (int): Maximum number of results.
+
+        Returns:
+            list: Copies of the matching records.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return [
+                dict(self._records[record_id])
+                for _, record_id in self.text.search(query, record_type, limit)
+            ]
+
+    def archive(self, before):
+        """Move the flights of past months to the cold archive.
+
+        Each month is appended to its compressed archive partition and its
+        flights are then removed from memory, so they no longer cost anything
+        at startup or on save. Archived flights are read-only history: they
+        are returned by query_flights() but not by the other read methods or
+        reports. Their references are kept, so clients and airlines they refer
+        to cannot be deleted.
+
+        Args:
+            before: First month to keep in memory, as 'YYYY-MM' or any date
+                accepted by to_epoch().
+
+        Returns:
+            int: Number of flights archived.
+
+        Raises:
+            ReadOnlyError: If the data directory belongs to a follower.
+        """
+        if not (isinstance(before, str) and len(before) == 7):
+            before = month_key(to_epoch(before))
+        self._check_writable()
+        self._ensure_loaded()
+        archived = 0
+        for month in self.partitions.months():
+            if month >= before:
+                break
+            with self._lock:
+                records = [self._records[record_id] for record_id in self.partitions.ids(month)]
+                self.archive_store.write(month, records)
+                if self.shipper is not None:
+                    # Followers need the flights before the archive entries
+                    self.shipper.ship_archive(self.archive_store.directory)
+                for record in records:
+                    self._remove(record['id'], op='archive')
+            archived += len(records)
+            print(f"Archived {len(records)} flights of {month}")
+        if archived:
+            self._request_save()
+        return archived
+
+    def query_flights(self, start=None, end=None):
+        """Get the flights in a date range, including archived ones.
+
+        Only the in-memory and archived month partitions overlapping the
+        range are visited, and archive partitions are read from disk only
+        when the range touches them.
+
+        Args:
+            start: Earliest date, inclusive, in any form accepted by
+                to_epoch(). None for no lower bound.
+            end: Latest date, exclusive. None for no upper bound.
+
+        Returns:
+            list: Copies of the flight records, ordered by date and ID.
+        """
+        start = to_epoch(start)
+        end = to_epoch(end)
+        first = month_key(start) if start is not None else None
+        last = month_key(end - 1) if end is not None else None
+
+        def in_range(month):
+            return (first is None or month >= first) and (last is None or month <= last)
+
+        def matches(record):
+            date = record.get('date')
+            return (date is not None and (start is None or date >= start)
+                    and (end is None or date < end))
+
+        self._ensure_loaded()
+        found = {}
+        for month in self.archive_store.months():
+            if in_range(month):
+                for record in self.archive_store.load(month):
+                    if matches(record):
+                        found[record['id']] = record
+        with self._lock:
+            for month in self.partitions.months():
+                if in_range(month):
+                    for record_id in self.partitions.ids(month):
+                        record = self._records[record_id]
+                        if matches(record):
+                            found[record_id] = record
+        return [dict(record) for record in sorted(found.values(), key=lambda r: (r['date'], r['id']))]
+
+    def find_itineraries(self, origin, destination, earliest=None, k=3,
+                         min_layover=3600, max_layover=24 * 3600, max_legs=3):
+        """Find the earliest-arriving flight connections between two cities.
+
+        Searches the route graph of the in-memory flights. Arrival times are
+        estimated from the great-circle distance, since flights only record
+        their departure. See RouteGraph.search().
+
+        Args:
+            origin (str): Departure city.
+            destination (str): Arrival city.
+            earliest: Earliest departure in any form accepted by to_epoch().
+                Defaults to now.
+            k (int): Maximum number of connections to return.
+            min_layover (int): Minimum seconds between connecting flights.
+            max_layover (int): Maximum seconds to wait for the next flight.
+            max_legs (int): Maximum number of flights per connection.
+
+        Returns:
+            list: Itinerary tuples, earliest arrival first.
+        """
+        earliest = to_epoch(earliest if earliest is not None else datetime.now())
+        self._ensure_loaded()
+        with self._lock:
+            return self.routes.search(
+                origin, destination, earliest, k, min_layover, max_layover, max_legs
+            )
+
+    def find_booking_conflicts(self):
+        """Find every client booked on overlapping flights.
+
+        Sweeps the booking index once instead of checking each flight, so it
+        also finds conflicts accepted under the 'flag' policy or loaded from
+        older data.
+
+        Returns:
+            list: (client_id, first_id, second_id) tuples, one per pair of
+                overlapping flights.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return self.bookings.audit()
+
+    def mileage(self, by='client'):
+        """Get the total distance flown per client or airline.
+
+        Distances are great-circle distances between the cities of the city
+        reference table, summed over all in-memory flights in one pass.
+
+        Args:
+            by (str): 'client' or 'airline'.
+
+        Returns:
+            dict: Kilometres keyed by client or airline ID.
+
+        Raises:
+            ValueError: If by is not recognized.
+        """
+        field = {'client': 'client_id', 'airline': 'airline_id'}.get(by)
+        if field is None:
+            raise ValueError(f"Cannot compute mileage by {by}")
+        self._ensure_loaded()
+        with self._lock:
+            flights = [self._records[i] for i in self._order.ids_after(None, 'flight')]
+        return geo.mileage(flights, field)
+
+    def read_changes(self, after_seq=0, limit=None):
+        """Stream the changes made after a sequence number, oldest first.
+
+        The records are loaded and pending changes are made durable first,
+        so changes a crash kept out of the feed are included. Each change is
+        a dict with 'seq', 'op' ('create', 'update', 'delete' or 'archive'),
+        'type', 'id', 'before' and 'after' (None for the missing side) and
+        'time'. Consumers that keep a named checkpoint use
+        change_feed.consume() and change_feed.commit() instead.
+
+        Args:
+            after_seq (int): Only yield changes with a higher sequence number.
+            limit (int, optional): Maximum number of changes to yield.
+
+        Returns:
+            iterator: The changes, read lazily from the feed.
+
+        Raises:
+            RuntimeError: If the change feed is not enabled.
+        """
+        if self.change_feed is None:
+            raise RuntimeError("The change feed is not enabled")
+        self._ensure_loaded()
+        self.flush()
+        return self.change_feed.read(after_seq, limit)
+
+    def read_view(self):
+        """Open a consistent read view of the current records.
+
+        Long scans and exports read through the view and see the records as
+        they are now, while other threads keep changing them. Nothing is
+        copied up front; while views are open, each mutation keeps a
+        reference to the version it replaces. Release the view when done,
+        preferably by using it as a context manager::
+
+            with controller.read_view() as view:
+                for flight in view.iter_records('flight'):
+                    ...
+
+        Note:
+            reload() replaces all records without keeping versions, so views
+            open across a reload see the reloaded records.
+
+        Returns:
+            ReadView: The view, pinned at the current generation.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            generation = self._generation
+            self._open_views[generation] = self._open_views.get(generation, 0) + 1
+        return ReadView(self, generation)
+
+    def _release_view(self, generation):
+        """Forget a released view and drop the versions no view needs."""
+        with self._lock:
+            count = self._open_views[generation] - 1
+            if count:
+                self._open_views[generation] = count
+            else:
+                del self._open_views[generation]
+            self._history.prune(min(self._open_views) if self._open_views else None)
+
+    def get_model(self, record_id):
+        """Get a record as a model instance, such as a Flight with a parsed date.
+
+        Instances come from an LRU cache, so repeated lookups of hot records
+        skip building them again. Updating or deleting a record drops its
+        cached instance. Cache statistics are available from models.stats().
+
+        Args:
+            record_id (int): ID of the record.
+
+        Returns:
+            BaseModel: The model instance, or None if there is no such record.
+                The instance is shared with later callers and must not be
+                modified; use update_record() to change the record.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            record = self._records.get(record_id)
+            if record is None:
+                return None
+            return self.models.get(record, self._build_model)
+
+    @staticmethod
+    def _build_model(record):
+        return registry.get_model(record['type']).from_dict(record)
+
     def get_records(self):
         """Get all records.
         
         Returns:
-            list: List of all records.
+            list: Copies of all records, in ID order. Changing them does not
+                affect the stored records.
         """
-        return self.records
+        self._ensure_loaded()
+        with self._lock:
+            return [dict(record) for record in self._records.values()]
     
+    def changes(self, record_type):
+        """Get a version token for the records of a type.
+
+        The token changes whenever a record of the type is created, updated
+        or deleted, or the records are reloaded, so callers can cache data
+        derived from those records and refresh it only when needed.
+
+        Args:
+            record_type (str): Record type.
+
+        Returns:
+            tuple: Version token, compared with ==.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return self._changes.version(record_type)
+
+    def count_records(self, record_type=None):
+        """Count the records, using the ID index.
+
+        Args:
+            record_type (str, optional): Only count records of this type.
+
+        Returns:
+            int: Number of records.
+        """
+        self._ensure_loaded()
+        return self._order.count(record_type)
+
     def get_all_records(self, record_type=None):
         """Get all records of a specific type.
         
@@ -218,9 +1410,138 @@ class RecordController:
                 If None, returns all records.
                 
         Returns:
-            list: List of records of the specified type, or all records if no type
-                is specified.
+            list: Copies of the records of the specified type, or of all records
+                if no type is specified, in ID order.
+        """
+        return list(self.iter_records(record_type))
+
+    def iter_records(self, record_type=None, batch_size=1000):
+        """Iterate over records lazily, in ID order.
+
+        Records are fetched in batches through the ID index, so memory use
+        stays constant however many records there are, and other threads can
+        keep changing records in between batches. Records created during the
+        iteration are included if their ID is higher than the current position.
+
+        Args:
+            record_type (str, optional): Only yield records of this type.
+            batch_size (int): Number of records fetched per batch.
+
+        Yields:
+            dict: A copy of each record.
         """
-        if record_type:
-            return [r for r in self.records if r['type'] == record_type]
-        return self.records
+        self._ensure_loaded()
+        after_id = None
+        scanned = 0
+        try:
+            while True:
+                with self._lock:
+                    ids = self._order.ids_after(after_id, record_type, batch_size)
+                    batch = [dict(self._records[record_id]) for record_id in ids]
+                scanned += len(batch)
+                yield from batch
+                if len(ids) < batch_size:
+                    return
+                after_id = ids[-1]
+        finally:
+            # One scan is one query, however many batches it took
+            self._scanned['get_all_records'].observe(scanned)
+
+    def get_page(self, record_type=None, page_size=50, cursor=None):
+        """Get one page of records, in ID order.
+
+        Args:
+            record_type (str, optional): Only return records of this type.
+            page_size (int): Maximum number of records on the page.
+            cursor (str, optional): next_cursor of the previous page. Starts
+                at the first record when None.
+
+        Returns:
+            Page: The records on the page and the cursor of the next page.
+                Records deleted or created between calls never cause records
+                to be skipped or repeated.
+
+        Raises:
+            ValueError: If the cursor is invalid or was issued for another type.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        after_id = self._decode_cursor(cursor, record_type) if cursor else None
+        self._ensure_loaded()
+        with self._lock:
+            ids = self._order.ids_after(after_id, record_type, page_size + 1)
+            records = [dict(self._records[record_id]) for record_id in ids[:page_size]]
+        next_cursor = None
+        if len(ids) > page_size:
+            next_cursor = self._encode_cursor(ids[page_size - 1], record_type)
+        return Page(records, next_cursor)
+
+    def browse(self, record_type, offset=0, limit=50, sort_by='id', descending=False,
+               filters=None):
+        """Get a window of records sorted and filtered by their columns.
+
+        Meant for scrolling through large tables: the sorted IDs of each
+        ordering are computed once and reused until the records change, and
+        only the records inside the window are copied.
+
+        Args:
+            record_type (str): Type of records to browse.
+            offset (int): Position of the first record of the window.
+            limit (int): Maximum number of records in the window.
+            sort_by (str): Column to sort by, 'id' or a field of the model.
+            descending (bool): Sort in descending order.
+            filters (dict, optional): Text each column must contain, compared
+                case-insensitively with the displayed value.
+
+        Returns:
+            Window: The records of the window, its offset and the number of
+                records matching the filters.
+
+        Raises:
+            ValueError: If the record type or a column is not recognized.
+        """
+        kinds = {'id': 'ref'}
+        kinds.update((field.name, field.kind) for field in registry.get_model(record_type).FIELDS)
+        filters = {
+            column: str(text).lower() for column, text in (filters or {}).items() if text
+        }
+        for column in [sort_by, *filters]:
+            if column not in kinds:
+                raise ValueError(f"Unknown {record_type} column: {column}")
+        key = (record_type, sort_by, descending, tuple(sorted(filters.items())))
+
+        def build():
+            if sort_by == 'id' and not filters:
+                ids = self._order.ids_after(None, record_type)
+                return ids[::-1] if descending else ids
+            records = [self._records[record_id]
+                       for record_id in self._order.ids_after(None, record_type)]
+            for column, text in filters.items():
+                records = [record for record in records
+                           if text in display_value(record, column, kinds[column]).lower()]
+            records.sort(key=sort_key(sort_by), reverse=descending)
+            return [record['id'] for record in records]
+
+        offset = max(offset, 0)
+        self._ensure_loaded()
+        with self._lock:
+            ids = self._result_sets.get(key, self._generation, build)
+            offset = min(offset, max(len(ids) - limit, 0))
+            records = [dict(self._records[record_id]) for record_id in ids[offset:offset + limit]]
+        return Window(records, offset, len(ids))
+
+    @staticmethod
+    def _encode_cursor(after_id, record_type):
+        token = f"{record_type or ''}:{after_id}".encode('utf-8')
+        return base64.urlsafe_b64encode(token).decode('ascii')
+
+    @staticmethod
+    def _decode_cursor(cursor, record_type):
+        try:
+            cursor_type, after_id = base64.urlsafe_b64decode(cursor).decode('utf-8').rsplit(':', 1)
+            after_id = int(after_id)
+        except (ValueError, UnicodeDecodeError):
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+        if cursor_type != (record_type or ''):
+            raise ValueError("Cursor was issued for a different record type")
+        return after_id
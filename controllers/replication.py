@@ -0,0 +1,378 @@
+import json
+import os
+import re
+import threading
+import time
+
+from controllers.journal import MutationLog
+from controllers.partitions import FlightArchive
+from models import storage
+
+# File in a follower's data directory holding the last applied sequence
+# number. While it exists the data directory is read-only.
+REPLICA_STATE = 'replica.json'
+
+# Directory in the shipping directory holding a copy of the flight archive
+ARCHIVE = 'archive'
+
+_BASE = re.compile(r'^base-(\d+)\.json$')
+
+
+def base_seqs(directory):
+    """Get the sequence numbers of the base snapshots in a shipping directory.
+
+    Args:
+        directory (str): The shipping directory.
+
+    Returns:
+        list: The sequence numbers, in ascending order.
+    """
+    if not os.path.isdir(directory):
+        return []
+    return sorted(int(match.group(1)) for match in map(_BASE.match, os.listdir(directory)) if match)
+
+
+def base_file(directory, seq):
+    """Get the path of the base snapshot covering a sequence number."""
+    return os.path.join(directory, f"base-{seq:012d}.json")
+
+
+def copy_archive(source, target):
+    """Copy the changed partitions of a flight archive, then its manifest.
+
+    Partitions whose manifest entry is unchanged are skipped. The manifest is
+    replaced last, so it never lists a partition that was not copied yet.
+
+    Args:
+        source (str): Directory of the archive to copy.
+        target (str): Directory of the copy, created if needed.
+
+    Returns:
+        bool: True if anything was copied.
+    """
+    source_manifest = os.path.join(source, FlightArchive.MANIFEST)
+    if not os.path.exists(source_manifest):
+        return False
+    with open(source_manifest, 'rb') as f:
+        data = f.read()
+    manifest = json.loads(data)
+    target_manifest = os.path.join(target, FlightArchive.MANIFEST)
+    current = {}
+    if os.path.exists(target_manifest):
+        with open(target_manifest, encoding='utf-8') as f:
+            current = json.load(f)
+    if current == manifest:
+        return False
+    os.makedirs(target, exist_ok=True)
+    for month, entry in manifest.items():
+        if current.get(month) != entry:
+            with open(os.path.join(source, entry['file']), 'rb') as f:
+                storage.write_atomic(os.path.join(target, entry['file']), f.read())
+    storage.write_atomic(target_manifest, data)
+    return True
+
+
+class LogShipper:
+    """Ships a primary's mutation log to a follower's directory.
+
+    The directory, a local path standing in for the remote host, receives a
+    base snapshot of all records named after the sequence number it covers,
+    and a copy of the mutation log entries made since. Every commit appends
+    its entries right after they are durable on the primary, so a follower
+    loses at most the commits in flight. Each compaction ships a new base
+    and cuts the shipped log back to the entries after it. Flights moved to
+    the cold archive are in neither, so the archive is copied along, always
+    before the log entries of the archive operations.
+
+    Attributes:
+        directory (str): The shipping directory.
+        last_seq (int): Sequence number of the last shipped entry.
+    """
+
+    LOG = 'records.log'
+
+    def __init__(self, directory):
+        """Initialize a new LogShipper.
+
+        Args:
+            directory (str): The shipping directory, created if needed.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.log = MutationLog(os.path.join(directory, self.LOG))
+        self._lock = threading.Lock()
+        entries = self.log.replay()
+        seqs = base_seqs(directory)
+        self.last_seq = entries[-1]['seq'] if entries else (seqs[-1] if seqs else None)
+
+    def ship(self, entries):
+        """Append committed log entries to the shipped log.
+
+        Args:
+            entries (list): Entries in sequence order, already durable.
+        """
+        with self._lock:
+            self.log.append(entries)
+            self.last_seq = max(self.last_seq or 0, entries[-1]['seq'])
+
+    def ship_archive(self, archive_dir):
+        """Copy the primary's flight archive to the shipping directory.
+
+        Args:
+            archive_dir (str): Directory of the primary's FlightArchive.
+        """
+        with self._lock:
+            copy_archive(archive_dir, os.path.join(self.directory, ARCHIVE))
+
+    def rebase(self, records, seq, archive_dir=None):
+        """Ship a base snapshot and drop the shipped entries it covers.
+
+        Args:
+            records (list): All records as of seq.
+            seq (int): Sequence number covered by the records.
+            archive_dir (str, optional): Directory of the primary's
+                FlightArchive, shipped along with the base.
+        """
+        if archive_dir is not None:
+            self.ship_archive(archive_dir)
+        with self._lock:
+            storage.save(records, base_file(self.directory, seq), 'none', keep_previous=False)
+            for older in base_seqs(self.directory):
+                if older < seq:
+                    os.remove(base_file(self.directory, older))
+            self.log.truncate(seq)
+            self.last_seq = max(self.last_seq or 0, seq)
+
+
+class Follower:
+    """Warm standby applying the log shipped by a primary.
+
+    The follower keeps its own data directory, 'data' inside the shipping
+    directory, served by a read-only RecordController. Polling applies the
+    newly shipped entries to it and makes them durable in the follower's own
+    journal, so queries see the primary's records and a promoted follower
+    starts from its own files. A follower that fell behind the shipped log
+    reloads from the latest base snapshot. The shipped flight archive is
+    copied into the follower's own archive before archive operations are
+    applied, so archived flights are kept and survive a promotion.
+
+    Attributes:
+        directory (str): The shipping directory.
+        controller (RecordController): Read-only controller of the follower's
+            records.
+        applied_seq (int): Last applied primary sequence number, None before
+            the first base snapshot.
+        shipped_seq (int): Last sequence number seen in the shipped log.
+    """
+
+    def __init__(self, directory, poll_interval=0.2, metrics=None):
+        """Initialize a new Follower.
+
+        Args:
+            directory (str): The shipping directory of the primary.
+            poll_interval (float): Seconds between polls when running.
+            metrics (MetricsRegistry, optional): Registry for the lag metrics.
+
+        Raises:
+            ValueError: If the data directory exists but is not a follower's,
+                for example because it was promoted.
+        """
+        from controllers.record_controller import RecordController
+
+        self.directory = directory
+        self.poll_interval = poll_interval
+        data_dir = os.path.join(directory, 'data')
+        self._state_file = os.path.join(data_dir, REPLICA_STATE)
+        if os.path.exists(self._state_file):
+            with open(self._state_file, encoding='utf-8') as f:
+                self.applied_seq = json.load(f)['applied_seq']
+        elif os.path.isdir(data_dir) and os.listdir(data_dir):
+            raise ValueError(f"{data_dir} is not a follower, it may have been promoted")
+        else:
+            os.makedirs(data_dir, exist_ok=True)
+            self.applied_seq = None
+            self._write_state()
+        self.controller = RecordController(data_dir=data_dir, metrics=metrics, commit_window=0)
+        # The follower owns its data directory's log, unlike other readers
+        self.controller._repair_log = True
+        self.shipped_seq = self.applied_seq
+        self._log_file = os.path.join(directory, LogShipper.LOG)
+        self._position = (None, 0)
+        self._caught_up_at = time.time()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        metrics = self.controller.metrics
+        self._lag_entries = metrics.gauge(
+            'replication_lag_entries', 'Shipped log entries not applied by the follower yet'
+        )
+        self._lag_seconds = metrics.gauge(
+            'replication_lag_seconds', 'Seconds since the follower was last caught up'
+        )
+        self._applied = metrics.counter(
+            'replication_entries_applied_total', 'Shipped log entries applied by the follower'
+        )
+
+    def _write_state(self):
+        storage.write_atomic(
+            self._state_file, json.dumps({'applied_seq': self.applied_seq}).encode('utf-8')
+        )
+
+    def _read_new_entries(self):
+        """Read the complete entries appended to the shipped log since the last read.
+
+        The log is replaced when the primary cuts it back, which is detected
+        by its inode changing, and read again from the start.
+        """
+        try:
+            f = open(self._log_file, 'rb')
+        except FileNotFoundError:
+            return []
+        with f:
+            stat = os.fstat(f.fileno())
+            inode, offset = self._position
+            if stat.st_ino != inode or stat.st_size < offset:
+                offset = 0
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b'\n') + 1
+        self._position = (stat.st_ino, offset + end)
+        return [json.loads(line) for line in data[:end].splitlines()]
+
+    def _sync_archive(self):
+        """Copy the shipped flight archive into the follower's own archive."""
+        archive = self.controller.archive_store
+        if copy_archive(os.path.join(self.directory, ARCHIVE), archive.directory):
+            archive.refresh()
+
+    def _load_base(self):
+        """Replace the follower's records with the latest base snapshot.
+
+        Returns:
+            bool: True if a base snapshot was loaded.
+        """
+        seqs = base_seqs(self.directory)
+        if not seqs:
+            return False
+        try:
+            records = storage.load(base_file(self.directory, seqs[-1]))
+        except FileNotFoundError:
+            # Replaced by a newer base meanwhile, picked up by the next poll
+            return False
+        self._sync_archive()
+        controller = self.controller
+        controller._set_records(records)
+        controller._write_snapshot()
+        self.applied_seq = seqs[-1]
+        self.shipped_seq = max(self.shipped_seq or 0, self.applied_seq)
+        self._write_state()
+        print(f"Follower loaded base snapshot at {self.applied_seq}")
+        return True
+
+    def _apply(self, entries):
+        """Apply entries to the follower's records and make them durable."""
+        if any(entry['op'] == 'archive' for entry in entries):
+            self._sync_archive()
+        controller = self.controller
+        with controller._lock:
+            for entry in entries:
+                if entry['op'] == 'put':
+                    record = entry['record']
+                    old = controller._records.get(record['id'])
+                    if old is None:
+                        controller._insert(record)
+                    else:
+                        controller._replace(old, record)
+                elif entry['id'] in controller._records:
+                    controller._remove(entry['id'], entry['op'])
+        controller._save_records()
+        self.applied_seq = entries[-1]['seq']
+        self._write_state()
+        self._applied.inc(len(entries))
+
+    def poll(self):
+        """Apply the entries shipped since the last poll.
+
+        Returns:
+            int: Number of entries applied.
+        """
+        with self._lock:
+            self.controller._ensure_loaded()
+            entries = self._read_new_entries()
+            if entries:
+                self.shipped_seq = max(self.shipped_seq or 0, entries[-1]['seq'])
+            applied = self.applied_seq or 0
+            entries = [entry for entry in entries if entry['seq'] > applied]
+            seqs = base_seqs(self.directory)
+            behind = self.applied_seq is None or (
+                seqs and seqs[-1] > applied and (not entries or entries[0]['seq'] > applied + 1)
+            )
+            if behind:
+                if not self._load_base():
+                    return 0
+                # The shipped log may have been replaced too, read it again
+                self._position = (None, 0)
+                entries = [entry for entry in self._read_new_entries()
+                           if entry['seq'] > self.applied_seq]
+                if entries:
+                    self.shipped_seq = max(self.shipped_seq, entries[-1]['seq'])
+            if entries:
+                self._apply(entries)
+            self._update_lag()
+            return len(entries)
+
+    def _update_lag(self):
+        lag = (self.shipped_seq or 0) - (self.applied_seq or 0)
+        now = time.time()
+        if lag <= 0:
+            self._caught_up_at = now
+        self._lag_entries.set(max(lag, 0))
+        self._lag_seconds.set(now - self._caught_up_at)
+
+    def lag(self):
+        """Get the replication lag measured by the last poll.
+
+        Returns:
+            dict: 'entries' not applied yet and 'seconds' since the follower
+                was last caught up.
+        """
+        return {'entries': self._lag_entries.value, 'seconds': self._lag_seconds.value}
+
+    def start(self):
+        """Start polling in a background thread."""
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='follower', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background thread after its current poll."""
+        if self._thread is not None:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error applying shipped log: {e}")
+
+    def promote(self):
+        """Turn the follower into a primary.
+
+        Polling stops, the entries shipped so far are applied and the data
+        directory becomes writable. The old primary must no longer write to
+        the shipping directory.
+
+        Returns:
+            RecordController: The now writable controller.
+        """
+        self.stop()
+        self.poll()
+        self.controller.flush()
+        os.remove(self._state_file)
+        self.controller.read_only = False
+        print(f"Promoted follower at {self.applied_seq}: {self.controller.data_dir}")
+        return self.controller
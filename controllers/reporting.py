@@ -0,0 +1,160 @@
+from controllers.indexes import RecordIndex
+from models.dates import month_key
+
+
+def _route(record):
+    start_city = record.get('start_city')
+    end_city = record.get('end_city')
+    if not start_city or not end_city:
+        return None
+    return (start_city, end_city)
+
+
+# Grouping key of each view, computed from a flight record
+VIEW_KEYS = {
+    'airline': lambda record: record.get('airline_id'),
+    'client': lambda record: record.get('client_id'),
+    'route': _route,
+    'month': lambda record: month_key(record.get('date')),
+}
+
+
+class FlightCountView(RecordIndex):
+    """Number of flights per group, kept current as flights change.
+
+    Attributes:
+        name (str): Name of the view, e.g. 'airline'.
+    """
+
+    def __init__(self, name, key):
+        """Initialize a new FlightCountView.
+
+        Args:
+            name (str): Name of the view.
+            key (callable): Function returning the group of a flight record,
+                or None if the flight does not belong to any group.
+        """
+        self.name = name
+        self._key = key
+        self._counts = {}
+
+    def clear(self):
+        self._counts = {}
+
+    def add(self, record):
+        if record.get('type') != 'flight':
+            return
+        group = self._key(record)
+        if group is not None:
+            self._counts[group] = self._counts.get(group, 0) + 1
+
+    def remove(self, record):
+        if record.get('type') != 'flight':
+            return
+        group = self._key(record)
+        count = self._counts.get(group)
+        if count is None:
+            return
+        if count > 1:
+            self._counts[group] = count - 1
+        else:
+            del self._counts[group]
+
+    def update(self, old, new):
+        if self._key(old) != self._key(new) or old.get('type') != new.get('type'):
+            self.remove(old)
+            self.add(new)
+
+    def count(self, group):
+        """Get the number of flights in a group.
+
+        Args:
+            group: The group, for example an airline ID or a (start, end) route.
+
+        Returns:
+            int: Number of flights, 0 for unknown groups.
+        """
+        return self._counts.get(group, 0)
+
+    def counts(self):
+        """Get the number of flights in every group.
+
+        Returns:
+            dict: Copy of the counts keyed by group.
+        """
+        return dict(self._counts)
+
+
+class ReportingViews:
+    """Materialized flight counts per airline, client, route and month.
+
+    The views are registered as indexes of the controller, so every create,
+    update and delete adjusts the affected counts in constant time and reads
+    never scan the flights.
+
+    Attributes:
+        views (dict): FlightCountView of each view name.
+    """
+
+    def __init__(self):
+        """Initialize empty views for every key in VIEW_KEYS."""
+        self.views = {name: FlightCountView(name, key) for name, key in VIEW_KEYS.items()}
+
+    def count(self, view, group):
+        """Get the number of flights in one group of a view.
+
+        Args:
+            view (str): 'airline', 'client', 'route' or 'month'.
+            group: Airline ID, client ID, (start_city, end_city) or 'YYYY-MM'.
+
+        Returns:
+            int: Number of flights in the group.
+        """
+        return self.views[view].count(group)
+
+    def counts(self, view):
+        """Get the number of flights in every group of a view.
+
+        Args:
+            view (str): 'airline', 'client', 'route' or 'month'.
+
+        Returns:
+            dict: Number of flights keyed by group.
+        """
+        return self.views[view].counts()
+
+    def verify(self, records):
+        """Check the views against counts rebuilt from scratch.
+
+        Args:
+            records (iterable): All current records.
+
+        Returns:
+            dict: For each inconsistent view, a dict mapping each wrong group
+                to its (maintained, expected) counts. Empty when consistent.
+        """
+        records = list(records)
+        problems = {}
+        for name, view in self.views.items():
+            fresh = FlightCountView(name, VIEW_KEYS[name])
+            fresh.rebuild(records)
+            expected = fresh.counts()
+            actual = view.counts()
+            wrong = {
+                group: (actual.get(group, 0), expected.get(group, 0))
+                for group in set(actual) | set(expected)
+                if actual.get(group, 0) != expected.get(group, 0)
+            }
+            if wrong:
+                problems[name] = wrong
+        return problems
+
+    def rebuild(self, records):
+        """Rebuild every view from scratch.
+
+        Args:
+            records (iterable): All current records.
+        """
+        records = list(records)
+        for view in self.views.values():
+            view.rebuild(records)
@@ -0,0 +1,178 @@
+import bisect
+import heapq
+from collections import namedtuple
+
+from controllers.indexes import RecordIndex
+from models import geo
+
+# Flights only record their departure, so arrival is estimated from the
+# great-circle distance at cruising speed plus time for taxi and climb.
+CRUISE_SPEED_KMH = 800
+GROUND_TIME = 30 * 60
+# Duration assumed when a city is missing from the city reference table
+DEFAULT_DURATION = 3 * 3600
+
+Itinerary = namedtuple('Itinerary', ['flight_ids', 'cities', 'departure', 'arrival'])
+Itinerary.__doc__ = """A connection of one or more flights.
+
+Attributes:
+    flight_ids (list): IDs of the flights taken, in order.
+    cities (list): Cities visited, from the origin to the destination.
+    departure (int): Departure of the first flight, in epoch seconds.
+    arrival (int): Estimated arrival of the last flight, in epoch seconds.
+"""
+
+# Estimated durations by (start_city, end_city)
+_durations = {}
+
+
+def flight_duration(start_city, end_city):
+    """Estimate the duration of a flight between two cities.
+
+    Args:
+        start_city (str): Departure city.
+        end_city (str): Arrival city.
+
+    Returns:
+        int: Estimated duration in seconds.
+    """
+    key = (start_city, end_city)
+    duration = _durations.get(key)
+    if duration is None:
+        distance = geo.route_km(start_city, end_city)
+        if distance is None:
+            duration = DEFAULT_DURATION
+        else:
+            duration = int(distance / CRUISE_SPEED_KMH * 3600) + GROUND_TIME
+        _durations[key] = duration
+    return duration
+
+
+class RouteGraph(RecordIndex):
+    """Time-expanded graph of flights between cities.
+
+    Each city keeps its departing flights sorted by departure time, so the
+    flights leaving within a layover window are found with a binary search.
+    The graph is maintained as an index of the controller, so it follows
+    every create, update and delete without being rebuilt.
+    """
+
+    def __init__(self):
+        """Initialize an empty graph."""
+        self._departures = {}
+
+    @staticmethod
+    def _edge(record):
+        if record.get('type') != 'flight':
+            return None
+        start_city = record.get('start_city')
+        end_city = record.get('end_city')
+        date = record.get('date')
+        if not start_city or not end_city or date is None or start_city == end_city:
+            return None
+        return start_city, (date, record['id'], end_city)
+
+    def clear(self):
+        self._departures = {}
+
+    def add(self, record):
+        edge = self._edge(record)
+        if edge is not None:
+            bisect.insort(self._departures.setdefault(edge[0], []), edge[1])
+
+    def remove(self, record):
+        edge = self._edge(record)
+        if edge is None:
+            return
+        departures = self._departures.get(edge[0], [])
+        position = bisect.bisect_left(departures, edge[1])
+        if position < len(departures) and departures[position] == edge[1]:
+            del departures[position]
+
+    def update(self, old, new):
+        if self._edge(old) != self._edge(new):
+            self.remove(old)
+            self.add(new)
+
+    def rebuild(self, records):
+        self.clear()
+        for record in records:
+            edge = self._edge(record)
+            if edge is not None:
+                self._departures.setdefault(edge[0], []).append(edge[1])
+        for departures in self._departures.values():
+            departures.sort()
+
+    def departures(self, city, start, end):
+        """Get the flights leaving a city in a time window.
+
+        Args:
+            city (str): Departure city.
+            start (int): Earliest departure, inclusive, in epoch seconds.
+            end (int): Latest departure, inclusive, in epoch seconds.
+
+        Returns:
+            list: (date, flight_id, end_city) tuples in departure order.
+        """
+        departures = self._departures.get(city, ())
+        first = bisect.bisect_left(departures, (start,))
+        last = bisect.bisect_right(departures, (end, float('inf')))
+        return departures[first:last]
+
+    def search(self, origin, destination, earliest, k=3, min_layover=3600,
+               max_layover=24 * 3600, max_legs=3):
+        """Find the k earliest-arriving connections between two cities.
+
+        A best-first search over (city, arrival time) labels ordered by
+        arrival. Connections must respect time: each flight departs at least
+        min_layover and at most max_layover after the previous one arrives,
+        and the first flight departs within max_layover of earliest. No city
+        is visited twice. An earlier arrival in a city does not make a later
+        one redundant, since the later one may still catch flights beyond the
+        earlier one's max_layover. Only labels that end with the same flight
+        after visiting the same cities are interchangeable, so at most k of
+        each of those are expanded.
+
+        Args:
+            origin (str): Departure city.
+            destination (str): Arrival city.
+            earliest (int): Earliest departure, in epoch seconds.
+            k (int): Number of connections to return.
+            min_layover (int): Minimum seconds between connecting flights.
+            max_layover (int): Maximum seconds to wait for a flight.
+            max_legs (int): Maximum number of flights in a connection.
+
+        Returns:
+            list: Up to k Itinerary tuples, earliest arrival first.
+        """
+        results = []
+        if origin == destination or k < 1:
+            return results
+        # (last flight id, cities) -> number of labels expanded
+        expanded = {}
+        counter = 0
+        # (arrival, tie breaker, city, departure window, flight ids, cities, departure)
+        queue = [(earliest, counter, origin, (earliest, earliest + max_layover),
+                  (), (origin,), None)]
+        while queue and len(results) < k:
+            arrival, _, city, window, flight_ids, cities, departure = heapq.heappop(queue)
+            if city == destination:
+                results.append(Itinerary(list(flight_ids), list(cities), departure, arrival))
+                continue
+            if len(flight_ids) >= max_legs:
+                continue
+            key = (flight_ids[-1] if flight_ids else None, frozenset(cities))
+            if expanded.get(key, 0) >= k:
+                continue
+            expanded[key] = expanded.get(key, 0) + 1
+            for date, flight_id, end_city in self.departures(city, *window):
+                if end_city in cities:
+                    continue
+                landed = date + flight_duration(city, end_city)
+                counter += 1
+                heapq.heappush(queue, (
+                    landed, counter, end_city, (landed + min_layover, landed + max_layover),
+                    flight_ids + (flight_id,), cities + (end_city,),
+                    departure if departure is not None else date
+                ))
+        return results
@@ -0,0 +1,166 @@
+import bisect
+import heapq
+import re
+
+from controllers.indexes import RecordIndex
+
+# Searchable fields of each record type and the weight of a match in them
+SEARCH_FIELDS = {
+    'client': {'name': 3, 'phone_number': 2, 'city': 1},
+    'airline': {'company_name': 3},
+    'flight': {'start_city': 1, 'end_city': 1},
+}
+
+# Weight multiplier of a whole-word match over a prefix match
+EXACT_BONUS = 2
+
+_WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Split text into lowercase words.
+
+    Args:
+        text (str): Text to split.
+
+    Returns:
+        list: The words, in order.
+    """
+    return _WORD.findall(str(text).lower())
+
+
+def _field_tokens(field, value):
+    tokens = tokenize(value)
+    if field == 'phone_number':
+        # Find phone numbers however they were typed or grouped
+        digits = ''.join(ch for ch in str(value) if ch.isdigit())
+        if digits:
+            tokens.append(digits)
+    return tokens
+
+
+class TextIndex(RecordIndex):
+    """Inverted index from words to the records containing them.
+
+    Every word of the searchable fields maps to the records holding it and
+    the weight of its best field. The distinct words are also kept sorted, so
+    the last, partly typed word of a query is matched as a prefix with a
+    binary search instead of a scan.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._postings = {}
+        self._words = []
+        self._types = {}
+
+    @staticmethod
+    def _weights(record):
+        weights = {}
+        for field, weight in SEARCH_FIELDS.get(record.get('type'), {}).items():
+            value = record.get(field)
+            if not value:
+                continue
+            for token in _field_tokens(field, value):
+                if weights.get(token, 0) < weight:
+                    weights[token] = weight
+        return weights
+
+    def clear(self):
+        self._postings = {}
+        self._words = []
+        self._types = {}
+
+    def add(self, record):
+        weights = self._weights(record)
+        if not weights:
+            return
+        record_id = record['id']
+        self._types[record_id] = record['type']
+        for token, weight in weights.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                bisect.insort(self._words, token)
+            posting[record_id] = weight
+
+    def remove(self, record):
+        record_id = record['id']
+        for token in self._weights(record):
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(record_id, None)
+            if not posting:
+                del self._postings[token]
+                del self._words[bisect.bisect_left(self._words, token)]
+        self._types.pop(record_id, None)
+
+    def update(self, old, new):
+        if self._weights(old) != self._weights(new):
+            self.remove(old)
+            self.add(new)
+
+    def rebuild(self, records):
+        self.clear()
+        for record in records:
+            weights = self._weights(record)
+            if not weights:
+                continue
+            self._types[record['id']] = record['type']
+            for token, weight in weights.items():
+                self._postings.setdefault(token, {})[record['id']] = weight
+        self._words = sorted(self._postings)
+
+    def _matches(self, token, prefix):
+        """Scores of the records matching one query word."""
+        exact = self._postings.get(token, {})
+        scores = {record_id: weight * EXACT_BONUS for record_id, weight in exact.items()}
+        if prefix:
+            words = self._words
+            position = bisect.bisect_right(words, token)
+            while position < len(words) and words[position].startswith(token):
+                for record_id, weight in self._postings[words[position]].items():
+                    if scores.get(record_id, 0) < weight:
+                        scores[record_id] = weight
+                position += 1
+        return scores
+
+    def search(self, query, record_type=None, limit=50):
+        """Find the records matching every word of a query, best first.
+
+        The last word also matches longer words starting with it, so results
+        follow the query as it is typed. A record scores the weight of the
+        field each word was found in, doubled for whole-word matches.
+
+        Args:
+            query (str): Words to search for.
+            record_type (str, optional): Only return records of this type.
+            limit (int): Maximum number of results.
+
+        Returns:
+            list: (score, record_id) tuples, highest score first and lowest
+                ID first among equal scores.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        last = len(tokens) - 1
+        matches = [self._matches(token, position == last) for position, token in enumerate(tokens)]
+        # Intersect starting from the smallest match set, so every step costs
+        # at most the size of the rarest word
+        matches.sort(key=len)
+        scores = matches[0]
+        for other in matches[1:]:
+            if not scores:
+                break
+            scores = {record_id: score + other[record_id]
+                      for record_id, score in scores.items() if record_id in other}
+        if not scores:
+            return []
+        if record_type is not None:
+            types = self._types
+            scores = {record_id: score for record_id, score in scores.items()
+                      if types.get(record_id) == record_type}
+        best = heapq.nsmallest(limit, ((-score, record_id) for record_id, score in scores.items()))
+        return [(-score, record_id) for score, record_id in best]
@@ -0,0 +1,179 @@
+class VersionHistory:
+    """Earlier versions of changed records, kept for open read views.
+
+    Every mutation advances the controller's generation. While read views are
+    open, the version of a record replaced by a mutation is kept together with
+    the generation of that mutation. A view pinned at generation G reads a
+    record as the version replaced by its first change after G, or as the
+    current version if it has not changed since. Records are never modified
+    in place, so keeping a version costs one reference, not a copy.
+    """
+
+    def __init__(self):
+        """Initialize an empty history."""
+        self._versions = {}
+
+    def __len__(self):
+        return sum(len(versions) for versions in self._versions.values())
+
+    def record(self, generation, record_id, old):
+        """Keep the version of a record replaced by a mutation.
+
+        Args:
+            generation (int): Generation of the mutation.
+            record_id (int): ID of the changed record.
+            old (dict): The replaced version, None if the record was created.
+        """
+        self._versions.setdefault(record_id, []).append((generation, old))
+
+    def value_at(self, record_id, generation, current):
+        """Get a record as it was at a generation.
+
+        Args:
+            record_id (int): ID of the record.
+            generation (int): Generation of the view.
+            current (dict): The current version, None if it does not exist.
+
+        Returns:
+            dict: The version at that generation, None if it did not exist.
+        """
+        for changed, old in self._versions.get(record_id, ()):
+            if changed > generation:
+                return old
+        return current
+
+    def ids_between(self, after_id, upto_id):
+        """Get the IDs with kept versions in a range, in ascending order.
+
+        Args:
+            after_id (int): Exclusive lower bound, None for no bound.
+            upto_id (int): Inclusive upper bound, None for no bound.
+
+        Returns:
+            list: The matching record IDs.
+        """
+        return sorted(
+            record_id for record_id in self._versions
+            if (after_id is None or record_id > after_id)
+            and (upto_id is None or record_id <= upto_id)
+        )
+
+    def prune(self, oldest):
+        """Drop the versions no open view can read any more.
+
+        Args:
+            oldest (int): Generation of the oldest open view, None if no view
+                is open, which drops everything.
+        """
+        if oldest is None:
+            self._versions = {}
+            return
+        for record_id in list(self._versions):
+            versions = [(changed, old) for changed, old in self._versions[record_id]
+                        if changed > oldest]
+            if versions:
+                self._versions[record_id] = versions
+            else:
+                del self._versions[record_id]
+
+
+class ReadView:
+    """A consistent, read-only view of the records at one generation.
+
+    Reads see the records exactly as they were when the view was opened,
+    whatever is created, updated or deleted afterwards. Opening a view copies
+    nothing, and writers are never blocked for longer than a single read. A
+    view must be released when done, so the versions kept for it can be
+    dropped; using it as a context manager does that.
+
+    Attributes:
+        generation (int): Generation the view is pinned at.
+    """
+
+    def __init__(self, controller, generation):
+        """Initialize a new ReadView. Use RecordController.read_view().
+
+        Args:
+            controller (RecordController): Controller holding the records.
+            generation (int): Generation to pin the view at.
+        """
+        self._controller = controller
+        self.generation = generation
+        self._released = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+    def release(self):
+        """Release the view. Further reads raise RuntimeError."""
+        if not self._released:
+            self._released = True
+            self._controller._release_view(self.generation)
+
+    def _check(self):
+        if self._released:
+            raise RuntimeError("Read view has been released")
+
+    def search_record(self, record_id):
+        """Get a record as it was when the view was opened.
+
+        Args:
+            record_id (int): ID of the record.
+
+        Returns:
+            dict: A copy of the record, or None if it did not exist.
+        """
+        self._check()
+        controller = self._controller
+        with controller._lock:
+            record = controller._history.value_at(
+                record_id, self.generation, controller._records.get(record_id)
+            )
+        return dict(record) if record is not None else None
+
+    def iter_records(self, record_type=None, batch_size=1000):
+        """Iterate over the records of the view, in ID order.
+
+        Args:
+            record_type (str, optional): Only yield records of this type.
+            batch_size (int): Number of records fetched per batch.
+
+        Yields:
+            dict: A copy of each record.
+        """
+        self._check()
+        controller = self._controller
+        after_id = None
+        while True:
+            with controller._lock:
+                self._check()
+                ids = controller._order.ids_after(after_id, record_type, batch_size)
+                upto_id = ids[-1] if len(ids) == batch_size else None
+                # Records deleted since the view was opened are only in the history
+                live = set(ids)
+                ids = sorted(live.union(controller._history.ids_between(after_id, upto_id)))
+                batch = []
+                for record_id in ids:
+                    record = controller._history.value_at(
+                        record_id, self.generation, controller._records.get(record_id)
+                    )
+                    if record is not None and (record_type is None or record['type'] == record_type):
+                        batch.append(dict(record))
+            yield from batch
+            if upto_id is None:
+                return
+            after_id = upto_id
+
+    def get_all_records(self, record_type=None):
+        """Get all records of the view.
+
+        Args:
+            record_type (str, optional): Only return records of this type.
+
+        Returns:
+            list: Copies of the records, in ID order.
+        """
+        return list(self.iter_records(record_type))
@@ -1,22 +1,260 @@
+import argparse
+import contextlib
+import json
+import sys
+import time
+
 from controllers.record_controller import RecordController
-from views.gui import GUI
+from controllers.changefeed import ChangeFeed
+from controllers.replication import Follower
+from controllers.profiling import Profiler
+
+def parse_args(argv=None):
+    """Parse the command line arguments.
+
+    Args:
+        argv (list, optional): Arguments to parse, defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Travel Agent Record Management System")
+    parser.add_argument(
+        '--profile',
+        metavar='DIR',
+        help="profile the whole session with cProfile and tracemalloc, writing reports to DIR"
+    )
+    parser.add_argument(
+        '--profile-op',
+        metavar='NAME',
+        action='append',
+        default=[],
+        help="profile every call of one operation, e.g. save, load or create_record (repeatable)"
+    )
+    parser.add_argument(
+        '--profile-top',
+        metavar='N',
+        type=int,
+        default=25,
+        help="number of entries in the stats and allocation reports"
+    )
+    parser.add_argument(
+        '--data-dir',
+        metavar='DIR',
+        help="directory of the data files, defaults to the 'data' directory of the application"
+    )
+    # Without a command the GUI is started. views.gui, and with it tkinter,
+    # is only imported then, so scripted use starts quickly.
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+    count = commands.add_parser('count', help="print the number of records")
+    count.add_argument('--type', dest='record_type', help="only count records of this type")
+    show = commands.add_parser('show', help="print one record as JSON")
+    show.add_argument('record_id', type=int, help="ID of the record")
+    export = commands.add_parser('export', help="print records as JSON lines")
+    export.add_argument('--type', dest='record_type', help="only export records of this type")
+    import_ = commands.add_parser('import', help="validate and import records")
+    import_.add_argument(
+        'file', help="JSON array or JSON lines file of records with a 'type' field, - for stdin"
+    )
+    commands.add_parser('verify', help="check the reporting views")
+    archive = commands.add_parser('archive', help="move past months of flights to the archive")
+    archive.add_argument('--before', required=True, metavar='YYYY-MM',
+                         help="first month to keep in memory")
+    changes = commands.add_parser('changes', help="print the change feed as JSON lines")
+    changes.add_argument('--after', type=int, metavar='SEQ',
+                         help="start after this sequence number")
+    changes.add_argument('--consumer', metavar='NAME',
+                         help="resume from the checkpoint of NAME and advance it")
+    changes.add_argument('--limit', type=int, metavar='N', help="print at most N changes")
+    follow = commands.add_parser('follow', help="apply the log shipped to DIR until interrupted")
+    follow.add_argument('directory', metavar='DIR', help="shipping directory of the primary")
+    follow.add_argument('--interval', type=float, default=0.2, metavar='S',
+                        help="seconds between polls of the shipped log")
+    promote = commands.add_parser('promote', help="turn the follower in DIR into a primary")
+    promote.add_argument('directory', metavar='DIR', help="shipping directory of the primary")
+    return parser.parse_args(argv)
+
+def create_profiler(args):
+    """Create the profiler requested on the command line or in the environment.
+
+    Command line options take precedence over the AIRLINE_PROFILE* variables.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+
+    Returns:
+        Profiler: The configured profiler, or None if profiling is disabled.
+    """
+    if args.profile or args.profile_op:
+        return Profiler(
+            args.profile or 'profiles',
+            args.profile_top,
+            args.profile_op,
+            session=bool(args.profile)
+        )
+    return Profiler.from_environment()
+
+def read_rows(filename):
+    """Read records to import from a JSON array or JSON lines file.
+
+    Args:
+        filename (str): Path of the file, or '-' for standard input.
+
+    Returns:
+        list: The record data dictionaries.
+    """
+    f = sys.stdin if filename == '-' else open(filename, encoding='utf-8')
+    try:
+        text = f.read()
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+def run_command(controller, args, out=None):
+    """Run a headless command against the records.
+
+    Args:
+        controller (RecordController): Controller holding the records.
+        args (argparse.Namespace): Parsed arguments with a command.
+        out (file, optional): Stream for the output, defaults to sys.stdout.
 
-def main():
+    Returns:
+        int: Process exit status, 0 on success.
+    """
+    out = out or sys.stdout
+    if args.command == 'count':
+        print(controller.count_records(args.record_type), file=out)
+    elif args.command == 'show':
+        record = controller.search_record(args.record_id)
+        if record is None:
+            print(f"No record with ID {args.record_id}", file=sys.stderr)
+            return 1
+        print(json.dumps(record), file=out)
+    elif args.command == 'export':
+        # A read view keeps the export consistent while others write
+        with controller.read_view() as view:
+            for record in view.iter_records(args.record_type):
+                out.write(json.dumps(record) + '\n')
+    elif args.command == 'import':
+        created, errors = controller.import_records(read_rows(args.file))
+        for position, problems in sorted(errors.items()):
+            for field, message in problems:
+                print(f"row {position}: {field}: {message}", file=sys.stderr)
+        print(f"Imported {len(created)} records, rejected {len(errors)}", file=out)
+        return 1 if errors else 0
+    elif args.command == 'archive':
+        print(f"Archived {controller.archive(args.before)} flights", file=out)
+    elif args.command == 'changes':
+        feed = controller.change_feed or ChangeFeed(controller.changes_dir)
+        after = args.after
+        if after is None:
+            after = feed.checkpoint(args.consumer) if args.consumer else 0
+        if controller.change_feed is not None:
+            # Loading first publishes changes a crash kept out of the feed
+            changes = controller.read_changes(after, args.limit)
+        else:
+            changes = feed.read(after, args.limit)
+        last_seq = None
+        for change in changes:
+            out.write(json.dumps(change) + '\n')
+            last_seq = change['seq']
+        if args.consumer and last_seq is not None:
+            out.flush()
+            feed.commit(args.consumer, last_seq)
+    elif args.command == 'verify':
+        problems = controller.verify_reports()
+        print(json.dumps({name: len(groups) for name, groups in problems.items()}), file=out)
+        return 1 if problems else 0
+    return 0
+
+def run_follower(args, out=None):
+    """Run the follow or promote command on a follower.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments with a replication command.
+        out (file, optional): Stream for the output, defaults to sys.stdout.
+
+    Returns:
+        int: Process exit status, 0 on success.
+    """
+    out = out or sys.stdout
+    follower = Follower(args.directory, getattr(args, 'interval', 0.2))
+    try:
+        if args.command == 'promote':
+            follower.promote()
+            print(follower.controller.data_dir, file=out)
+            return 0
+        follower.start()
+        try:
+            while True:
+                time.sleep(5)
+                lag = follower.lag()
+                print(f"Applied up to {follower.applied_seq}, lag {lag['entries']} entries, "
+                      f"{lag['seconds']:.1f}s")
+        except KeyboardInterrupt:
+            return 0
+        finally:
+            follower.stop()
+    finally:
+        follower.controller.close()
+
+def run_gui(controller, profiler):
+    """Start the GUI and block until its window is closed.
+
+    Args:
+        controller (RecordController): Controller holding the records.
+        profiler (Profiler): Optional profiler for the event handlers.
+    """
+    from views.gui import GUI
+    gui = GUI(controller, profiler=profiler)
+    gui.run()
+
+def main(argv=None):
     """Initialize and run the main application.
-    
+
     This function serves as the entry point for the application. It:
-    1. Creates a new RecordController instance to manage data operations
-    2. Initializes the GUI with the controller
-    3. Starts the GUI main loop
-    
-    The application will continue running until the user closes the window.
+    1. Starts session profiling if it was requested
+    2. Creates a new RecordController instance to manage data operations
+    3. Runs the headless command given on the command line, or
+    4. Initializes the GUI with the controller and starts its main loop
+
+    Args:
+        argv (list, optional): Command line arguments, defaults to sys.argv.
+
+    Returns:
+        int: Process exit status.
     """
-    # Initialize the controller
-    controller = RecordController()
-    
-    # Initialize and run the GUI
-    gui = GUI(controller)
-    gui.run()
+    args = parse_args(argv)
+    profiler = create_profiler(args)
+    if profiler and profiler.session:
+        profiler.start_session()
+
+    out = sys.stdout
+    # Headless commands keep stdout for their output, progress messages go to stderr
+    quiet = contextlib.redirect_stdout(sys.stderr) if args.command else contextlib.nullcontext()
+    try:
+        with quiet:
+            if args.command in ('follow', 'promote'):
+                return run_follower(args, out)
+            # Initialize the controller
+            controller = RecordController(data_dir=args.data_dir)
+            if profiler:
+                profiler.wrap(controller, controller.PROFILED_OPERATIONS)
+
+            try:
+                if args.command:
+                    return run_command(controller, args, out)
+                run_gui(controller, profiler)
+                return 0
+            finally:
+                # Make sure grouped saves reach the disk before exiting
+                controller.close()
+    finally:
+        if profiler:
+            profiler.stop_session()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
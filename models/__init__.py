@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
-from datetime import datetime
 import json
 import os
+from . import storage
 
 class BaseModel(ABC):
     """Base class for all data models in the application.
@@ -42,157 +42,106 @@ class BaseModel(ABC):
         pass
     
     @staticmethod
-    def save_records(records, filename):
+    def save_records(records, filename, codec=None, level=None):
         """Save records to a JSON file.
         
         Args:
             records (list): List of record dictionaries to save.
             filename (str): Path to the JSON file.
+            codec (str, optional): Compression codec ('none', 'gzip', 'bz2' or
+                'lzma'). Defaults to an uncompressed file.
+            level (int, optional): Compression level, trading CPU for I/O.
             
         Note:
-            Automatically converts IDs to integers and formats dates.
+            Automatically converts IDs to integers. Dates are expected to be
+            epoch seconds already and are written unchanged. Records are
+            streamed to a temporary file which atomically replaces the target
+            once it is safely on disk; the replaced file is kept as the
+            previous generation.
         """
         # Ensure all IDs are integers before saving
         for record in records:
             if 'id' in record:
                 record['id'] = int(record['id'])
-            if 'client_id' in record:
+            if record.get('client_id') is not None:
                 record['client_id'] = int(record['client_id'])
-            if 'airline_id' in record:
+            if record.get('airline_id') is not None:
                 record['airline_id'] = int(record['airline_id'])
-            # Handle date fields
-            if 'date' in record:
-                if isinstance(record['date'], datetime):
-                    record['date'] = record['date'].strftime("%Y-%m-%d %H:%M:%S")
-            if 'departure_date' in record:
-                if isinstance(record['departure_date'], datetime):
-                    record['departure_date'] = record['departure_date'].strftime("%Y-%m-%d %H:%M:%S")
-            if 'arrival_date' in record:
-                if isinstance(record['arrival_date'], datetime):
-                    record['arrival_date'] = record['arrival_date'].strftime("%Y-%m-%d %H:%M:%S")
-        with open(filename, 'w') as f:
-            json.dump(records, f)
+        storage.save(records, filename, codec, level)
     
     @staticmethod
-    def load_records(filename):
+    def load_records(filename, strict=False):
         """Load records from a JSON file.
         
         Args:
             filename (str): Path to the JSON file.
+            strict (bool): Raise instead of returning an empty list when
+                neither generation of the file can be decoded.
             
         Returns:
             list: List of record dictionaries.
+
+        Raises:
+            ValueError: If strict is set and the file cannot be decoded.
             
         Note:
-            Handles various encodings and converts string IDs to integers.
-            Returns empty list if file doesn't exist or is invalid.
+            Compressed files are detected automatically and decompressed as
+            they are read. Converts string IDs to integers.
+            If the file is damaged, for example truncated by a crash, the
+            previous generation kept by save_records() is loaded instead.
+            Returns empty list if neither file exists or can be decoded.
         """
         print(f"BaseModel.load_records called with filename: {filename}")
         if not os.path.exists(filename):
             print(f"File does not exist: {filename}")
             return []
+        records = BaseModel._read_records(filename)
+        if records is None:
+            previous = storage.previous_filename(filename)
+            if os.path.exists(previous):
+                print(f"Falling back to previous generation: {previous}")
+                records = BaseModel._read_records(previous)
+        if records is None and strict:
+            raise ValueError(f"Records file is damaged and has no valid previous generation: {filename}")
+        return records if records is not None else []
+
+    @staticmethod
+    def _read_records(filename):
+        """Read and decode one records file.
+
+        Args:
+            filename (str): Path to the JSON file.
+
+        Returns:
+            list: List of record dictionaries, or None if the file is invalid.
+        """
         try:
-            # Try different encodings
-            encodings = ['utf-8', 'utf-8-sig', 'ascii']
-            content = None
-            
-            for encoding in encodings:
-                try:
-                    with open(filename, 'r', encoding=encoding) as f:
-                        content = f.read().strip()
-                        print(f"Successfully read file with {encoding} encoding")
-                        break
-                except UnicodeDecodeError:
-                    continue
-            
-            if content is None:
-                print("Failed to read file with any encoding")
-                return []
-                
-            print(f"File content: {content}")
-            if not content:  # File is empty
-                print("File is empty")
-                return []
-                
-            # Try to parse the JSON
-            try:
-                records = json.loads(content)
-                print(f"Loaded records: {records}")
-                # Convert any string IDs back to integers
-                for record in records:
+            records = []
+            with storage.open_text(filename) as f:
+                for record in storage.iter_records(f):
+                    # Convert any string IDs back to integers
                     if 'id' in record:
                         record['id'] = int(record['id'])
-                    if 'client_id' in record:
+                    if record.get('client_id') is not None:
                         record['client_id'] = int(record['client_id'])
-                    if 'airline_id' in record:
+                    if record.get('airline_id') is not None:
                         record['airline_id'] = int(record['airline_id'])
-                return records
-            except json.JSONDecodeError as e:
-                print(f"JSON decode error: {e}")
-                # Try to fix common JSON issues
-                content = content.replace('\n', '').replace('\r', '')
-                try:
-                    records = json.loads(content)
-                    print(f"Successfully loaded records after cleaning")
-                    return records
-                except json.JSONDecodeError as e:
-                    print(f"Still failed to decode JSON after cleaning: {e}")
-                    return []
+                    records.append(record)
+            print(f"Loaded {len(records)} records")
+            return records
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            print(f"JSON decode error: {e}")
         except Exception as e:
             print(f"Unexpected error in load_records: {e}")
-            return []
+            return None
 
-class Flight(BaseModel):
-    """Model class representing a flight record.
-    
-    Attributes:
-        airline_id (int): ID of the airline operating the flight.
-        client_id (int): ID of the client booking the flight.
-        start_city (str): Departure city of the flight.
-        end_city (str): Arrival city of the flight.
-        date (str): Date and time of the flight.
-    """
-    
-    def __init__(self):
-        """Initialize a new Flight instance."""
-        super().__init__()
-        self.airline_id = None
-        self.client_id = None
-        self.start_city = None
-        self.end_city = None
-        self.date = None
-    
-    def to_dict(self):
-        """Convert the flight instance to a dictionary.
-        
-        Returns:
-            dict: Dictionary containing flight data with all fields.
-        """
-        return {
-            'id': self.id,
-            'type': self.type,
-            'airline_id': self.airline_id,
-            'client_id': self.client_id,
-            'start_city': self.start_city,
-            'end_city': self.end_city,
-            'date': str(self.date) if self.date else None
-        }
-    
-    @classmethod
-    def from_dict(cls, data):
-        """Create a flight instance from a dictionary.
-        
-        Args:
-            data (dict): Dictionary containing flight data.
-            
-        Returns:
-            Flight: New flight instance with data from the dictionary.
-        """
-        flight = cls()
-        flight.id = data.get('id')
-        flight.airline_id = data.get('airline_id')
-        flight.client_id = data.get('client_id')
-        flight.start_city = data.get('start_city')
-        flight.end_city = data.get('end_city')
-        flight.date = data.get('date')
-        return flight 
\ No newline at end of file
+        # Try to fix common JSON issues
+        try:
+            with storage.open_text(filename) as f:
+                content = f.read().replace('\n', '').replace('\r', '')
+            records = json.loads(content)
+            print(f"Successfully loaded records after cleaning")
+            return records
+        except Exception as e:
+            print(f"Still failed to decode JSON after cleaning: {e}")
+            return None
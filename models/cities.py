@@ -0,0 +1,84 @@
+from collections import namedtuple
+
+City = namedtuple('City', ['name', 'code', 'country', 'latitude', 'longitude'])
+City.__doc__ = """A city served by flights.
+
+Attributes:
+    name (str): Display name, as stored in flight records.
+    code (str): IATA city or airport code.
+    country (str): Country name.
+    latitude (float): Latitude of the city centre in degrees.
+    longitude (float): Longitude of the city centre in degrees.
+"""
+
+# Offline reference table of the cities offered for flights, one entry each
+CITIES = (
+    City("Abu Dhabi", "AUH", "United Arab Emirates", 24.4539, 54.3773),
+    City("Amsterdam", "AMS", "Netherlands", 52.3676, 4.9041),
+    City("Auckland", "AKL", "New Zealand", -36.8485, 174.7633),
+    City("Bangkok", "BKK", "Thailand", 13.7563, 100.5018),
+    City("Beijing", "BJS", "China", 39.9042, 116.4074),
+    City("Belfast", "BFS", "United Kingdom", 54.5973, -5.9301),
+    City("Berlin", "BER", "Germany", 52.5200, 13.4050),
+    City("Busan", "PUS", "South Korea", 35.1796, 129.0756),
+    City("Cairo", "CAI", "Egypt", 30.0444, 31.2357),
+    City("Cardiff", "CWL", "United Kingdom", 51.4816, -3.1791),
+    City("Copenhagen", "CPH", "Denmark", 55.6761, 12.5683),
+    City("Doha", "DOH", "Qatar", 25.2854, 51.5310),
+    City("Dubai", "DXB", "United Arab Emirates", 25.2048, 55.2708),
+    City("Dublin", "DUB", "Ireland", 53.3498, -6.2603),
+    City("Edinburgh", "EDI", "United Kingdom", 55.9533, -3.1883),
+    City("Glasgow", "GLA", "United Kingdom", 55.8642, -4.2518),
+    City("Hanoi", "HAN", "Vietnam", 21.0278, 105.8342),
+    City("Helsinki", "HEL", "Finland", 60.1699, 24.9384),
+    City("Ho Chi Minh City", "SGN", "Vietnam", 10.8231, 106.6297),
+    City("Hong Kong", "HKG", "Hong Kong", 22.3193, 114.1694),
+    City("Istanbul", "IST", "Turkey", 41.0082, 28.9784),
+    City("Jakarta", "JKT", "Indonesia", -6.2088, 106.8456),
+    City("Kuala Lumpur", "KUL", "Malaysia", 3.1390, 101.6869),
+    City("Kyoto", "UKY", "Japan", 35.0116, 135.7681),
+    City("London", "LON", "United Kingdom", 51.5074, -0.1278),
+    City("Los Angeles", "LAX", "United States", 34.0522, -118.2437),
+    City("Madrid", "MAD", "Spain", 40.4168, -3.7038),
+    City("Manila", "MNL", "Philippines", 14.5995, 120.9842),
+    City("Moscow", "MOW", "Russia", 55.7558, 37.6173),
+    City("Mumbai", "BOM", "India", 19.0760, 72.8777),
+    City("New York", "NYC", "United States", 40.7128, -74.0060),
+    City("Osaka", "OSA", "Japan", 34.6937, 135.5023),
+    City("Oslo", "OSL", "Norway", 59.9139, 10.7522),
+    City("Paris", "PAR", "France", 48.8566, 2.3522),
+    City("Phuket", "HKT", "Thailand", 7.8804, 98.3923),
+    City("Reykjavik", "REK", "Iceland", 64.1466, -21.9426),
+    City("Riyadh", "RUH", "Saudi Arabia", 24.7136, 46.6753),
+    City("Rome", "ROM", "Italy", 41.9028, 12.4964),
+    City("Seoul", "SEL", "South Korea", 37.5665, 126.9780),
+    City("Shanghai", "SHA", "China", 31.2304, 121.4737),
+    City("Singapore", "SIN", "Singapore", 1.3521, 103.8198),
+    City("Stockholm", "STO", "Sweden", 59.3293, 18.0686),
+    City("Sydney", "SYD", "Australia", -33.8688, 151.2093),
+    City("Tokyo", "TYO", "Japan", 35.6762, 139.6503),
+    City("Toronto", "YTO", "Canada", 43.6532, -79.3832),
+    City("Vancouver", "YVR", "Canada", 49.2827, -123.1207),
+    City("Vienna", "VIE", "Austria", 48.2082, 16.3738),
+)
+
+# Cities offered for flights, shared by the GUI dropdowns and validation
+CITY_NAMES = sorted(city.name for city in CITIES)
+
+KNOWN_CITIES = frozenset(CITY_NAMES)
+
+CITIES_BY_NAME = {city.name: city for city in CITIES}
+
+CITIES_BY_CODE = {city.code: city for city in CITIES}
+
+
+def find_city(name_or_code):
+    """Look up a city by name or code.
+
+    Args:
+        name_or_code (str): City name as stored in flights, or its code.
+
+    Returns:
+        City: The city, or None if it is not in the table.
+    """
+    return CITIES_BY_NAME.get(name_or_code) or CITIES_BY_CODE.get(name_or_code)
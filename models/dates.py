@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta, timezone
+
+# Flight dates are stored as whole seconds since this naive epoch. Naive
+# datetimes are converted as-is, without any local timezone adjustment.
+EPOCH = datetime(1970, 1, 1)
+
+# Format used when a date is shown to the user
+DISPLAY_FORMAT = "%H:%M, %d %B %Y"
+
+
+def to_epoch(value):
+    """Convert a date value to epoch seconds.
+
+    This is the single place where dates are parsed. It is applied when data
+    enters the system so records only ever hold integers.
+
+    Args:
+        value: An int or float of epoch seconds, a datetime, an ISO format
+            string ("2024-01-31T10:00:00" or "2024-01-31 10:00:00") or None.
+
+    Returns:
+        int: Seconds since the epoch, or None if value is None or empty.
+
+    Raises:
+        ValueError: If the value cannot be interpreted as a date.
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid date: {value!r}")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.strip())
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return (value - EPOCH) // timedelta(seconds=1)
+    raise ValueError(f"Invalid date: {value!r}")
+
+
+def from_epoch(seconds):
+    """Convert epoch seconds to a naive datetime.
+
+    Args:
+        seconds (int): Seconds since the epoch.
+
+    Returns:
+        datetime: The corresponding datetime, or None if seconds is None.
+    """
+    if seconds is None:
+        return None
+    return EPOCH + timedelta(seconds=seconds)
+
+
+def to_datetime(value):
+    """Convert any supported date value to a datetime.
+
+    Args:
+        value: Any value accepted by to_epoch().
+
+    Returns:
+        datetime: The corresponding datetime, or None for empty values.
+    """
+    if isinstance(value, datetime):
+        return value
+    return from_epoch(to_epoch(value))
+
+
+def month_key(seconds):
+    """Get the calendar month of a date.
+
+    Args:
+        seconds (int): Seconds since the epoch.
+
+    Returns:
+        str: The month as 'YYYY-MM', or None if seconds is None.
+    """
+    if seconds is None:
+        return None
+    date = EPOCH + timedelta(seconds=seconds)
+    return f"{date.year:04d}-{date.month:02d}"
+
+
+def shift_month(month, months):
+    """Move a calendar month forwards or backwards.
+
+    Args:
+        month (str): The month as 'YYYY-MM'.
+        months (int): Number of months to add, negative to go back.
+
+    Returns:
+        str: The resulting month as 'YYYY-MM'.
+    """
+    year, number = int(month[:4]), int(month[5:7])
+    index = year * 12 + number - 1 + months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def format_epoch(seconds, fmt=DISPLAY_FORMAT):
+    """Format epoch seconds for display.
+
+    Args:
+        seconds (int): Seconds since the epoch.
+        fmt (str): strftime format to use.
+
+    Returns:
+        str: The formatted date, or an empty string if seconds is None.
+    """
+    if seconds is None:
+        return ''
+    return from_epoch(seconds).strftime(fmt)
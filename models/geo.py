@@ -0,0 +1,136 @@
+import functools
+import math
+
+from .cities import CITIES
+
+# Mean Earth radius used for great-circle distances
+EARTH_RADIUS_KM = 6371.0088
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    """Import NumPy on first use, so importing this module stays cheap.
+
+    Returns:
+        module: The numpy module, or None if it is not installed.
+    """
+    try:
+        import numpy
+    except ImportError:  # Optional dependency, distances fall back to pure Python
+        return None
+    return numpy
+
+
+def great_circle_km(lat1, lon1, lat2, lon2):
+    """Get the great-circle distance between two points with the haversine formula.
+
+    With NumPy installed the arguments may be arrays, and distances between
+    all their elements are computed in one vectorized call.
+
+    Args:
+        lat1: Latitude of the first point(s) in degrees.
+        lon1: Longitude of the first point(s) in degrees.
+        lat2: Latitude of the second point(s) in degrees.
+        lon2: Longitude of the second point(s) in degrees.
+
+    Returns:
+        float: Distance in kilometres, or an array of them.
+    """
+    numpy = _numpy()
+    if numpy is not None:
+        m, asin = numpy, numpy.arcsin
+    else:
+        m, asin = math, math.asin
+    lat1, lon1, lat2, lon2 = (m.radians(value) for value in (lat1, lon1, lat2, lon2))
+    a = (m.sin((lat2 - lat1) / 2) ** 2
+         + m.cos(lat1) * m.cos(lat2) * m.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * asin(m.sqrt(a))
+
+
+# Position of each city name in CITIES and the distance matrix
+CITY_INDEX = {city.name: i for i, city in enumerate(CITIES)}
+
+
+@functools.lru_cache(maxsize=None)
+def distance_matrix():
+    """Get the distances between every pair of cities in the reference table.
+
+    The matrix is computed on first use and reused afterwards.
+
+    Returns:
+        Distances in km indexed by CITY_INDEX positions: a NumPy array, or a
+            list of lists without NumPy. Must not be modified.
+    """
+    numpy = _numpy()
+    if numpy is not None:
+        lat = numpy.array([city.latitude for city in CITIES])
+        lon = numpy.array([city.longitude for city in CITIES])
+        return great_circle_km(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+    return [
+        [great_circle_km(a.latitude, a.longitude, b.latitude, b.longitude) for b in CITIES]
+        for a in CITIES
+    ]
+
+
+def route_km(start_city, end_city):
+    """Get the distance between two cities of the reference table.
+
+    Args:
+        start_city (str): Name of the departure city.
+        end_city (str): Name of the arrival city.
+
+    Returns:
+        float: Distance in kilometres, or None if a city is unknown.
+    """
+    start = CITY_INDEX.get(start_city)
+    end = CITY_INDEX.get(end_city)
+    if start is None or end is None:
+        return None
+    return float(distance_matrix()[start][end])
+
+
+def mileage(flights, field):
+    """Sum the flown distance of flights per value of a field, in one pass.
+
+    With NumPy the city names are mapped to table positions once, the
+    distances of all flights are gathered from the precomputed matrix with a
+    single indexing operation and summed per group with bincount. Without
+    NumPy the same pass runs as a plain loop. Flights with an unknown city or
+    no value for the field are skipped.
+
+    Args:
+        flights (list): Flight records.
+        field (str): Grouping field, e.g. 'client_id' or 'airline_id'.
+
+    Returns:
+        dict: Total kilometres keyed by field value.
+    """
+    index = CITY_INDEX
+    distances = distance_matrix()
+    numpy = _numpy()
+    if numpy is None:
+        totals = {}
+        for flight in flights:
+            key = flight.get(field)
+            start = index.get(flight.get('start_city'))
+            end = index.get(flight.get('end_city'))
+            if key is None or start is None or end is None:
+                continue
+            totals[key] = totals.get(key, 0.0) + distances[start][end]
+        return totals
+
+    count = len(flights)
+    starts = numpy.fromiter((index.get(f.get('start_city'), -1) for f in flights), numpy.intp, count)
+    ends = numpy.fromiter((index.get(f.get('end_city'), -1) for f in flights), numpy.intp, count)
+    keys = [flight.get(field) for flight in flights]
+    valid = (starts >= 0) & (ends >= 0) & numpy.fromiter(
+        (key is not None for key in keys), bool, count
+    )
+    if not valid.any():
+        return {}
+    flown = distances[starts[valid], ends[valid]]
+    groups, inverse = numpy.unique(
+        numpy.array([key for key, ok in zip(keys, valid) if ok]), return_inverse=True
+    )
+    sums = numpy.bincount(inverse, weights=flown, minlength=len(groups))
+    return {key.item(): float(total) for key, total in zip(groups, sums)}
@@ -0,0 +1,172 @@
+from abc import update_abstractmethods
+
+from .dates import to_epoch, to_datetime
+
+# Registered model classes keyed by record type
+MODELS = {}
+
+
+class Field:
+    """Schema entry describing one attribute of a model.
+
+    Attributes:
+        name (str): Attribute and dictionary key name.
+        default: Default value, or a callable producing it when factory is True.
+        kind (str): 'str' for plain values, 'ref' for IDs of other records
+            (stored as int or None) and 'date' for dates (a datetime on the
+            model, epoch seconds in the record dictionary).
+        factory (bool): Whether default is a callable called for each value.
+    """
+
+    KINDS = ('str', 'ref', 'date')
+
+    def __init__(self, name, default='', kind='str', factory=False):
+        """Initialize a new Field.
+
+        Args:
+            name (str): Attribute and dictionary key name.
+            default: Default value, or a callable when factory is True.
+            kind (str): One of KINDS.
+            factory (bool): Whether default is a callable.
+
+        Raises:
+            ValueError: If the kind is not recognized.
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown field kind: {kind}")
+        self.name = name
+        self.default = default
+        self.kind = kind
+        self.factory = factory
+
+
+def to_ref(value):
+    """Convert a reference field value to the stored int, keeping None."""
+    return int(value) if value is not None else None
+
+
+def _date(value, default):
+    seconds = to_epoch(value)
+    return seconds if seconds is not None else to_epoch(default())
+
+
+def _compile(source, namespace, name):
+    """Compile generated source once and return the named function."""
+    exec(compile(source, f"<generated {name}>", 'exec'), namespace)
+    return namespace[name]
+
+
+def register(cls):
+    """Register a model class and generate its serialization code.
+
+    Reads the FIELDS schema of the class and generates, once at import time,
+    straight-line functions without loops or getattr/setattr calls:
+
+    - ``__init__`` setting every attribute to its default
+    - ``to_dict`` returning the record dictionary
+    - ``from_dict`` building an instance from a record dictionary
+    - ``normalize`` turning input data straight into a stored record
+      dictionary, without creating an instance
+
+    Args:
+        cls (type): BaseModel subclass with a FIELDS tuple.
+
+    Returns:
+        type: The same class, registered under its record type.
+    """
+    record_type = cls.__name__.lower()
+    namespace = {
+        'to_epoch': to_epoch,
+        'to_datetime': to_datetime,
+        'to_ref': to_ref,
+        '_date': _date,
+        'record_type': record_type,
+    }
+    for field in cls.FIELDS:
+        namespace[f"default_{field.name}"] = field.default
+
+    def default(field):
+        value = f"default_{field.name}"
+        return f"{value}()" if field.factory else value
+
+    init_lines = ["def __init__(self):", "    self.id = None", "    self.type = record_type"]
+    encode_items = ["'id': self.id", "'type': self.type"]
+    decode_lines = [
+        "def from_dict(cls, data):",
+        "    obj = cls.__new__(cls)",
+        "    get = data.get",
+        "    obj.id = get('id')",
+        "    obj.type = record_type",
+    ]
+    normalize_items = ["'id': record_id", "'type': record_type"]
+    for field in cls.FIELDS:
+        name = field.name
+        init_lines.append(f"    self.{name} = {default(field)}")
+        if field.kind == 'date':
+            encode_items.append(f"{name!r}: to_epoch(self.{name})")
+            decode_lines.append(f"    value = get({name!r})")
+            decode_lines.append(
+                f"    obj.{name} = to_datetime(value) if value is not None else {default(field)}"
+            )
+            fallback = f"default_{name}" if field.factory else f"lambda: default_{name}"
+            normalize_items.append(f"{name!r}: _date(get({name!r}), {fallback})")
+        elif field.kind == 'ref':
+            encode_items.append(f"{name!r}: self.{name}")
+            decode_lines.append(f"    obj.{name} = get({name!r}, {default(field)})")
+            normalize_items.append(f"{name!r}: to_ref(get({name!r}, {default(field)}))")
+        else:
+            encode_items.append(f"{name!r}: self.{name}")
+            decode_lines.append(f"    obj.{name} = get({name!r}, {default(field)})")
+            normalize_items.append(f"{name!r}: get({name!r}, {default(field)})")
+    decode_lines.append("    return obj")
+
+    init = _compile('\n'.join(init_lines), namespace, '__init__')
+    to_dict = _compile(
+        "def to_dict(self):\n    return {" + ', '.join(encode_items) + "}",
+        namespace, 'to_dict'
+    )
+    from_dict = _compile('\n'.join(decode_lines), namespace, 'from_dict')
+    normalize = _compile(
+        "def normalize(data, record_id):\n    get = data.get\n"
+        "    return {" + ', '.join(normalize_items) + "}",
+        namespace, 'normalize'
+    )
+
+    init.__qualname__ = f"{cls.__name__}.__init__"
+    init.__doc__ = f"Initialize a new {cls.__name__} instance with default values."
+    to_dict.__qualname__ = f"{cls.__name__}.to_dict"
+    to_dict.__doc__ = f"Convert the {record_type} instance to a dictionary."
+    from_dict.__qualname__ = f"{cls.__name__}.from_dict"
+    from_dict.__doc__ = f"Create a {record_type} instance from a dictionary."
+    normalize.__qualname__ = f"{cls.__name__}.normalize"
+    normalize.__doc__ = (
+        f"Build a stored {record_type} record from input data and an ID, "
+        "converting references to int and dates to epoch seconds."
+    )
+
+    cls.__init__ = init
+    cls.to_dict = to_dict
+    cls.from_dict = classmethod(from_dict)
+    cls.normalize = staticmethod(normalize)
+    update_abstractmethods(cls)
+    MODELS[record_type] = cls
+    return cls
+
+
+def get_model(record_type):
+    """Get the model class registered for a record type.
+
+    Args:
+        record_type (str): Record type, e.g. 'client'.
+
+    Returns:
+        type: The model class.
+
+    Raises:
+        ValueError: If the record type is not recognized.
+    """
+    try:
+        return MODELS[record_type]
+    except KeyError:
+        raise ValueError(f"Unknown record type: {record_type}")
+
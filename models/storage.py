@@ -0,0 +1,301 @@
+import bz2
+import gzip
+import io
+import json
+import lzma
+import os
+import shutil
+import threading
+
+# Supported codecs mapped to their file suffix and opener
+CODECS = {
+    'none': ('', None),
+    'gzip': ('.gz', gzip.open),
+    'bz2': ('.bz2', bz2.open),
+    'lzma': ('.xz', lzma.open),
+}
+
+# Leading bytes identifying compressed files, so reading never depends on the
+# current codec setting
+MAGIC_NUMBERS = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'lzma'),
+)
+
+DEFAULT_CODEC = 'none'
+
+# Suffix of the previous generation kept next to each saved file
+PREVIOUS_SUFFIX = '.prev'
+
+_encode = json.JSONEncoder(separators=(',', ':')).encode
+
+
+def check_codec(codec):
+    """Validate a codec name.
+
+    Args:
+        codec (str): Codec name, or None for the default.
+
+    Returns:
+        str: The validated codec name.
+
+    Raises:
+        ValueError: If the codec is not supported.
+    """
+    codec = codec or DEFAULT_CODEC
+    if codec not in CODECS:
+        raise ValueError(f"Unknown storage codec: {codec}")
+    return codec
+
+
+def codec_filename(filename, codec):
+    """Get the file name used for a codec.
+
+    Args:
+        filename (str): Uncompressed file name, e.g. 'records.json'.
+        codec (str): Codec name.
+
+    Returns:
+        str: The file name with the codec suffix appended.
+    """
+    return filename + CODECS[check_codec(codec)][0]
+
+
+def find_existing(filename):
+    """Find an existing file for any codec.
+
+    Args:
+        filename (str): Uncompressed file name, e.g. 'records.json'.
+
+    Returns:
+        str: Path of the first existing variant, or None if there is none.
+    """
+    for suffix, _ in CODECS.values():
+        if os.path.exists(filename + suffix):
+            return filename + suffix
+    return None
+
+
+def detect_codec(filename):
+    """Detect the codec of a file from its leading bytes.
+
+    Args:
+        filename (str): Path to the file.
+
+    Returns:
+        str: The codec name, 'none' for plain files.
+    """
+    with open(filename, 'rb') as f:
+        head = f.read(6)
+    for magic, codec in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return codec
+    return 'none'
+
+
+def open_text(filename, mode='r', codec=None, level=None):
+    """Open a possibly compressed file as a text stream.
+
+    Compression and decompression happen incrementally as the stream is read
+    or written, so no full decompressed copy is ever held in memory.
+
+    Args:
+        filename (str): Path to the file.
+        mode (str): 'r' to read, 'w' to write or 'a' to append.
+        codec (str, optional): Codec for writing. Reading detects the codec
+            from the file itself.
+        level (int, optional): Compression level. Higher values spend more
+            CPU for smaller files. Uses the codec default when None.
+
+    Returns:
+        A text file object.
+    """
+    if mode == 'r':
+        codec = detect_codec(filename)
+    else:
+        codec = check_codec(codec)
+    opener = CODECS[codec][1]
+    encoding = 'utf-8-sig' if mode == 'r' else 'utf-8'
+    if opener is None:
+        return open(filename, mode, encoding=encoding)
+    kwargs = {}
+    if level is not None and mode != 'r':
+        kwargs['preset' if codec == 'lzma' else 'compresslevel'] = level
+    return io.TextIOWrapper(opener(filename, mode + 'b', **kwargs), encoding=encoding)
+
+
+def write_records(records, stream):
+    """Write records to a text stream as a JSON array, one record per line.
+
+    The output is a valid JSON document that iter_records() can also read
+    back one line at a time.
+
+    Args:
+        records (iterable): Record dictionaries to write.
+        stream: Text file object to write to.
+    """
+    write = stream.write
+    write('[\n')
+    separator = ''
+    for record in records:
+        write(separator)
+        write(_encode(record))
+        separator = ',\n'
+    write('\n]\n')
+
+
+def iter_records(stream):
+    """Read records from a text stream one at a time.
+
+    Files written by write_records() are decoded line by line. Any other valid
+    JSON array, such as files written by older versions, is parsed whole.
+
+    Args:
+        stream: Text file object to read from.
+
+    Yields:
+        dict: Each record in the file.
+
+    Raises:
+        json.JSONDecodeError: If the content is not valid JSON, including a
+            file that was truncated before its closing bracket.
+    """
+    first = stream.readline()
+    if first.strip() != '[':
+        content = (first + stream.read()).strip()
+        if content:
+            yield from json.loads(content)
+        return
+    decode = json.loads
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        if line == ']':
+            return
+        if line[-1] == ',':
+            line = line[:-1]
+        yield decode(line)
+    raise json.JSONDecodeError("Records array is not terminated", '', 0)
+
+
+def previous_filename(filename):
+    """Get the path of the previous generation of a file.
+
+    Args:
+        filename (str): Path to the file.
+
+    Returns:
+        str: Path of the previous generation kept by save().
+    """
+    return filename + PREVIOUS_SUFFIX
+
+
+def save(records, filename, codec=None, level=None, keep_previous=True):
+    """Write records to a file with the given codec, atomically.
+
+    The records are written to a temporary file in the same directory, which
+    is fsynced and then renamed over the target. A crash at any point leaves
+    either the old or the new file in place, never a truncated one. The
+    replaced file stays available as the previous generation.
+
+    Args:
+        records (iterable): Record dictionaries to write.
+        filename (str): Path to the file.
+        codec (str, optional): Codec name, defaults to uncompressed.
+        level (int, optional): Compression level.
+        keep_previous (bool): Keep the replaced file as the previous generation.
+    """
+    codec = check_codec(codec)
+    temp_filename = f"{filename}.tmp.{os.getpid()}.{threading.get_ident()}"
+    try:
+        with open(temp_filename, 'wb') as raw:
+            opener = CODECS[codec][1]
+            if opener is None:
+                binary = raw
+            else:
+                kwargs = {}
+                if level is not None:
+                    kwargs['preset' if codec == 'lzma' else 'compresslevel'] = level
+                binary = opener(raw, 'wb', **kwargs)
+            stream = io.TextIOWrapper(binary, encoding='utf-8')
+            write_records(records, stream)
+            stream.flush()
+            stream.detach()
+            if binary is not raw:
+                binary.close()  # Writes the compressed trailer, leaves raw open
+            raw.flush()
+            os.fsync(raw.fileno())
+        if keep_previous and os.path.exists(filename):
+            _link_previous(filename)
+        os.replace(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+    _fsync_directory(os.path.dirname(os.path.abspath(filename)))
+
+
+def write_atomic(filename, data):
+    """Replace a small file with new contents, atomically.
+
+    Args:
+        filename (str): Path to the file.
+        data (bytes): The new contents.
+    """
+    temp_filename = f"{filename}.tmp.{os.getpid()}.{threading.get_ident()}"
+    try:
+        with open(temp_filename, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+    _fsync_directory(os.path.dirname(os.path.abspath(filename)))
+
+
+def _link_previous(filename):
+    """Keep the current file as the previous generation without a gap.
+
+    A hard link keeps the current file in place until it is replaced, so there
+    is no moment where neither generation exists. Copies where links are not
+    supported.
+    """
+    previous = previous_filename(filename)
+    if os.path.exists(previous):
+        os.remove(previous)
+    try:
+        os.link(filename, previous)
+    except OSError:
+        shutil.copy2(filename, previous)
+
+
+def _fsync_directory(directory):
+    """Make a rename durable by syncing its directory, where supported."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def load(filename):
+    """Read all records from a file of any codec.
+
+    Args:
+        filename (str): Path to the file.
+
+    Returns:
+        list: List of record dictionaries.
+    """
+    with open_text(filename, 'r') as f:
+        return list(iter_records(f))
@@ -0,0 +1,120 @@
+import io
+import json
+import pytest
+import main
+from controllers.changefeed import ChangeFeed
+from controllers.record_controller import RecordController
+
+
+def test_controller_publishes_changes(tmp_path):
+    """Test the change feed written by the controller.
+
+    Verifies that:
+    1. Every create, update and delete is published in order with the record
+       before and after the change
+    2. Readers resume after any sequence number
+    3. Sequence numbers continue across restarts
+    """
+    controller = RecordController(data_dir=str(tmp_path), commit_window=0, change_feed=True)
+    client = controller.create_record('client', {'name': "John Doe"})
+    controller.update_record(client.id, {'name': "Jack Doe"})
+    controller.delete_record(client.id)
+
+    changes = list(controller.read_changes())
+    assert [(c['seq'], c['op'], c['id']) for c in changes] == [
+        (1, 'create', client.id), (2, 'update', client.id), (3, 'delete', client.id)
+    ]
+    assert changes[0]['before'] is None
+    assert changes[1]['before']['name'] == "John Doe"
+    assert changes[1]['after']['name'] == "Jack Doe"
+    assert changes[2]['after'] is None
+    assert [c['seq'] for c in controller.read_changes(2)] == [3]
+
+    restarted = RecordController(data_dir=str(tmp_path), commit_window=0, change_feed=True)
+    restarted.create_record('airline', {'company_name': "Test Airlines"})
+    assert [c['seq'] for c in restarted.read_changes(3)] == [4]
+
+    with pytest.raises(RuntimeError):
+        RecordController(data_dir=str(tmp_path), change_feed=False).read_changes()
+
+
+
+def test_logged_changes_are_published_after_a_crash(tmp_path):
+    """Test changes lost between the log and the change feed writes.
+
+    Verifies that:
+    1. Mutations logged without their changes still load
+    2. Their changes are published on load, in order, with the records
+       before and after
+    3. New changes continue the sequence
+    """
+    controller = RecordController(data_dir=str(tmp_path), commit_window=0, change_feed=True)
+    client = controller.create_record('client', {'name': "John Doe"})
+
+    def crash(changes):
+        raise OSError("crashed before publishing")
+
+    controller.change_feed.append = crash
+    with pytest.raises(OSError):
+        controller.update_record(client.id, {'name': "Jack Doe"})
+    with pytest.raises(OSError):
+        controller.delete_record(client.id)
+
+    restarted = RecordController(data_dir=str(tmp_path), commit_window=0, change_feed=True)
+    changes = list(restarted.read_changes())
+    assert restarted.count_records('client') == 0
+    assert [(c['seq'], c['op'], c['id']) for c in changes] == [
+        (1, 'create', client.id), (2, 'update', client.id), (3, 'delete', client.id)
+    ]
+    assert changes[1]['before']['name'] == "John Doe"
+    assert changes[1]['after']['name'] == "Jack Doe"
+    assert changes[2]['after'] is None
+
+    restarted.create_record('airline', {'company_name': "Test Airlines"})
+    assert [c['seq'] for c in restarted.read_changes(3)] == [4]
+
+def test_feed_segments_and_checkpoints(tmp_path):
+    """Test segmented reads, consumer checkpoints and pruning.
+
+    Verifies that:
+    1. Reads resume in the middle of any segment
+    2. Consumers resume from their committed checkpoint
+    3. Only segments every consumer has read past are pruned
+    4. A torn last line is dropped when the feed is reopened
+    """
+    feed = ChangeFeed(str(tmp_path), segment_bytes=100)
+    for seq in range(1, 11):
+        feed.append([{'seq': seq, 'op': 'create', 'id': seq}])
+    assert len(feed._segments()) > 2
+    assert [c['seq'] for c in feed.read(6, limit=3)] == [7, 8, 9]
+
+    assert [c['seq'] for c in feed.consume('billing', limit=4)] == [1, 2, 3, 4]
+    feed.commit('billing', 4)
+    assert next(feed.consume('billing'))['seq'] == 5
+    feed.commit('crm', 8)
+    assert feed.prune() > 0
+    assert [c['seq'] for c in feed.consume('billing')] == [5, 6, 7, 8, 9, 10]
+    with pytest.raises(ValueError):
+        list(feed.read(0))
+
+    last = feed._segment_file(feed._segments()[-1])
+    with open(last, 'ab') as f:
+        f.write(b'{"seq": 11, "op"')
+    assert ChangeFeed(str(tmp_path)).last_seq == 10
+
+
+def test_changes_command(tmp_path):
+    """Test that the changes command advances the consumer checkpoint."""
+    controller = RecordController(data_dir=str(tmp_path), commit_window=0, change_feed=True)
+    controller.create_record('client', {'name': "John Doe"})
+    controller.create_record('client', {'name': "Jane Roe"})
+
+    args = main.parse_args(['changes', '--consumer', 'crm', '--limit', '1'])
+    out = io.StringIO()
+    main.run_command(controller, args, out)
+    assert json.loads(out.getvalue())['after']['name'] == "John Doe"
+
+    out = io.StringIO()
+    main.run_command(controller, args, out)
+    assert json.loads(out.getvalue())['after']['name'] == "Jane Roe"
+    assert controller.change_feed.checkpoint('crm') == 2
@@ -0,0 +1,37 @@
+import pytest
+from controllers import dedupe
+
+CLIENTS = [
+    {'id': 1, 'name': "John Doe", 'address_line1': "1 High Street",
+     'zip_code': "SW1A 1AA", 'phone_number': "+44 20 7946 0018"},
+    {'id': 2, 'name': "Jon Doe", 'address_line1': "1 High St",
+     'zip_code': "SW1A1AA", 'phone_number': "020 7946 0018"},
+    {'id': 3, 'name': "John Dobson", 'address_line1': "7 Mill Lane",
+     'zip_code': "SW1A 1AA", 'phone_number': "020 7946 9999"},
+    {'id': 4, 'name': "Jane Smith", 'address_line1': "9 Low Road",
+     'zip_code': "EH1 1AA", 'phone_number': "0131 496 0000"},
+]
+
+def test_blocking_keys():
+    """Test the blocking keys of a client.
+
+    Verifies that:
+    1. Phone numbers with and without a country code share a key
+    2. The zip key ignores spacing and uses the name prefix
+    """
+    assert dedupe.blocking_keys(CLIENTS[0])[0] == dedupe.blocking_keys(CLIENTS[1])[0]
+    assert dedupe.blocking_keys(CLIENTS[0])[1] == dedupe.blocking_keys(CLIENTS[2])[1]
+    assert dedupe.blocking_keys(CLIENTS[0])[1] == "zip:sw1a1aa:joh"
+
+def test_parallel_and_serial_results_match(monkeypatch):
+    """Test that scoring in a process pool finds the same candidates.
+
+    Verifies that:
+    1. Only the respelled client is a candidate
+    2. The process pool path returns the same candidates as the serial path
+    """
+    serial = dedupe.find_duplicate_clients(CLIENTS, workers=1)
+    assert [(c.keep_id, c.duplicate_id) for c in serial] == [(1, 2)]
+
+    monkeypatch.setattr(dedupe, 'PARALLEL_THRESHOLD', 0)
+    assert dedupe.find_duplicate_clients(CLIENTS, workers=2) == serial
@@ -1,6 +1,7 @@
 import pytest
 from datetime import datetime
 from models.flight import Flight
+from models.dates import to_epoch, format_epoch
 
 def test_flight_creation():
     """Test the creation of a new Flight instance.
@@ -28,7 +29,7 @@ def test_flight_to_dict():
     1. The ID is correctly converted
     2. The type is preserved
     3. Client and airline IDs are correctly stored
-    4. The date is converted to ISO format string
+    4. The date is converted to integer epoch seconds
     5. Start and end cities are correctly stored
     """
     flight = Flight()
@@ -43,7 +44,7 @@ def test_flight_to_dict():
     assert data['type'] == 'flight'
     assert data['client_id'] == 100
     assert data['airline_id'] == 200
-    assert isinstance(data['date'], str)
+    assert isinstance(data['date'], int)
     assert data['start_city'] == "New York"
     assert data['end_city'] == "Los Angeles"
 
@@ -75,4 +76,31 @@ def test_flight_from_dict():
     assert flight.airline_id == 200
     assert isinstance(flight.date, datetime)
     assert flight.start_city == "New York"
-    assert flight.end_city == "Los Angeles" 
\ No newline at end of file
+    assert flight.end_city == "Los Angeles" 
+
+def test_flight_date_round_trip():
+    """Test that flight dates survive conversion to and from epoch seconds.
+
+    Verifies that:
+    1. An ISO format string is converted to the same epoch seconds as its datetime
+    2. Epoch seconds are loaded back as the original datetime
+    3. Legacy "YYYY-MM-DD HH:MM:SS" strings are still accepted
+    """
+    departure = datetime(2024, 5, 17, 14, 30)
+    data = {
+        'id': 1,
+        'type': 'flight',
+        'client_id': 100,
+        'airline_id': 200,
+        'date': departure.isoformat(),
+        'start_city': "London",
+        'end_city': "Paris"
+    }
+
+    record = Flight.from_dict(data).to_dict()
+    assert record['date'] == to_epoch(departure)
+    assert Flight.from_dict(record).date == departure
+
+    data['date'] = "2024-05-17 14:30:00"
+    assert Flight.from_dict(data).date == departure
+    assert format_epoch(record['date']) == "14:30, 17 May 2024"
@@ -0,0 +1,47 @@
+import pytest
+from models import geo
+from models.cities import CITIES, CITY_NAMES, find_city
+from controllers.record_controller import RecordController
+
+def test_city_table():
+    """Test the city reference table.
+
+    Verifies that:
+    1. Names and codes are unique and names are sorted for the dropdowns
+    2. Cities can be found by name or code
+    """
+    assert len({city.name for city in CITIES}) == len(CITIES)
+    assert len({city.code for city in CITIES}) == len(CITIES)
+    assert CITY_NAMES == sorted(CITY_NAMES)
+    assert find_city("LON") is find_city("London")
+
+def test_route_distance():
+    """Test great-circle distances between cities."""
+    assert geo.route_km("London", "New York") == pytest.approx(5570, abs=10)
+    assert geo.route_km("Paris", "Paris") == 0
+    assert geo.route_km("London", "Atlantis") is None
+
+def test_mileage(tmp_path):
+    """Test mileage aggregation over the flight table.
+
+    Verifies that:
+    1. Distances are summed per client and per airline
+    2. Flights with unknown cities are skipped
+    """
+    flights = [
+        {'client_id': 1, 'airline_id': 5, 'start_city': "London", 'end_city': "Paris"},
+        {'client_id': 1, 'airline_id': 6, 'start_city': "Paris", 'end_city': "London"},
+        {'client_id': 2, 'airline_id': 5, 'start_city': "London", 'end_city': "Nowhere"},
+    ]
+    by_client = geo.mileage(flights, 'client_id')
+    assert by_client == {1: pytest.approx(2 * geo.route_km("London", "Paris"))}
+    assert set(geo.mileage(flights, 'airline_id')) == {5, 6}
+
+    controller = RecordController(data_dir=str(tmp_path), commit_window=0)
+    client = controller.create_record('client', {'name': "John Doe"})
+    airline = controller.create_record('airline', {'company_name': "Test Airlines"})
+    controller.create_record('flight', {'client_id': client.id, 'airline_id': airline.id,
+                                        'start_city': "London", 'end_city': "Paris"})
+    assert controller.mileage('airline') == {airline.id: pytest.approx(343.6, abs=0.5)}
+    with pytest.raises(ValueError):
+        controller.mileage('city')
@@ -0,0 +1,79 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import main
+from controllers.record_controller import RecordController
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import time allowed for the headless entry point, in seconds
+IMPORT_BUDGET = 0.25
+
+def test_headless_import_budget():
+    """Test that the headless entry point imports quickly.
+
+    Verifies that:
+    1. Importing main does not import tkinter or the GUI
+    2. NumPy is not imported and the city distances are not computed
+    3. The import stays within IMPORT_BUDGET
+    """
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import main\n"
+        "elapsed = time.perf_counter() - start\n"
+        "print(elapsed, 'tkinter' in sys.modules, 'views.gui' in sys.modules,\n"
+        "      'numpy' in sys.modules, sys.modules['models.geo'].distance_matrix.cache_info().currsize)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    elapsed, tkinter_loaded, gui_loaded, numpy_loaded, matrices = result.stdout.split()
+    assert tkinter_loaded == 'False'
+    assert gui_loaded == 'False'
+    assert numpy_loaded == 'False'
+    assert matrices == '0'
+    assert float(elapsed) < IMPORT_BUDGET
+
+def test_records_load_on_first_access(tmp_path):
+    """Test that the controller defers loading the records.
+
+    Verifies that:
+    1. Creating a controller does not load the records
+    2. The first read loads them
+    """
+    first = RecordController(data_dir=str(tmp_path), commit_window=0)
+    first.create_record('airline', {'company_name': "Test Air"})
+
+    controller = RecordController(data_dir=str(tmp_path), commit_window=0)
+    assert not controller._loaded
+    assert controller.count_records('airline') == 1
+    assert controller._loaded
+
+def test_run_command(tmp_path):
+    """Test the headless commands.
+
+    Verifies that:
+    1. import reports rejected rows and creates the valid ones
+    2. count and export print only their results
+    """
+    rows = tmp_path / 'rows.json'
+    rows.write_text(json.dumps([
+        {'type': 'airline', 'company_name': "Test Air"},
+        {'type': 'flight'},
+    ]))
+    controller = RecordController(data_dir=str(tmp_path), commit_window=0)
+
+    out = io.StringIO()
+    assert main.run_command(controller, main.parse_args(['import', str(rows)]), out) == 1
+    assert out.getvalue() == "Imported 1 records, rejected 1\n"
+
+    out = io.StringIO()
+    main.run_command(controller, main.parse_args(['count', '--type', 'airline']), out)
+    assert out.getvalue() == "1\n"
+
+    out = io.StringIO()
+    main.run_command(controller, main.parse_args(['export']), out)
+    assert [json.loads(line)['company_name'] for line in out.getvalue().splitlines()] == ["Test Air"]
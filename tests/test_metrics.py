@@ -0,0 +1,96 @@
+import json
+import threading
+import pytest
+from controllers.metrics import MetricsRegistry, Histogram
+from controllers.record_controller import RecordController
+
+def test_histogram_percentiles():
+    """Test percentile estimation from histogram buckets.
+
+    Verifies that:
+    1. Count and sum track every observation
+    2. The p50 estimate falls in the bucket of the median value
+    3. The p99 estimate never exceeds the largest observation
+    4. The exported bucket counts, including '+Inf', add up to the count
+    """
+    histogram = Histogram('latency', buckets=(1, 2, 4, 8, 16))
+    for value in range(1, 11):
+        histogram.observe(value)
+
+    assert histogram.count == 10
+    assert histogram.sum == 55
+    assert 4 <= histogram.percentile(50) <= 8
+    assert histogram.percentile(99) <= 10
+    assert histogram.to_dict()['buckets']['+Inf'] == 0
+    histogram.observe(100)
+    assert sum(histogram.to_dict()['buckets'].values()) == histogram.count
+
+def test_registry_exports():
+    """Test the JSON and Prometheus exports of the registry.
+
+    Verifies that:
+    1. Counters with the same name and labels are shared
+    2. The JSON export contains the counter value
+    3. The Prometheus export contains bucket, sum and count series
+    """
+    registry = MetricsRegistry()
+    registry.counter('saves_total', 'Saves', kind='full').inc()
+    registry.counter('saves_total', 'Saves', kind='full').inc(2)
+    with registry.time('save_seconds', 'Save latency'):
+        pass
+
+    data = json.loads(registry.to_json())
+    assert data['counters'][0]['value'] == 3
+    assert data['histograms'][0]['count'] == 1
+
+    text = registry.to_prometheus()
+    assert 'saves_total{kind="full"} 3' in text
+    assert 'save_seconds_bucket{le="+Inf"} 1' in text
+    assert 'save_seconds_count 1' in text
+
+def test_concurrent_updates_and_exports():
+    """Test metrics updated by several threads while they are exported.
+
+    Verifies that:
+    1. No counter increment or histogram observation is lost
+    2. Every export sees bucket counts consistent with the total count
+    """
+    registry = MetricsRegistry()
+    counter = registry.counter('events_total')
+    histogram = registry.histogram('sizes', buckets=(1, 10))
+
+    def work():
+        for i in range(5000):
+            counter.inc()
+            histogram.observe(i % 20)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        data = histogram.to_dict()
+        assert sum(data['buckets'].values()) == data['count']
+        registry.to_prometheus()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value == 20000
+    assert histogram.count == sum(histogram.to_dict()['buckets'].values()) == 20000
+
+def test_controller_operations_are_instrumented(tmp_path):
+    """Test that controller operations and storage calls are measured.
+
+    Verifies that:
+    1. Each public operation call is counted
+    2. Storage saves record their latency and bytes written
+    3. Search queries record the number of records scanned
+    """
+    controller = RecordController(data_dir=str(tmp_path), commit_window=0)
+    record = controller.create_record('airline', {'company_name': 'Test Airlines'})
+    controller.search_record(record.id)
+
+    registry = controller.metrics
+    assert registry.histogram('controller_operation_seconds', operation='create_record').count == 1
+    assert registry.histogram('storage_operation_seconds', operation='save').count == 1
+    assert registry.counter('storage_bytes_written_total').value > 0
+    assert registry.histogram('records_scanned', query='search_record').sum == 1
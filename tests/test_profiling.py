@@ -0,0 +1,69 @@
+import os
+import pytest
+from controllers.profiling import Profiler
+from controllers.record_controller import RecordController
+
+def test_profiler_from_environment():
+    """Test creating a profiler from environment variables.
+
+    Verifies that:
+    1. No profiler is created when the variables are unset
+    2. AIRLINE_PROFILE sets the output directory and enables the session
+    3. AIRLINE_PROFILE_OPS aliases are resolved to method names
+    """
+    assert Profiler.from_environment({}) is None
+
+    profiler = Profiler.from_environment({
+        'AIRLINE_PROFILE': 'out',
+        'AIRLINE_PROFILE_OPS': 'save, create_record',
+    })
+    assert profiler.output_dir == 'out'
+    assert profiler.session
+    assert profiler.operations == {'_save_records', 'create_record'}
+
+def test_armed_operation_is_profiled_once(tmp_path):
+    """Test scoped profiling of a single armed operation.
+
+    Verifies that:
+    1. Nothing is written before the operation is armed
+    2. The next call writes .prof, stats and allocation reports
+    3. Later calls are not profiled again
+    """
+    output_dir = tmp_path / 'profiles'
+    controller = RecordController(data_dir=str(tmp_path / 'data'), commit_window=0)
+    profiler = Profiler(str(output_dir), session=False)
+    profiler.wrap(controller, controller.PROFILED_OPERATIONS)
+
+    controller.create_record('airline', {'company_name': 'First'})
+    assert not output_dir.exists()
+
+    profiler.arm('save')
+    controller.create_record('airline', {'company_name': 'Second'})
+    controller.create_record('airline', {'company_name': 'Third'})
+
+    files = sorted(os.listdir(output_dir))
+    assert len(files) == 3
+    assert any(name.endswith('.prof') for name in files)
+    assert any(name.endswith('-alloc.txt') for name in files)
+
+def test_saves_on_the_commit_thread_are_profiled(tmp_path):
+    """Test profiling saves made by the group-commit thread.
+
+    Verifies that:
+    1. A save running on the commit thread writes its own profile
+    2. A session profile running in the main thread is not disturbed
+    """
+    output_dir = tmp_path / 'profiles'
+    controller = RecordController(data_dir=str(tmp_path / 'data'), commit_window=0.01)
+    profiler = Profiler(str(output_dir), operations=['save'])
+    profiler.wrap(controller, controller.PROFILED_OPERATIONS)
+
+    profiler.start_session()
+    controller.create_record('airline', {'company_name': 'First'})
+    controller.flush()
+    session_path = profiler.stop_session()
+    controller.close()
+
+    files = os.listdir(output_dir)
+    assert any(name.startswith('op-save_records') and name.endswith('.prof') for name in files)
+    assert os.path.exists(session_path)
@@ -0,0 +1,386 @@
+import pytest
+from controllers.record_controller import RecordController, IntegrityError, BookingConflictError
+from controllers.routes import flight_duration
+
+BOOKING_START = 1700000000
+
+@pytest.fixture
+def controller(tmp_path):
+    """Create a controller with one client, two airlines and three flights."""
+    controller = RecordController(data_dir=str(tmp_path), commit_window=0)
+    client = controller.create_record('client', {'name': "John Doe"})
+    airline = controller.create_record('airline', {'company_name': "Test Airlines"})
+    other = controller.create_record('airline', {'company_name': "Other Airlines"})
+    for day, airline_id in enumerate((airline.id, airline.id, other.id), 1):
+        controller.create_record('flight', {
+            'client_id': client.id,
+            'airline_id': airline_id,
+            'date': f"2024-05-0{day} 09:00:00",
+            'start_city': "London",
+            'end_city': "Paris"
+        })
+    return controller
+
+def test_restrict_refuses_delete(controller):
+    """Test deleting an airline that still operates flights.
+
+    Verifies that:
+    1. The delete raises an IntegrityError under the default 'restrict' policy
+    2. The airline and its flights are left in place
+    """
+    with pytest.raises(IntegrityError):
+        controller.delete_record(2)
+
+    assert controller.search_record(2) is not None
+    assert controller.foreign_keys['airline_id'].count(2) == 2
+
+def test_cascade_deletes_flights(controller, tmp_path):
+    """Test deleting a client whose flights cascade.
+
+    Verifies that:
+    1. Every flight of the client is deleted with it
+    2. The change is persisted in one save
+    """
+    saves = controller.metrics.histogram('storage_operation_seconds', operation='save')
+    before = saves.count
+    controller.delete_record(1)
+
+    assert controller.get_all_records('flight') == []
+    assert saves.count == before + 1
+    reloaded = RecordController(data_dir=str(tmp_path), commit_window=0)
+    assert reloaded.get_all_records('flight') == []
+
+def test_nullify_clears_references(tmp_path, controller):
+    """Test deleting an airline under the 'nullify' policy.
+
+    Verifies that:
+    1. The flights of the airline are kept
+    2. Their airline_id is cleared and the index no longer lists them
+    """
+    controller.on_delete['airline_id'] = 'nullify'
+    controller.delete_record(2)
+
+    flights = controller.get_all_records('flight')
+    assert [f['airline_id'] for f in flights] == [None, None, 3]
+    assert controller.foreign_keys['airline_id'].count(2) == 0
+
+def test_flight_requires_existing_references(controller):
+    """Test creating and updating flights with dangling references.
+
+    Verifies that:
+    1. Creating a flight for a missing client raises an IntegrityError
+    2. Pointing a flight at a record of the wrong type raises an IntegrityError
+    3. Moving a flight to another airline updates the foreign key index
+    """
+    with pytest.raises(IntegrityError):
+        controller.create_record('flight', {'client_id': 99, 'airline_id': 2})
+    with pytest.raises(IntegrityError):
+        controller.update_record(4, {'airline_id': 1})
+
+    controller.update_record(4, {'airline_id': 3})
+    assert controller.foreign_keys['airline_id'].referencing(3) == {4, 6}
+
+def test_update_coerces_string_references(controller):
+    """Test updating a flight with references given as strings.
+
+    Verifies that:
+    1. A string ID of an existing record is accepted
+    2. The reference is stored as an int and indexed
+    """
+    assert controller.update_record(4, {'client_id': '1', 'airline_id': '3'})
+
+    assert controller.search_record(4)['airline_id'] == 3
+    assert controller.foreign_keys['airline_id'].referencing(3) == {4, 6}
+
+def test_merge_duplicate_clients(controller):
+    """Test finding and merging a client entered twice.
+
+    Verifies that:
+    1. A respelled client with the same phone number is a merge candidate
+    2. An unrelated client is not
+    3. Merging moves the duplicate's flights and deletes the duplicate
+    """
+    controller.update_record(1, {
+        'address_line1': "1 High Street", 'zip_code': "SW1A 1AA", 'phone_number': "+44 20 7946 0018"
+    })
+    duplicate = controller.create_record('client', {
+        'name': "Jon Doe", 'address_line1': "1 High St",
+        'zip_code': "SW1A1AA", 'phone_number': "020 7946 0018"
+    })
+    controller.create_record('client', {
+        'name': "Jane Smith", 'address_line1': "9 Low Road",
+        'zip_code': "EH1 1AA", 'phone_number': "0131 496 0000"
+    })
+    controller.create_record('flight', {'client_id': duplicate.id, 'airline_id': 2})
+
+    candidates = controller.find_duplicate_clients(workers=1)
+    assert [(c.keep_id, c.duplicate_id) for c in candidates] == [(1, duplicate.id)]
+
+    assert controller.merge_clients(1, [duplicate.id]) == 1
+    assert controller.search_record(duplicate.id) is None
+    assert controller.foreign_keys['client_id'].count(1) == 4
+
+def test_reporting_views_follow_changes(controller):
+    """Test that the reporting views are updated incrementally.
+
+    Verifies that:
+    1. Counts per airline, client, route and month reflect created flights
+    2. Updates move a flight between groups
+    3. Cascading deletes are subtracted
+    4. The consistency check agrees with the maintained counts
+    """
+    reports = controller.reports
+    assert reports.count('airline', 2) == 2
+    assert reports.count('client', 1) == 3
+    assert reports.count('route', ("London", "Paris")) == 3
+
+    controller.update_record(4, {'end_city': "Rome", 'date': "2024-03-05T09:00:00"})
+    assert reports.count('route', ("London", "Rome")) == 1
+    assert reports.count('month', "2024-03") == 1
+
+    controller.delete_record(1)
+    assert reports.counts('client') == {}
+    assert reports.counts('route') == {}
+    assert controller.verify_reports() == {}
+
+def test_cursor_pagination(controller):
+    """Test walking records page by page with resume tokens.
+
+    Verifies that:
+    1. Pages are in ID order and filtered by type
+    2. Deleting a record between pages neither skips nor repeats records
+    3. The last page has no next cursor
+    4. A cursor cannot be reused for another record type
+    """
+    page = controller.get_page('flight', page_size=2)
+    assert [r['id'] for r in page.records] == [4, 5]
+
+    controller.delete_record(5)
+    controller.create_record('flight', {'client_id': 1, 'airline_id': 3})
+    page = controller.get_page('flight', page_size=2, cursor=page.next_cursor)
+    assert [r['id'] for r in page.records] == [6, 7]
+    assert page.next_cursor is None
+
+    with pytest.raises(ValueError):
+        controller.get_page('client', cursor=controller.get_page('flight', 1).next_cursor)
+
+def test_records_are_not_exposed(controller):
+    """Test that callers cannot change stored records through returned values.
+
+    Verifies that:
+    1. Records from get_records(), iter_records() and search_record() are copies
+    2. iter_records() yields records lazily in ID order
+    3. A scan over several batches is measured as one query
+    """
+    controller.get_records()[0]['name'] = "Changed"
+    next(controller.iter_records('airline'))['company_name'] = "Changed"
+    controller.search_record(1)['name'] = "Changed"
+
+    assert controller.search_record(1)['name'] == "John Doe"
+    assert controller.search_record(2)['company_name'] == "Test Airlines"
+    scanned = controller.metrics.histogram('records_scanned', query='get_all_records')
+    before = (scanned.count, scanned.sum)
+    assert [r['id'] for r in controller.iter_records('flight', batch_size=2)] == [4, 5, 6]
+    assert (scanned.count, scanned.sum) == (before[0] + 1, before[1] + 3)
+
+def test_import_records(controller):
+    """Test bulk import with batch validation.
+
+    Verifies that:
+    1. Valid rows are created with new IDs in order
+    2. Every problem of an invalid row is reported and the row is skipped
+    3. Flight references are checked against existing records
+    """
+    rows = [
+        {'type': 'airline', 'company_name': "Imported Air"},
+        {'type': 'client', 'name': "", 'zip_code': "!!", 'phone_number': "call me"},
+        {'type': 'flight', 'client_id': '1', 'airline_id': 2,
+         'start_city': "London", 'end_city': "Paris"},
+        {'type': 'flight', 'client_id': 99, 'airline_id': 2,
+         'start_city': "Atlantis", 'end_city': "Paris"},
+        {'type': 'hotel'},
+    ]
+    created, errors = controller.import_records(rows)
+    assert created == [7, 8]
+    assert controller.search_record(8)['client_id'] == 1
+    assert sorted(errors) == [1, 3, 4]
+    fields = {field for field, _ in errors[1]}
+    assert {'name', 'address_line1', 'zip_code', 'phone_number'} <= fields
+    assert ('client_id', "does not refer to an existing client") in errors[3]
+    assert ('start_city', "unknown city") in errors[3]
+    assert errors[4][0][0] == 'type'
+
+def test_model_cache(controller):
+    """Test the LRU cache behind get_model().
+
+    Verifies that:
+    1. Repeated lookups return the cached instance and count as hits
+    2. Updating or deleting a record drops its cached instance
+    3. The least recently used instance is evicted at capacity
+    """
+    flight = controller.get_model(4)
+    assert flight.date is not None and flight.airline_id == 2
+    assert controller.get_model(4) is flight
+    assert controller.models.stats()['hits'] == 1
+    assert controller.models.stats()['misses'] == 1
+
+    controller.update_record(4, {'end_city': "Tokyo"})
+    assert controller.get_model(4).end_city == "Tokyo"
+    controller.delete_record(4)
+    assert controller.get_model(4) is None
+
+    controller.models.capacity = 2
+    controller.models.clear()
+    first = controller.get_model(1)
+    controller.get_model(2)
+    controller.get_model(1)
+    controller.get_model(3)
+    assert controller.get_model(1) is first
+    assert controller.models.stats()['evictions'] == 1
+    assert controller.models.stats()['size'] == 2
+
+def test_read_view_is_isolated(controller):
+    """Test that a read view keeps seeing the records as they were.
+
+    Verifies that:
+    1. Creates, updates and deletes after opening the view are invisible to it
+    2. Iteration across batches still sees deleted records in ID order
+    3. Kept versions are dropped once the last view is released
+    """
+    with controller.read_view() as view:
+        controller.update_record(5, {'end_city': "Tokyo"})
+        controller.delete_record(6)
+        controller.create_record('airline', {'company_name': "New Airlines"})
+
+        flights = view.get_all_records('flight')
+        assert [f['id'] for f in flights] == [4, 5, 6]
+        assert flights[1]['end_city'] == "Paris"
+        assert [r['id'] for r in view.iter_records(batch_size=2)] == [1, 2, 3, 4, 5, 6]
+        assert view.search_record(7) is None
+        assert controller.search_record(5)['end_city'] == "Tokyo"
+        assert len(controller._history) == 3
+
+    assert len(controller._history) == 0
+    with pytest.raises(RuntimeError):
+        view.search_record(1)
+
+def test_archive_and_query_flights(tmp_path):
+    """Test moving old months to the cold archive.
+
+    Verifies that:
+    1. Flights before the cutoff leave memory and are written per month
+    2. Date range queries combine hot and archived flights, reading only
+       the archived months in range
+    3. Archived flights stay archived after a restart and their IDs are
+       not reused
+    4. Records referenced by archived flights cannot be deleted
+    """
+    controller = RecordController(data_dir=str(tmp_path), commit_window=0)
+    client = controller.create_record('client', {'name': "John Doe"})
+    airline = controller.create_record('airline', {'company_name': "Test Airlines"})
+    for date in ("2023-01-15T10:00:00", "2023-02-15T10:00:00", "2024-06-01T10:00:00",
+                 "2023-01-20T10:00:00"):
+        controller.create_record('flight', {
+            'client_id': client.id, 'airline_id': airline.id, 'date': date,
+            'start_city': "London", 'end_city': "Paris"
+        })
+
+    assert controller.archive("2024-01") == 3
+    assert [f['id'] for f in controller.get_all_records('flight')] == [5]
+    assert controller.archive_store.months() == ['2023-01', '2023-02']
+
+    flights = controller.query_flights("2023-01-01T00:00:00", "2023-02-01T00:00:00")
+    assert [f['id'] for f in flights] == [3, 6]
+    assert list(controller.archive_store._cache) == ['2023-01']
+    assert [f['id'] for f in controller.query_flights()] == [3, 6, 4, 5]
+
+    reloaded = RecordController(data_dir=str(tmp_path), commit_window=0)
+    assert reloaded.count_records('flight') == 1
+    assert reloaded.create_record('airline', {'company_name': "New"}).id == 7
+
+    reloaded.on_delete['client_id'] = 'cascade'
+    reloaded.delete_record(5)
+    with pytest.raises(IntegrityError):
+        reloaded.delete_record(client.id)
+    assert reloaded.archive_store.count_references('airline_id', airline.id) == 3
+
+def test_browse_windows(controller):
+    """Test browsing sorted and filtered windows of records.
+
+    Verifies that:
+    1. Windows follow the requested column order and filters
+    2. Windows past the end are moved back to the last full window
+    3. The sorted result set is rebuilt after the records change
+    """
+    window = controller.browse('flight', limit=2, sort_by='date', descending=True)
+    assert [record['id'] for record in window.records] == [6, 5]
+    assert (window.offset, window.total) == (0, 3)
+    assert controller.browse('flight', offset=10, limit=2).offset == 1
+
+    window = controller.browse('flight', filters={'airline_id': '3', 'date': 'may 2024'})
+    assert [record['id'] for record in window.records] == [6]
+
+    controller.update_record(4, {'date': "2024-06-01 09:00:00"})
+    window = controller.browse('flight', limit=1, sort_by='date', descending=True)
+    assert window.records[0]['id'] == 4
+    with pytest.raises(ValueError):
+        controller.browse('flight', sort_by='name')
+
+def test_change_tokens(controller):
+    """Test the per-type change tokens used to refresh cached GUI data.
+
+    Verifies that:
+    1. Tokens change only when records of their own type change
+    2. Tokens change on reload and never repeat an earlier value
+    """
+    clients = controller.changes('client')
+    airlines = controller.changes('airline')
+    controller.create_record('flight', {'client_id': 1, 'airline_id': 2,
+                                        'date': "2024-05-09 09:00:00"})
+    assert controller.changes('client') == clients
+    controller.update_record(1, {'name': "Jack Doe"})
+    assert controller.changes('client') != clients
+    assert controller.changes('airline') == airlines
+
+    seen = {controller.changes('airline')}
+    controller.reload()
+    assert controller.changes('airline') not in seen
+
+def test_booking_conflicts(tmp_path):
+    """Test overlapping flight detection per client.
+
+    Verifies that:
+    1. Under the 'reject' policy a flight overlapping another flight of its
+       client is rejected
+    2. Back-to-back flights and flights of other clients are accepted
+    3. Under the default 'flag' policy overlaps are accepted and found by
+       the audit
+    """
+    controller = RecordController(data_dir=str(tmp_path), commit_window=0, on_overlap='reject')
+    client = controller.create_record('client', {'name': "John Doe"})
+    other = controller.create_record('client', {'name': "Jane Roe"})
+    airline = controller.create_record('airline', {'company_name': "Test Airlines"})
+
+    def book(client_id, date, end_city="Paris"):
+        return controller.create_record('flight', {
+            'client_id': client_id, 'airline_id': airline.id, 'date': date,
+            'start_city': "London", 'end_city': end_city
+        })
+
+    first = book(client.id, BOOKING_START)
+    with pytest.raises(BookingConflictError) as error:
+        book(client.id, BOOKING_START + 30 * 60)
+    assert error.value.conflicts == [first.id]
+    book(other.id, BOOKING_START)
+    later = book(client.id, BOOKING_START + flight_duration("London", "Paris"))
+    with pytest.raises(BookingConflictError):
+        controller.update_record(later.id, {'date': BOOKING_START + 60})
+    assert controller.find_booking_conflicts() == []
+
+    controller.on_overlap = RecordController.DEFAULT_ON_OVERLAP
+    overlap = book(client.id, BOOKING_START + 60, "Tokyo")
+    assert sorted(controller.find_booking_conflicts()) == [
+        (client.id, first.id, overlap.id), (client.id, overlap.id, later.id)
+    ]
+    with pytest.raises(ValueError):
+        RecordController(data_dir=str(tmp_path), on_overlap='ignore')
@@ -0,0 +1,38 @@
+import pytest
+from datetime import datetime
+from models import registry
+from models.client import Client
+from models.flight import Flight
+
+def test_registered_models():
+    """Test the model registry lookup.
+
+    Verifies that:
+    1. Every record type is registered with its model class
+    2. Unknown record types raise ValueError
+    """
+    assert set(registry.MODELS) == {'client', 'airline', 'flight'}
+    assert registry.get_model('client') is Client
+    with pytest.raises(ValueError):
+        registry.get_model('hotel')
+
+def test_normalize_matches_model_round_trip():
+    """Test that normalize() builds the same record as the model classes.
+
+    Verifies that:
+    1. String references become integers and dates become epoch seconds
+    2. Missing fields get their defaults and unknown keys are dropped
+    3. The result equals from_dict(...).to_dict() of the same data
+    """
+    data = {'client_id': '1', 'airline_id': 2, 'date': "2024-01-31T10:00:00",
+            'start_city': "London", 'extra': "ignored"}
+    record = Flight.normalize(data, 7)
+    assert record == {'id': 7, 'type': 'flight', 'client_id': 1, 'airline_id': 2,
+                      'date': 1706695200, 'start_city': "London", 'end_city': ""}
+    assert Flight.from_dict(record).to_dict() == record
+    assert Flight.from_dict(record).date == datetime(2024, 1, 31, 10, 0)
+
+    client = Client.normalize({'name': "John Doe"}, 3)
+    assert client['name'] == "John Doe"
+    assert client['phone_number'] == ""
+    assert Client.from_dict(client).to_dict() == client
@@ -0,0 +1,93 @@
+import pytest
+from controllers.record_controller import RecordController, ReadOnlyError
+from controllers.replication import Follower
+
+
+def test_follower_applies_shipped_log(tmp_path):
+    """Test log shipping from a primary to a follower.
+
+    Verifies that:
+    1. The follower starts from a base snapshot and applies later commits
+    2. The follower's records are read-only and its lag is measured
+    3. After a compaction the follower continues from the new base
+    """
+    ship_dir = str(tmp_path / 'standby')
+    primary = RecordController(data_dir=str(tmp_path / 'primary'), commit_window=0,
+                               ship_to=ship_dir)
+    client = primary.create_record('client', {'name': "John Doe"})
+
+    follower = Follower(ship_dir)
+    follower.poll()
+    assert follower.controller.search_record(client.id)['name'] == "John Doe"
+    with pytest.raises(ReadOnlyError):
+        follower.controller.create_record('client', {'name': "Jane Roe"})
+
+    primary.update_record(client.id, {'name': "Jack Doe"})
+    airline = primary.create_record('airline', {'company_name': "Test Airlines"})
+    assert follower.poll() == 2
+    assert follower.controller.search_record(client.id)['name'] == "Jack Doe"
+    assert follower.lag()['entries'] == 0
+
+    primary.compact()
+    primary.delete_record(airline.id)
+    follower.poll()
+    assert follower.controller.search_record(airline.id) is None
+
+    # A follower restarted from its own files resumes where it stopped
+    primary.create_record('client', {'name': "Jane Roe"})
+    follower.controller.close()
+    restarted = Follower(ship_dir)
+    assert restarted.poll() == 1
+    assert restarted.controller.count_records('client') == 2
+
+
+def test_promote_follower(tmp_path):
+    """Test promoting a follower to a writable primary.
+
+    Verifies that:
+    1. Promotion applies the shipped entries and allows writes
+    2. The promoted directory keeps its records and cannot follow again
+    """
+    ship_dir = str(tmp_path / 'standby')
+    primary = RecordController(data_dir=str(tmp_path / 'primary'), commit_window=0,
+                               ship_to=ship_dir)
+    primary.create_record('client', {'name': "John Doe"})
+    follower = Follower(ship_dir)
+    follower.poll()
+    primary.create_record('client', {'name': "Jane Roe"})
+
+    promoted = follower.promote()
+    promoted.create_record('airline', {'company_name': "Test Airlines"})
+    promoted.close()
+
+    reopened = RecordController(data_dir=promoted.data_dir, commit_window=0)
+    assert not reopened.read_only
+    assert reopened.count_records() == 3
+    with pytest.raises(ValueError):
+        Follower(ship_dir)
+
+
+def test_follower_keeps_archived_flights(tmp_path):
+    """Test that flights archived on the primary reach the follower's archive.
+
+    Verifies that:
+    1. The follower copies the shipped archive before removing the flights
+    2. A promoted follower still has the archived flights
+    """
+    ship_dir = str(tmp_path / 'standby')
+    primary = RecordController(data_dir=str(tmp_path / 'primary'), commit_window=0,
+                               ship_to=ship_dir)
+    client = primary.create_record('client', {'name': "John Doe"})
+    for date in ("2023-01-15T10:00:00", "2024-06-01T10:00:00"):
+        primary.create_record('flight', {'client_id': client.id, 'date': date})
+    follower = Follower(ship_dir)
+    follower.poll()
+
+    primary.archive("2024-01")
+    follower.poll()
+    assert follower.controller.count_records('flight') == 1
+    assert [f['id'] for f in follower.controller.query_flights()] == [2, 3]
+
+    promoted = follower.promote()
+    assert promoted.archive_store.months() == ['2023-01']
+    assert promoted.create_record('airline', {'company_name': "Test Airlines"}).id == 4
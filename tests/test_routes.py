@@ -0,0 +1,106 @@
+import random
+import time
+
+from controllers.routes import RouteGraph, flight_duration
+from controllers.record_controller import RecordController
+
+HOUR = 3600
+START = 1700000000
+
+
+def flight(record_id, start_city, end_city, date):
+    return {'id': record_id, 'type': 'flight', 'client_id': 1, 'airline_id': 2,
+            'date': date, 'start_city': start_city, 'end_city': end_city}
+
+
+def test_route_search():
+    """Test itinerary search over the route graph.
+
+    Verifies that:
+    1. Direct flights and connections are found, earliest arrival first
+    2. Connections respect the minimum and maximum layover
+    3. max_legs limits the number of flights
+    """
+    london_paris = flight_duration("London", "Paris")
+    graph = RouteGraph()
+    graph.rebuild([
+        flight(1, "London", "Rome", START + 10 * HOUR),
+        flight(2, "London", "Paris", START),
+        flight(3, "Paris", "Rome", START + london_paris + 2 * HOUR),
+        # Departs before the minimum layover has passed
+        flight(4, "Paris", "Rome", START + london_paris + 30 * 60),
+        {'id': 5, 'type': 'client', 'name': "John Doe"},
+    ])
+
+    results = graph.search("London", "Rome", START, k=5)
+    assert [result.flight_ids for result in results] == [[2, 3], [1]]
+    assert results[0].cities == ["London", "Paris", "Rome"]
+    assert results[0].departure == START
+    assert results[0].arrival == START + london_paris + 2 * HOUR + flight_duration("Paris", "Rome")
+
+    assert [r.flight_ids for r in graph.search("London", "Rome", START, max_legs=1)] == [[1]]
+    assert graph.search("London", "Rome", START, max_layover=HOUR) == []
+    assert [r.flight_ids for r in graph.search("London", "Rome", START, min_layover=0)][0] == [2, 4]
+
+
+
+def test_later_arrival_is_still_searched():
+    """Test that a later arrival in a city is not pruned by an earlier one.
+
+    Verifies that:
+    1. A connection only the later arrival can catch, beyond the earlier
+       arrival's maximum layover, is found with k=1
+    2. The same single connection is found with a larger k
+    """
+    london_paris = flight_duration("London", "Paris")
+    graph = RouteGraph()
+    graph.rebuild([
+        flight(1, "London", "Paris", START),
+        flight(2, "London", "Paris", START + 23 * HOUR),
+        flight(3, "Paris", "Tokyo", START + 23 * HOUR + london_paris + 90 * 60),
+    ])
+
+    assert [r.flight_ids for r in graph.search("London", "Tokyo", START, k=1)] == [[2, 3]]
+    assert [r.flight_ids for r in graph.search("London", "Tokyo", START, k=3)] == [[2, 3]]
+
+def test_routes_follow_mutations(tmp_path):
+    """Test that the controller's route graph follows record changes.
+
+    Verifies that:
+    1. Created flights are found without a rebuild
+    2. Updated and deleted flights are no longer offered
+    """
+    controller = RecordController(data_dir=str(tmp_path), commit_window=0)
+    client = controller.create_record('client', {'name': "John Doe"})
+    airline = controller.create_record('airline', {'company_name': "Test Airlines"})
+    created = controller.create_record('flight', {
+        'client_id': client.id, 'airline_id': airline.id, 'date': START,
+        'start_city': "London", 'end_city': "Paris"
+    })
+    results = controller.find_itineraries("London", "Paris", START)
+    assert [result.flight_ids for result in results] == [[created.id]]
+
+    controller.update_record(created.id, {'end_city': "Rome"})
+    assert controller.find_itineraries("London", "Paris", START) == []
+    assert len(controller.find_itineraries("London", "Rome", START)) == 1
+
+    controller.delete_record(created.id)
+    assert controller.find_itineraries("London", "Rome", START) == []
+
+
+def test_route_search_speed():
+    """Test that searches stay fast on a large flight table."""
+    rng = random.Random(42)
+    cities = ["London", "Paris", "Rome", "Tokyo", "Sydney", "Dubai", "New York", "Singapore"]
+    records = []
+    for record_id in range(1, 200001):
+        start_city, end_city = rng.sample(cities, 2)
+        records.append(flight(record_id, start_city, end_city,
+                              START + rng.randrange(365 * 24 * HOUR)))
+    graph = RouteGraph()
+    graph.rebuild(records)
+
+    started = time.perf_counter()
+    results = graph.search("London", "Sydney", START + 100 * 24 * HOUR, k=5)
+    assert len(results) == 5
+    assert time.perf_counter() - started < 0.5
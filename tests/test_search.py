@@ -0,0 +1,46 @@
+from controllers.search import TextIndex, tokenize
+from controllers.record_controller import RecordController
+
+
+def test_text_index():
+    """Test the inverted index behind quick search.
+
+    Verifies that:
+    1. Every query word must match, the last one as a prefix
+    2. Name matches rank above city matches and whole words above prefixes
+    3. Phone numbers match by their digits, however they are grouped
+    """
+    index = TextIndex()
+    index.rebuild([
+        {'id': 1, 'type': 'client', 'name': "John Smith", 'city': "London",
+         'phone_number': "+44 20 7946 0958"},
+        {'id': 2, 'type': 'client', 'name': "Jane London", 'city': "Paris",
+         'phone_number': "555-0100"},
+        {'id': 3, 'type': 'airline', 'company_name': "London Air"},
+        {'id': 4, 'type': 'flight', 'start_city': "London", 'end_city': "Paris"},
+    ])
+
+    assert tokenize("John-Smith, London") == ["john", "smith", "london"]
+    assert [record_id for _, record_id in index.search("john sm")] == [1]
+    assert [record_id for _, record_id in index.search("london")] == [2, 3, 1, 4]
+    assert index.search("lond")[0] == (3, 2)
+    assert [record_id for _, record_id in index.search("paris", 'flight')] == [4]
+    assert [record_id for _, record_id in index.search("442079460958")] == [1]
+    assert index.search("tokyo") == []
+    assert index.search("  ") == []
+    assert len(index.search("london", limit=2)) == 2
+
+
+def test_search_text_follows_changes(tmp_path):
+    """Test that quick search sees created, updated and deleted records."""
+    controller = RecordController(data_dir=str(tmp_path), commit_window=0)
+    client = controller.create_record('client', {'name': "John Doe", 'city': "Oslo"})
+    assert [r['id'] for r in controller.search_text("jo")] == [client.id]
+
+    controller.update_record(client.id, {'name': "Jack Doe"})
+    assert controller.search_text("john") == []
+    assert controller.search_text("jack")[0]['name'] == "Jack Doe"
+
+    controller.delete_record(client.id)
+    assert controller.search_text("doe") == []
+    assert controller.text._words == []
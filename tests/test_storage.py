@@ -0,0 +1,242 @@
+import json
+import threading
+import pytest
+from models import BaseModel, storage
+from controllers.record_controller import RecordController
+
+RECORDS = [
+    {'id': 1, 'type': 'airline', 'company_name': "Test Airlines"},
+    {'id': 2, 'type': 'flight', 'client_id': 3, 'airline_id': 1, 'date': 1700000000,
+     'start_city': "London", 'end_city': "Paris"},
+]
+
+@pytest.mark.parametrize('codec', sorted(storage.CODECS))
+def test_codec_round_trip(tmp_path, codec):
+    """Test saving and loading records with each codec.
+
+    Verifies that:
+    1. The codec is detected from the file contents
+    2. Records are loaded back unchanged
+    """
+    filename = storage.codec_filename(str(tmp_path / 'records.json'), codec)
+    BaseModel.save_records([dict(r) for r in RECORDS], filename, codec)
+
+    assert storage.detect_codec(filename) == codec
+    assert BaseModel.load_records(filename) == RECORDS
+
+def test_legacy_json_is_readable(tmp_path):
+    """Test that files written as a single JSON document still load.
+
+    Verifies that:
+    1. A one-line JSON array is parsed whole
+    2. A pretty-printed JSON array is parsed whole
+    """
+    filename = tmp_path / 'records.json'
+    filename.write_text(json.dumps(RECORDS))
+    assert BaseModel.load_records(str(filename)) == RECORDS
+
+    filename.write_text(json.dumps(RECORDS, indent=4))
+    assert BaseModel.load_records(str(filename)) == RECORDS
+
+def test_controller_switches_codec(tmp_path):
+    """Test changing the controller codec setting on existing data.
+
+    Verifies that:
+    1. Records saved uncompressed are found after switching to gzip
+    2. The next save writes the gzip file
+    """
+    controller = RecordController(data_dir=str(tmp_path), commit_window=0)
+    controller.create_record('airline', {'company_name': "Test Airlines"})
+
+    controller = RecordController(data_dir=str(tmp_path), codec='gzip', commit_window=0)
+    assert len(controller.get_all_records('airline')) == 1
+    controller.create_record('airline', {'company_name': "Second Airlines"})
+
+    assert controller.records_file.endswith('.json.gz')
+    assert len(BaseModel.load_records(controller.records_file)) == 2
+
+def test_truncated_file_falls_back_to_previous_generation(tmp_path):
+    """Test recovery from a records file truncated by a crash.
+
+    Verifies that:
+    1. Each save keeps the replaced file as the previous generation
+    2. A file cut off mid-write is detected as damaged
+    3. The previous generation is loaded instead of an empty list
+    """
+    filename = str(tmp_path / 'records.json')
+    BaseModel.save_records([dict(RECORDS[0])], filename)
+    BaseModel.save_records([dict(r) for r in RECORDS], filename)
+    assert BaseModel.load_records(storage.previous_filename(filename)) == RECORDS[:1]
+
+    with open(filename) as f:
+        content = f.read()
+    with open(filename, 'w') as f:
+        f.write(content[:content.rindex(']')])
+
+    assert BaseModel.load_records(filename) == RECORDS[:1]
+
+def test_damaged_records_file_is_never_replaced(tmp_path):
+    """Test a records file that cannot be decoded in either generation.
+
+    Verifies that:
+    1. Loading raises instead of starting with no records
+    2. No save or compaction overwrites the damaged file
+    """
+    filename = str(tmp_path / 'records.json')
+    BaseModel.save_records([dict(r) for r in RECORDS], filename)
+    with open(filename, 'r+b') as f:
+        f.truncate(f.seek(0, 2) - 4)
+    with open(filename, 'rb') as f:
+        damaged = f.read()
+
+    controller = RecordController(data_dir=str(tmp_path), commit_window=0)
+    with pytest.raises(ValueError):
+        controller.count_records()
+    with pytest.raises(ValueError):
+        controller.create_record('airline', {'company_name': "Test Airlines"})
+    with pytest.raises(ValueError):
+        controller.compact()
+    with open(filename, 'rb') as f:
+        assert f.read() == damaged
+
+def test_group_commit_batches_saves(tmp_path):
+    """Test that mutations within the commit window share one save.
+
+    Verifies that:
+    1. Nothing is written until the window passes or flush() is called
+    2. A burst of creates is written by a single save
+    3. All records are durable after flush()
+    """
+    controller = RecordController(data_dir=str(tmp_path), commit_window=30)
+    saves = controller.metrics.histogram('storage_operation_seconds', operation='save')
+    for i in range(20):
+        controller.create_record('airline', {'company_name': f"Airline {i}"})
+    assert saves.count == 0
+
+    controller.flush()
+    assert saves.count == 1
+    reloaded = RecordController(data_dir=str(tmp_path), commit_window=0)
+    assert reloaded.count_records('airline') == 20
+    controller.close()
+
+def test_failed_commit_is_reported_and_retried(tmp_path):
+    """Test a commit that fails on the group-commit thread.
+
+    Verifies that:
+    1. The error is raised to the caller waiting for that batch
+    2. The entries of the failed batch are kept and written by the next flush
+    """
+    controller = RecordController(data_dir=str(tmp_path), commit_window=30)
+    append = controller._log.append
+    failures = []
+
+    def failing_append(entries):
+        if not failures:
+            failures.append(entries)
+            raise OSError("disk full")
+        return append(entries)
+
+    controller._log.append = failing_append
+    controller.create_record('airline', {'company_name': "Test Airlines"})
+    with pytest.raises(OSError):
+        controller.flush()
+
+    controller.flush()
+    controller.close()
+    reloaded = RecordController(data_dir=str(tmp_path), commit_window=0)
+    assert reloaded.count_records('airline') == 1
+
+def test_concurrent_writers_with_synchronous_commits(tmp_path):
+    """Test a create and an update racing without a commit window.
+
+    Verifies that:
+    1. A create holding the record lock while an update commits does not
+       deadlock
+    2. Both writes are durable
+    """
+    controller = RecordController(data_dir=str(tmp_path), commit_window=0)
+    airline = controller.create_record('airline', {'company_name': "Test Airlines"})
+    committing = threading.Event()
+    creating = threading.Event()
+
+    append = controller._log.append
+    def slow_append(entries):
+        # The update holds the commit lock here until the create holds the record lock
+        committing.set()
+        creating.wait(5)
+        return append(entries)
+
+    check_references = controller._check_references
+    def signal_create(record):
+        creating.set()
+        return check_references(record)
+
+    controller._log.append = slow_append
+    controller._check_references = signal_create
+    update = threading.Thread(target=controller.update_record,
+                              args=(airline.id, {'company_name': "Renamed"}), daemon=True)
+    create = threading.Thread(target=controller.create_record,
+                              args=('airline', {'company_name': "Second"}), daemon=True)
+    update.start()
+    assert committing.wait(5)
+    create.start()
+    for writer in (update, create):
+        writer.join(10)
+    assert not update.is_alive() and not create.is_alive()
+
+    controller.close()
+    reloaded = RecordController(data_dir=str(tmp_path), commit_window=0)
+    assert reloaded.count_records('airline') == 2
+    assert reloaded.search_record(airline.id)['company_name'] == "Renamed"
+
+def test_journal_replay_and_compaction(tmp_path):
+    """Test the mutation log and its compaction.
+
+    Verifies that:
+    1. Mutations are appended to the log, not written to the records file
+    2. Replaying the log restores creates, updates and deletes
+    3. Compaction snapshots the records and truncates the log, keeping the
+       entries since the previous generation
+    4. Records load correctly from the previous generation plus the log
+    """
+    controller = RecordController(data_dir=str(tmp_path), commit_window=0,
+                                  compact_min_bytes=1 << 30)
+    for i in range(3):
+        controller.create_record('airline', {'company_name': f"Airline {i}"})
+    controller.update_record(1, {'company_name': "Renamed"})
+    controller.delete_record(2)
+    assert BaseModel.load_records(controller.records_file) == []
+
+    def names(data_dir):
+        reloaded = RecordController(data_dir=data_dir, commit_window=0)
+        return [r['company_name'] for r in reloaded.get_all_records('airline')]
+
+    assert names(str(tmp_path)) == ["Renamed", "Airline 2"]
+
+    controller.compact()
+    assert len(BaseModel.load_records(controller.records_file)) == 2
+    controller.create_record('airline', {'company_name': "Airline 3"})
+    controller.compact()
+    # The log keeps what the previous generation is missing
+    with open(controller._log.filename) as f:
+        assert len(f.readlines()) == 1
+    assert names(str(tmp_path)) == ["Renamed", "Airline 2", "Airline 3"]
+
+    with open(controller.records_file, 'w') as f:
+        f.write('[\n')
+    assert names(str(tmp_path)) == ["Renamed", "Airline 2", "Airline 3"]
+
+def test_compaction_thresholds(tmp_path):
+    """Test that commits trigger a compaction once the log is large enough."""
+    controller = RecordController(data_dir=str(tmp_path), commit_window=0,
+                                  compact_min_bytes=2000, compact_ratio=0.5)
+    compactions = controller.metrics.histogram('storage_operation_seconds', operation='compact')
+    for i in range(10):
+        controller.create_record('airline', {'company_name': f"Airline {i}"})
+    assert compactions.count == 0
+    for i in range(40):
+        controller.create_record('airline', {'company_name': f"Airline {i}"})
+    assert compactions.count >= 1
+    assert controller._log.size < 2000 * 2
+    reloaded = RecordController(data_dir=str(tmp_path), commit_window=0)
+    assert reloaded.count_records('airline') == 50
@@ -0,0 +1,40 @@
+import time
+from models.validation import validate_batch
+
+def test_validate_batch_reports_per_row():
+    """Test column-wise validation of a mixed batch.
+
+    Verifies that:
+    1. Valid rows of every type pass
+    2. Format, city, reference and date errors are reported for their rows
+    """
+    rows = [
+        {'type': 'client', 'name': "John Doe", 'address_line1': "1 High Street",
+         'city': "London", 'state': "London", 'zip_code': "SW1A 1AA",
+         'country': "United Kingdom", 'phone_number': "+44 20 7946 0018"},
+        {'type': 'Airline', 'company_name': "Test Air"},
+        {'type': 'flight', 'client_id': 1, 'airline_id': 2, 'date': "not a date",
+         'start_city': "London", 'end_city': "Paris"},
+        {'type': 'flight', 'client_id': "x", 'airline_id': 5,
+         'start_city': "London", 'end_city': "Nowhere"},
+    ]
+    report = validate_batch(rows, {'client_id': {1}, 'airline_id': {2}})
+    assert report.valid_rows == [0, 1]
+    assert report.errors[2] == [('date', "invalid date")]
+    assert set(report.errors[3]) == {
+        ('end_city', "unknown city"),
+        ('client_id', "must be an integer ID"),
+        ('airline_id', "does not refer to an existing airline"),
+    }
+
+def test_validate_batch_throughput():
+    """Test that large batches validate at over 100,000 rows per second."""
+    rows = [
+        {'type': 'flight', 'client_id': i % 100, 'airline_id': 1, 'date': 1700000000,
+         'start_city': "London", 'end_city': "Paris"}
+        for i in range(100000)
+    ]
+    start = time.perf_counter()
+    report = validate_batch(rows, {'client_id': set(range(100)), 'airline_id': {1}})
+    assert len(report.valid_rows) == 100000
+    assert time.perf_counter() - start < 1.0
@@ -1,6 +1,11 @@
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk, messagebox
-from datetime import datetime
+from models.dates import format_epoch
+from models.cities import CITY_NAMES
+from models import registry
+from controllers.record_controller import IntegrityError
+from controllers.browse import display_value
 
 
 class GUI:
@@ -12,47 +17,57 @@ class GUI:
     Attributes:
         controller: The RecordController instance that handles data operations.
         root: The main Tkinter window.
+        profiler: Optional Profiler used for on-demand profiling.
     """
 
-    # Predefined list for cities
-    CITIES = [
-        "London",
-        "New York",
-        "Dubai",
-        "Singapore",
-        "Tokyo",
-        "Paris",
-        "Sydney",
-        "Hong Kong"
-    ]
-
-    def __init__(self, controller):
+    # Event handlers that can be profiled individually
+    PROFILED_OPERATIONS = (
+        'create_client', 'create_airline', 'create_flight', 'search_record',
+        'update_record', 'delete_record', 'show_create_form', 'show_search_form',
+    )
+
+    # Cities offered in the flight dropdowns, from the city reference table
+    CITIES = CITY_NAMES
+
+    # Milliseconds to wait after a keystroke before searching
+    SEARCH_DELAY_MS = 200
+    # Milliseconds between checks for a finished search
+    SEARCH_POLL_MS = 20
+    # Maximum number of quick search results shown
+    SEARCH_LIMIT = 100
+    # Rows of the record browser, the only rows ever fetched and drawn
+    BROWSE_ROWS = 20
+
+    def __init__(self, controller, profiler=None):
         """Initialize the GUI.
 
         Args:
             controller: The RecordController instance that handles data operations.
+            profiler: Optional Profiler. When given, the event handlers can be
+                profiled and a Profiling menu is added to the window.
         """
         self.controller = controller
+        self.profiler = profiler
+        # Forms are built once and kept, by record type
+        self.create_forms = {}
+        self.search_forms = {}
+        # Change tokens of the records shown in the flight dropdowns
+        self.dropdown_versions = {}
+        # Predefined cities for dropdowns, sorted alphabetically
+        self.cities = list(self.CITIES)
+        # Quick searches run one at a time off the event loop
+        self.search_executor = ThreadPoolExecutor(max_workers=1)
+        self.search_after_id = None
+        self.search_generation = 0
+        if profiler:
+            # Wrap before the widgets are built so their callbacks use the wrappers
+            profiler.wrap(self, self.PROFILED_OPERATIONS)
         self.root = tk.Tk()
         self.root.title("Travel Agent Record Management System")
         self.root.geometry("800x600")
         self.setup_gui()
-
-        # Predefined cities for dropdowns
-        self.cities = [
-            "Dubai", "Doha", "Istanbul", "London", "Paris", "Amsterdam",
-            "Singapore", "Hong Kong", "Tokyo", "New York", "Los Angeles",
-            "Sydney", "Mumbai", "Bangkok", "Seoul", "Berlin", "Rome",
-            "Madrid", "Vienna", "Moscow", "Beijing", "Shanghai", "Toronto",
-            "Vancouver", "Auckland", "Cairo", "Dubai", "Abu Dhabi", "Riyadh",
-            "Kuala Lumpur", "Manila", "Jakarta", "Hanoi", "Ho Chi Minh City",
-            "Bangkok", "Phuket", "Seoul", "Busan", "Osaka", "Kyoto",
-            "Helsinki", "Stockholm", "Copenhagen", "Oslo", "Reykjavik",
-            "Dublin", "Edinburgh", "Glasgow", "Belfast", "Cardiff"
-        ]
-        
-        # Sort cities alphabetically
-        self.cities.sort()
+        if profiler:
+            self.setup_profiling_menu()
 
     def get_airlines(self):
         """Get list of created airlines from the controller.
@@ -84,6 +99,22 @@ class GUI:
             print(f"Error getting clients: {e}")
             return ["No clients found"]
 
+    def update_flight_dropdowns(self):
+        """Refresh the client and airline dropdowns if those records changed.
+
+        The controller's change tokens tell whether clients or airlines were
+        created, updated or deleted since the dropdowns were filled, so
+        records are only read again when needed.
+        """
+        for record_type, dropdown, get_values in (
+            ('client', self.flight_client, self.get_clients),
+            ('airline', self.flight_airline, self.get_airlines),
+        ):
+            version = self.controller.changes(record_type)
+            if self.dropdown_versions.get(record_type) != version:
+                dropdown['values'] = get_values()
+                self.dropdown_versions[record_type] = version
+
     def refresh_airline_dropdown(self):
         """Refresh the airline dropdown with current airlines from records."""
         if hasattr(self, 'flight_airline'):
@@ -105,12 +136,55 @@ class GUI:
         # Create two main tabs
         self.create_frame = ttk.Frame(self.notebook)
         self.search_frame = ttk.Frame(self.notebook)
+        self.browse_frame = ttk.Frame(self.notebook)
 
         self.notebook.add(self.create_frame, text='Create New Record')
         self.notebook.add(self.search_frame, text='Search Existing Record')
+        self.notebook.add(self.browse_frame, text='Browse Records')
 
         self.setup_create_tab()
         self.setup_search_tab()
+        self.setup_browse_tab()
+
+    def setup_profiling_menu(self):
+        """Set up the Profiling menu used to profile a single operation."""
+        menubar = tk.Menu(self.root)
+        profiling_menu = tk.Menu(menubar, tearoff=0)
+        profiling_menu.add_command(
+            label="Profile Next Save",
+            command=lambda: self.arm_profiler('save')
+        )
+        profiling_menu.add_command(
+            label="Profile Reload From Disk",
+            command=self.profile_reload
+        )
+        profiling_menu.add_command(
+            label="Profile Next Search",
+            command=lambda: self.arm_profiler('search_record')
+        )
+        menubar.add_cascade(label="Profiling", menu=profiling_menu)
+        self.root.config(menu=menubar)
+
+    def arm_profiler(self, operation):
+        """Profile the next call of an operation.
+
+        Args:
+            operation: Name of the operation to profile.
+        """
+        self.profiler.arm(operation)
+        messagebox.showinfo(
+            "Profiling",
+            f"The next {operation} will be profiled into {self.profiler.output_dir}"
+        )
+
+    def profile_reload(self):
+        """Reload all records from disk under the profiler."""
+        self.profiler.arm('load')
+        self.controller.reload()
+        messagebox.showinfo(
+            "Profiling",
+            f"Reload profile written to {self.profiler.output_dir}"
+        )
 
     def setup_create_tab(self):
         """Set up the create tab with record type selection and form."""
@@ -149,7 +223,9 @@ class GUI:
         self.show_create_form()
 
     def setup_search_tab(self):
-        """Set up the search tab with record type selection and form."""
+        """Set up the search tab with quick search, record type selection and form."""
+        self.setup_quick_search()
+
         # Record type selection
         select_frame = ttk.LabelFrame(self.search_frame, text="Select Record Type")
         select_frame.pack(fill='x', padx=5, pady=5)
@@ -212,9 +288,259 @@ class GUI:
         # Initialize with client form
         self.show_search_form()
 
+    def setup_quick_search(self):
+        """Set up the search-as-you-type box and its results list."""
+        quick_frame = ttk.LabelFrame(self.search_frame, text="Quick Search")
+        quick_frame.pack(fill='x', padx=5, pady=5)
+
+        self.quick_search_text = tk.StringVar()
+        self.quick_search_text.trace_add('write', lambda *args: self.schedule_quick_search())
+        ttk.Entry(quick_frame, textvariable=self.quick_search_text).pack(fill='x', padx=5, pady=2)
+
+        # Only the visible rows of the results list are drawn
+        self.quick_search_results = ttk.Treeview(
+            quick_frame, columns=('type', 'summary'), height=6, selectmode='browse'
+        )
+        self.quick_search_results.heading('#0', text="ID")
+        self.quick_search_results.heading('type', text="Type")
+        self.quick_search_results.heading('summary', text="Details")
+        self.quick_search_results.column('#0', width=80, stretch=False)
+        self.quick_search_results.column('type', width=80, stretch=False)
+        self.quick_search_results.bind('<Double-1>', lambda event: self.open_quick_search_result())
+        self.quick_search_results.pack(fill='x', padx=5, pady=2)
+
+    def schedule_quick_search(self):
+        """Restart the search delay after a keystroke."""
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(self.SEARCH_DELAY_MS, self.run_quick_search)
+
+    def run_quick_search(self):
+        """Start searching for the typed text in the background.
+
+        Each search gets a new generation number. Results of older searches
+        are discarded, and older searches that have not started yet are
+        cancelled.
+        """
+        self.search_after_id = None
+        self.search_generation += 1
+        query = self.quick_search_text.get().strip()
+        if not query:
+            self.show_quick_search_results([])
+            return
+        future = self.search_executor.submit(
+            self.controller.search_text, query, None, self.SEARCH_LIMIT
+        )
+        self.poll_quick_search(future, self.search_generation)
+
+    def poll_quick_search(self, future, generation):
+        """Show the results of a background search once it finishes.
+
+        Args:
+            future: Future of the search.
+            generation: Generation number of the search.
+        """
+        if generation != self.search_generation:
+            future.cancel()
+            return
+        if not future.done():
+            self.root.after(self.SEARCH_POLL_MS, self.poll_quick_search, future, generation)
+            return
+        try:
+            self.show_quick_search_results(future.result())
+        except Exception as e:
+            print(f"Error searching records: {e}")
+
+    def show_quick_search_results(self, records):
+        """Replace the quick search results.
+
+        Args:
+            records: Matching records, best match first.
+        """
+        results = self.quick_search_results
+        results.delete(*results.get_children())
+        for record in records:
+            results.insert(
+                '', 'end', iid=str(record['id']), text=str(record['id']),
+                values=(record['type'], self.summarize_record(record))
+            )
+
+    @staticmethod
+    def summarize_record(record):
+        """Describe a record in one line.
+
+        Args:
+            record: The record.
+
+        Returns:
+            str: Its main fields.
+        """
+        if record['type'] == 'client':
+            return f"{record.get('name', '')}, {record.get('city', '')}, {record.get('phone_number', '')}"
+        if record['type'] == 'airline':
+            return record.get('company_name', '')
+        return (f"{record.get('start_city', '')} to {record.get('end_city', '')}, "
+                f"{format_epoch(record.get('date'))}")
+
+    def open_quick_search_result(self):
+        """Show the selected quick search result in the search form."""
+        selection = self.quick_search_results.selection()
+        if not selection:
+            return
+        record_type = self.quick_search_results.set(selection[0], 'type')
+        self.search_record_type.set(record_type)
+        self.show_search_form()
+        self.search_id_entry.delete(0, tk.END)
+        self.search_id_entry.insert(0, selection[0])
+        self.search_record()
+
+    def setup_browse_tab(self):
+        """Set up the record browser with type selection, filter and table."""
+        controls = ttk.Frame(self.browse_frame)
+        controls.pack(fill='x', padx=5, pady=5)
+
+        ttk.Label(controls, text="Type").pack(side='left', padx=5)
+        self.browse_type = ttk.Combobox(
+            controls, values=sorted(registry.MODELS), state='readonly', width=10
+        )
+        self.browse_type.set('flight')
+        self.browse_type.bind('<<ComboboxSelected>>', lambda event: self.show_browse_table())
+        self.browse_type.pack(side='left', padx=5)
+
+        ttk.Label(controls, text="Filter").pack(side='left', padx=5)
+        self.browse_filter_column = ttk.Combobox(controls, state='readonly', width=14)
+        self.browse_filter_column.pack(side='left', padx=5)
+        self.browse_filter_text = ttk.Entry(controls)
+        self.browse_filter_text.bind('<Return>', lambda event: self.apply_browse_filter())
+        self.browse_filter_text.pack(side='left', padx=5)
+        ttk.Button(controls, text="Apply", command=self.apply_browse_filter).pack(side='left', padx=5)
+
+        self.browse_status = ttk.Label(controls)
+        self.browse_status.pack(side='right', padx=5)
+
+        table_frame = ttk.Frame(self.browse_frame)
+        table_frame.pack(fill='both', expand=True, padx=5, pady=5)
+        # The table holds only the visible rows; the scrollbar moves the
+        # window over the full result set, which stays in the controller
+        self.browse_table = ttk.Treeview(
+            table_frame, show='headings', height=self.BROWSE_ROWS, selectmode='browse'
+        )
+        self.browse_scrollbar = ttk.Scrollbar(
+            table_frame, orient='vertical', command=self.scroll_browse_table
+        )
+        self.browse_table.pack(side='left', fill='both', expand=True)
+        self.browse_scrollbar.pack(side='right', fill='y')
+        self.browse_table.bind('<MouseWheel>', self.on_browse_wheel)
+        self.browse_table.bind('<Button-4>', lambda event: self.scroll_browse_table('scroll', -1, 'units'))
+        self.browse_table.bind('<Button-5>', lambda event: self.scroll_browse_table('scroll', 1, 'units'))
+
+        self.show_browse_table()
+
+    def show_browse_table(self):
+        """Set up the table columns for the selected type and show its first rows."""
+        record_type = self.browse_type.get()
+        self.browse_columns = ['id'] + [field.name for field in registry.get_model(record_type).FIELDS]
+        self.browse_kinds = {field.name: field.kind for field in registry.get_model(record_type).FIELDS}
+        self.browse_sort = ('id', False)
+        self.browse_filters = {}
+        self.browse_offset = 0
+        self.browse_total = 0
+        self.browse_filter_column['values'] = self.browse_columns
+        self.browse_filter_column.set(self.browse_columns[-1])
+        self.browse_filter_text.delete(0, tk.END)
+
+        table = self.browse_table
+        table['columns'] = self.browse_columns
+        for column in self.browse_columns:
+            table.heading(
+                column, text=column.replace('_', ' ').title(),
+                command=lambda column=column: self.sort_browse_table(column)
+            )
+            table.column(column, width=60 if column == 'id' else 120)
+        self.load_browse_window()
+
+    def load_browse_window(self):
+        """Fetch and draw the rows of the current window."""
+        try:
+            sort_by, descending = self.browse_sort
+            window = self.controller.browse(
+                self.browse_type.get(), self.browse_offset, self.BROWSE_ROWS,
+                sort_by, descending, self.browse_filters
+            )
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.browse_offset = window.offset
+        self.browse_total = window.total
+
+        table = self.browse_table
+        table.delete(*table.get_children())
+        for record in window.records:
+            table.insert('', 'end', values=[
+                display_value(record, column, self.browse_kinds.get(column, 'ref'))
+                for column in self.browse_columns
+            ])
+
+        if self.browse_total:
+            first = self.browse_offset / self.browse_total
+            last = min(self.browse_offset + self.BROWSE_ROWS, self.browse_total) / self.browse_total
+            self.browse_scrollbar.set(first, last)
+            self.browse_status['text'] = (
+                f"{self.browse_offset + 1}-{self.browse_offset + len(window.records)}"
+                f" of {self.browse_total}"
+            )
+        else:
+            self.browse_scrollbar.set(0, 1)
+            self.browse_status['text'] = "No records"
+
+    def scroll_browse_table(self, action, amount, unit=None):
+        """Move the window in response to the scrollbar or the mouse wheel.
+
+        Args:
+            action: 'moveto' with a fraction, or 'scroll' with a count.
+            amount: Fraction of the result set, or number of units or pages.
+            unit: 'units' for rows or 'pages' for windows, when scrolling.
+        """
+        if action == 'moveto':
+            offset = int(float(amount) * self.browse_total)
+        else:
+            step = self.BROWSE_ROWS if unit == 'pages' else 1
+            offset = self.browse_offset + int(amount) * step
+        offset = max(0, min(offset, self.browse_total - self.BROWSE_ROWS))
+        if offset != self.browse_offset:
+            self.browse_offset = offset
+            self.load_browse_window()
+
+    def on_browse_wheel(self, event):
+        """Scroll the record browser with the mouse wheel."""
+        self.scroll_browse_table('scroll', -1 if event.delta > 0 else 1, 'units')
+
+    def sort_browse_table(self, column):
+        """Sort the browser by a column, reversing the order on a second click.
+
+        Args:
+            column: Name of the column.
+        """
+        sort_by, descending = self.browse_sort
+        self.browse_sort = (column, not descending if sort_by == column else False)
+        self.browse_offset = 0
+        self.load_browse_window()
+
+    def apply_browse_filter(self):
+        """Show only the records whose selected column contains the filter text."""
+        text = self.browse_filter_text.get().strip()
+        self.browse_filters = {self.browse_filter_column.get(): text} if text else {}
+        self.browse_offset = 0
+        self.load_browse_window()
+
     def setup_client_create_form(self):
-        """Set up the client creation form."""
-        form_frame = ttk.LabelFrame(self.create_form_frame, text="Client Information")
+        """Build the client creation form.
+
+        Returns:
+            ttk.Frame: The form, not yet shown.
+        """
+        form = ttk.Frame(self.create_form_frame)
+        form_frame = ttk.LabelFrame(form, text="Client Information")
         form_frame.pack(fill='x', padx=5, pady=5)
 
         # Create entry fields
@@ -244,10 +570,16 @@ class GUI:
             text="Create Client",
             command=self.create_client
         ).grid(row=len(fields), column=0, columnspan=2, pady=10)
+        return form
 
     def setup_airline_create_form(self):
-        """Set up the airline creation form."""
-        form_frame = ttk.LabelFrame(self.create_form_frame, text="Airline Information")
+        """Build the airline creation form.
+
+        Returns:
+            ttk.Frame: The form, not yet shown.
+        """
+        form = ttk.Frame(self.create_form_frame)
+        form_frame = ttk.LabelFrame(form, text="Airline Information")
         form_frame.pack(fill='x', padx=5, pady=5)
 
         ttk.Label(form_frame, text="Company Name*").grid(row=0, column=0, padx=5, pady=2)
@@ -259,15 +591,21 @@ class GUI:
             text="Create Airline",
             command=self.create_airline
         ).grid(row=1, column=0, columnspan=2, pady=10)
+        return form
 
     def setup_flight_create_form(self):
-        """Set up the flight creation form."""
-        form_frame = ttk.LabelFrame(self.create_form_frame, text="Flight Information")
+        """Build the flight creation form.
+
+        Returns:
+            ttk.Frame: The form, not yet shown.
+        """
+        form = ttk.Frame(self.create_form_frame)
+        form_frame = ttk.LabelFrame(form, text="Flight Information")
         form_frame.pack(fill='x', padx=5, pady=5)
 
         # Client dropdown
         ttk.Label(form_frame, text="Client*").grid(row=0, column=0, padx=5, pady=2)
-        self.flight_client = ttk.Combobox(form_frame, values=self.get_clients())
+        self.flight_client = ttk.Combobox(form_frame)
         self.flight_client.grid(row=0, column=1, padx=5, pady=2)
 
         # Refresh button for client dropdown
@@ -279,7 +617,7 @@ class GUI:
 
         # Airline dropdown
         ttk.Label(form_frame, text="Airline*").grid(row=1, column=0, padx=5, pady=2)
-        self.flight_airline = ttk.Combobox(form_frame, values=self.get_airlines())
+        self.flight_airline = ttk.Combobox(form_frame)
         self.flight_airline.grid(row=1, column=1, padx=5, pady=2)
 
         # Refresh button for airline dropdown
@@ -304,40 +642,102 @@ class GUI:
             text="Create Flight",
             command=self.create_flight
         ).grid(row=4, column=0, columnspan=2, pady=10)
+        return form
+
+    @staticmethod
+    def switch_form(forms, record_type, build):
+        """Show the form of a record type and hide the others.
+
+        Each form is built on first use and kept, so switching only changes
+        which form is packed.
+
+        Args:
+            forms: Dictionary of the forms built so far, by record type.
+            record_type: Record type of the form to show.
+            build: Dictionary of form builders, by record type.
+        """
+        if record_type not in forms:
+            forms[record_type] = build[record_type]()
+        for other, form in forms.items():
+            if other != record_type:
+                form.pack_forget()
+        forms[record_type].pack(fill='both', expand=True)
+
+    @staticmethod
+    def clear_entries(entries, state='normal'):
+        """Empty entry widgets, including read-only ones.
+
+        Args:
+            entries: Entry or Combobox widgets to empty.
+            state: State to leave the widgets in.
+        """
+        for entry in entries:
+            entry.config(state='normal')
+            entry.delete(0, tk.END)
+            entry.config(state=state)
 
     def show_create_form(self):
         """Show the appropriate creation form based on selected record type."""
-        # Clear the current form
-        for widget in self.create_form_frame.winfo_children():
-            widget.destroy()
-
-        # Show the selected form
+        record_type = self.create_record_type.get()
+        self.switch_form(self.create_forms, record_type, {
+            "client": self.setup_client_create_form,
+            "airline": self.setup_airline_create_form,
+            "flight": self.setup_flight_create_form,
+        })
+        if record_type == "flight":
+            self.update_flight_dropdowns()
+
+    def clear_create_form(self):
+        """Empty the fields of the current creation form for the next record."""
         record_type = self.create_record_type.get()
         if record_type == "client":
-            self.setup_client_create_form()
+            self.clear_entries(self.client_entries.values())
         elif record_type == "airline":
-            self.setup_airline_create_form()
+            self.clear_entries([self.airline_entry])
         elif record_type == "flight":
-            self.setup_flight_create_form()
+            self.clear_entries([
+                self.flight_client, self.flight_airline,
+                self.flight_start_city, self.flight_end_city
+            ])
+            self.update_flight_dropdowns()
 
     def show_search_form(self):
-        """Show the appropriate search form based on selected record type."""
-        # Clear the current form
-        for widget in self.search_form_frame.winfo_children():
-            widget.destroy()
+        """Show the appropriate search form based on selected record type.
 
-        # Show the selected form
+        The cached form is emptied, and so is the ID, so no record looked up
+        before the switch can be updated from stale fields.
+        """
+        self.switch_form(self.search_forms, self.search_record_type.get(), {
+            "client": self.setup_client_search_form,
+            "airline": self.setup_airline_search_form,
+            "flight": self.setup_flight_search_form,
+        })
+        self.clear_search_form()
+        self.search_id_entry.delete(0, tk.END)
+
+    def clear_search_form(self):
+        """Empty the fields of the current search form."""
         record_type = self.search_record_type.get()
         if record_type == "client":
-            self.setup_client_search_form()
+            entries = self.search_client_entries.values()
         elif record_type == "airline":
-            self.setup_airline_search_form()
-        elif record_type == "flight":
-            self.setup_flight_search_form()
+            entries = [self.search_airline_entry]
+        else:
+            entries = [
+                self.search_flight_start_city, self.search_flight_end_city,
+                self.search_flight_date, self.search_flight_client_id,
+                self.search_flight_airline
+            ]
+        self.clear_entries(entries, state='readonly')
 
     def setup_client_search_form(self):
-        """Set up the client search form."""
-        form_frame = ttk.LabelFrame(self.search_form_frame, text="Client Information")
+        """Build the client search form.
+
+        Returns:
+            ttk.Frame: The form, not yet shown.
+        """
+        form = ttk.Frame(self.search_form_frame)
+        form_frame = ttk.LabelFrame(form, text="Client Information")
         form_frame.pack(fill='x', padx=5, pady=5)
 
         # Create entry fields
@@ -362,19 +762,31 @@ class GUI:
             entry = ttk.Entry(form_frame, state='readonly')
             entry.grid(row=i, column=1, padx=5, pady=2)
             self.search_client_entries[field] = entry
+        return form
 
     def setup_airline_search_form(self):
-        """Set up the airline search form."""
-        form_frame = ttk.LabelFrame(self.search_form_frame, text="Airline Information")
+        """Build the airline search form.
+
+        Returns:
+            ttk.Frame: The form, not yet shown.
+        """
+        form = ttk.Frame(self.search_form_frame)
+        form_frame = ttk.LabelFrame(form, text="Airline Information")
         form_frame.pack(fill='x', padx=5, pady=5)
 
         ttk.Label(form_frame, text="Company Name").grid(row=0, column=0, padx=5, pady=2)
         self.search_airline_entry = ttk.Entry(form_frame, state='readonly')
         self.search_airline_entry.grid(row=0, column=1, padx=5, pady=2)
+        return form
 
     def setup_flight_search_form(self):
-        """Set up the flight search form."""
-        form_frame = ttk.LabelFrame(self.search_form_frame, text="Flight Information")
+        """Build the flight search form.
+
+        Returns:
+            ttk.Frame: The form, not yet shown.
+        """
+        form = ttk.Frame(self.search_form_frame)
+        form_frame = ttk.LabelFrame(form, text="Flight Information")
         form_frame.pack(fill='x', padx=5, pady=5)
 
         # Create entry fields
@@ -396,7 +808,7 @@ class GUI:
         self.search_flight_date.grid(row=2, column=1, padx=5, pady=2)
 
         # Associated IDs
-        assoc_frame = ttk.LabelFrame(self.search_form_frame, text="Associated Records")
+        assoc_frame = ttk.LabelFrame(form, text="Associated Records")
         assoc_frame.pack(fill='x', padx=5, pady=5)
 
         # Client ID
@@ -408,6 +820,7 @@ class GUI:
         ttk.Label(assoc_frame, text="Airline").grid(row=1, column=0, padx=5, pady=2)
         self.search_flight_airline = ttk.Entry(assoc_frame, state='readonly')
         self.search_flight_airline.grid(row=1, column=1, padx=5, pady=2)
+        return form
 
     def validate_required_fields(self, entries, required_fields):
         """Validate that all required fields are filled.
@@ -444,7 +857,7 @@ class GUI:
         try:
             self.controller.create_record('client', data)
             messagebox.showinfo("Success", "Client record created successfully!")
-            self.show_create_form()  # Reset the form
+            self.clear_create_form()
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
@@ -461,7 +874,7 @@ class GUI:
         try:
             self.controller.create_record('airline', data)
             messagebox.showinfo("Success", "Airline record created successfully!")
-            self.show_create_form()  # Reset the form
+            self.clear_create_form()
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
@@ -505,7 +918,9 @@ class GUI:
             
             self.controller.create_record('flight', data)
             messagebox.showinfo("Success", "Flight record created successfully!")
-            self.show_create_form()  # Reset the form
+            self.clear_create_form()
+        except IntegrityError as e:
+            messagebox.showerror("Error", str(e))
         except ValueError:
             messagebox.showerror("Error", "Invalid client selection")
         except Exception as e:
@@ -583,29 +998,9 @@ class GUI:
         self.search_flight_end_city.insert(0, arrival_city)
         self.search_flight_end_city.config(state='readonly')
 
-        # Format and display date
-        date_str = record.get('date', '')
-        if date_str:
-            try:
-                # Handle ISO format date string
-                if 'T' in date_str:
-                    # Split at 'T' and take the first part for date
-                    date_part = date_str.split('T')[0]
-                    time_part = date_str.split('T')[1].split('.')[0]  # Remove milliseconds
-                    # Combine date and time parts
-                    date_str = f"{date_part} {time_part}"
-                
-                # Parse the date string
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-                # Format it as Time, Day, Month, Year
-                formatted_date = date_obj.strftime("%H:%M, %d %B %Y")
-                print(f"Formatted date: {formatted_date}")  # Debug log
-            except ValueError as e:
-                print(f"Could not parse date: {date_str}, Error: {e}")  # Debug log
-                formatted_date = date_str
-        else:
-            formatted_date = "No date available"
-            print("No date found in record")  # Debug log
+        # Format and display date, stored as epoch seconds
+        date = record.get('date')
+        formatted_date = format_epoch(date) if date is not None else "No date available"
 
         # Update date field
         self.search_flight_date.config(state='normal')
@@ -639,6 +1034,8 @@ class GUI:
                 self.update_airline_record(record_id)
             elif record_type == "flight":
                 self.update_flight_record(record_id)
+        except IntegrityError as e:
+            messagebox.showerror("Error", str(e))
         except ValueError:
             messagebox.showerror("Error", "No record currently selected")
         except Exception as e:
@@ -693,8 +1090,10 @@ class GUI:
                     "Success",
                     f"{record_type.title()} record deleted successfully!"
                 )
-                self.show_search_form()  # Reset the form
+                self.clear_search_form()
                 self.search_id_entry.delete(0, tk.END)
+        except IntegrityError as e:
+            messagebox.showerror("Error", str(e))
         except ValueError:
             messagebox.showerror("Error", "No record currently selected")
         except Exception as e:
@@ -702,4 +1101,5 @@ class GUI:
 
     def run(self):
         """Start the GUI main loop."""
-        self.root.mainloop() 
\ No newline at end of file
+        self.root.mainloop()
+        self.search_executor.shutdown(wait=False, cancel_futures=True) 
\ No newline at end of file